@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档目录缓存
+在内存中保存 语言 → 项目 → 模块 的解析结果，按目录的 mtime/inode 判断是否失效
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (st_mtime_ns, st_ino, st_size)，文件不存在时为None
+Stamp = Optional[Tuple[int, int, int]]
+
+# 项目修订号：全局递增，新建或元数据变化的项目取下一个值
+_revisions = itertools.count(1)
+
+
+def _stamp(path: Path) -> Stamp:
+    """获取路径的变更标记"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+
+def _load_json(path: Path) -> Optional[Dict]:
+    """加载JSON文件"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Failed to load {path}: {e}")
+        return None
+
+
+class ModuleEntry:
+    """模块条目"""
+
+    __slots__ = ("name", "path", "metadata", "metadata_stamp", "readme_stamp")
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        self.metadata: Dict[str, Any] = {}
+        self.metadata_stamp: Stamp = None
+        self.readme_stamp: Stamp = None
+
+
+class ProjectEntry:
+    """项目条目"""
+
+    __slots__ = ("name", "path", "dir_stamp", "info", "info_stamp", "readme_stamp", "modules", "revision")
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        # project-info.json、模块列表或 metadata.json 变化时更新，派生索引据此判断项目是否需要重新提取
+        self.revision = next(_revisions)
+        self.dir_stamp: Stamp = None
+        self.info: Optional[Dict[str, Any]] = None
+        self.info_stamp: Stamp = None
+        self.readme_stamp: Stamp = None
+        self.modules: Dict[str, ModuleEntry] = {}
+
+    @property
+    def has_readme(self) -> bool:
+        return self.readme_stamp is not None
+
+
+class LanguageEntry:
+    """语言条目"""
+
+    __slots__ = ("name", "display_name", "path", "dir_stamp", "projects")
+
+    def __init__(self, name: str, display_name: str, path: Path):
+        self.name = name
+        self.display_name = display_name
+        self.path = path
+        self.dir_stamp: Stamp = None
+        self.projects: Dict[str, ProjectEntry] = {}
+
+
+class DocumentationCatalog:
+    """语言/项目/模块目录的内存缓存
+
+    列表类调用直接返回缓存视图；只有目录或元数据文件的标记变化时才重新
+    列目录或解析JSON，两次校验之间至少间隔 revalidate_interval 秒。
+    """
+
+    def __init__(self, mcp_root: Path, languages: List[Dict[str, Any]], revalidate_interval: float = 1.0):
+        self.mcp_root = Path(mcp_root)
+        self.revalidate_interval = revalidate_interval
+        self.languages: Dict[str, LanguageEntry] = {
+            lang_config["name"]: LanguageEntry(
+                lang_config["name"], lang_config["display_name"], self.mcp_root / lang_config["display_name"]
+            )
+            for lang_config in languages
+        }
+
+        # 目录内容变化时递增
+        self.version = 0
+        self._views: Dict[str, Any] = {}
+        self._views_version = -1
+        self._last_check = 0.0
+        self._dirty = True
+        self._lock = threading.RLock()
+
+    # ---------- 失效与刷新 ----------
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """标记缓存需要重新校验（文件监听器可直接调用）"""
+        self._dirty = True
+
+    def stale(self) -> bool:
+        """下一次查询是否需要重新校验目录标记（会产生stat调用）"""
+        return self._dirty or time.monotonic() - self._last_check >= self.revalidate_interval
+
+    def refresh(self, force: bool = False) -> bool:
+        """按需校验目录标记，返回内容是否发生变化"""
+        now = time.monotonic()
+        if not force and not self.stale():
+            return False
+
+        with self._lock:
+            self._dirty = False
+            self._last_check = now
+            changed = False
+            for language in self.languages.values():
+                changed |= self._refresh_language(language)
+            if changed:
+                self.version += 1
+                logger.debug(f"Catalog changed, version {self.version}")
+            return changed
+
+    def apply_changes(self, events) -> bool:
+        """文件监听器回调：只重新校验事件涉及的语言目录和项目"""
+        with self._lock:
+            changed = False
+            touched_languages = set()
+            touched_projects = set()
+            for event in events:
+                if event.kind == "rescan":
+                    return self.refresh(force=True)
+                try:
+                    parts = Path(event.path).relative_to(self.mcp_root).parts
+                except ValueError:
+                    continue
+                language = self._language_by_dir(parts[0]) if parts else None
+                if language is None:
+                    continue
+                if len(parts) <= 2:
+                    touched_languages.add(language.name)
+                if len(parts) >= 2:
+                    touched_projects.add((language.name, parts[1]))
+
+            for name in touched_languages:
+                changed |= self._refresh_language_listing(self.languages[name])
+            for language_name, project_name in touched_projects:
+                project = self.languages[language_name].projects.get(project_name)
+                if project is not None:
+                    changed |= self._refresh_project(project)
+
+            if changed:
+                self.version += 1
+                logger.debug(f"Catalog changed, version {self.version}")
+            return changed
+
+    def resource_uris_for(self, path: Path) -> List[str]:
+        """文件路径 → 受其内容影响的资源URI"""
+        try:
+            parts = Path(path).relative_to(self.mcp_root).parts
+        except ValueError:
+            return []
+        language = self._language_by_dir(parts[0]) if parts else None
+        if language is None or len(parts) < 3:
+            return []
+
+        project_uri = f"mcp-docs://project/{language.name}/{parts[1]}"
+        if len(parts) == 3:
+            if parts[2] == "README.md":
+                return [f"mcp-docs://readme/{language.name}/{parts[1]}", project_uri]
+            if parts[2] == "project-info.json":
+                return [project_uri]
+            return []
+
+        module_uri = f"mcp-docs://module/{language.name}/{parts[1]}/{parts[2]}"
+        if len(parts) == 4 and parts[3] == "metadata.json":
+            # 项目资源中包含模块元数据
+            return [module_uri, project_uri]
+        if len(parts) == 4 and parts[3] == "README.md":
+            return [module_uri]
+        return []
+
+    # ---------- 快照 ----------
+
+    def export_state(self) -> Dict[str, Any]:
+        """导出已解析的目录状态（含各文件标记），供其他进程直接恢复"""
+        self.refresh()
+        with self._lock:
+            return {
+                name: {
+                    "dir_stamp": language.dir_stamp,
+                    "projects": {
+                        project.name: {
+                            "dir_stamp": project.dir_stamp,
+                            "info": project.info,
+                            "info_stamp": project.info_stamp,
+                            "readme_stamp": project.readme_stamp,
+                            "modules": {
+                                module.name: [module.metadata, module.metadata_stamp, module.readme_stamp]
+                                for module in project.modules.values()
+                            },
+                        }
+                        for project in language.projects.values()
+                    },
+                }
+                for name, language in self.languages.items()
+            }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """从导出的状态恢复，不读取JSON文件；之后照常按标记校验"""
+        def stamp(value) -> Stamp:
+            return tuple(value) if value is not None else None
+
+        with self._lock:
+            for name, language_state in state.items():
+                language = self.languages.get(name)
+                if language is None:
+                    continue
+                language.dir_stamp = stamp(language_state["dir_stamp"])
+                language.projects = {}
+                for project_name, project_state in language_state["projects"].items():
+                    project = ProjectEntry(project_name, language.path / project_name)
+                    project.dir_stamp = stamp(project_state["dir_stamp"])
+                    project.info = project_state["info"]
+                    project.info_stamp = stamp(project_state["info_stamp"])
+                    project.readme_stamp = stamp(project_state["readme_stamp"])
+                    for module_name, (metadata, metadata_stamp, readme_stamp) in project_state["modules"].items():
+                        module = ModuleEntry(module_name, project.path / module_name)
+                        module.metadata = metadata
+                        module.metadata_stamp = stamp(metadata_stamp)
+                        module.readme_stamp = stamp(readme_stamp)
+                        project.modules[module_name] = module
+                    language.projects[project_name] = project
+            self.version += 1
+            self._dirty = False
+            self._last_check = time.monotonic()
+
+    def _language_by_dir(self, dir_name: str) -> Optional[LanguageEntry]:
+        for language in self.languages.values():
+            if language.display_name == dir_name:
+                return language
+        return None
+
+    def _refresh_language(self, language: LanguageEntry) -> bool:
+        """校验语言目录及其下所有项目"""
+        changed = self._refresh_language_listing(language)
+        for project in language.projects.values():
+            changed |= self._refresh_project(project)
+        return changed
+
+    def _refresh_language_listing(self, language: LanguageEntry) -> bool:
+        """语言目录本身变化时重新列出项目，新项目立即加载"""
+        changed = False
+        dir_stamp = _stamp(language.path)
+        if dir_stamp == language.dir_stamp:
+            return False
+
+        language.dir_stamp = dir_stamp
+        names = set()
+        if dir_stamp is not None:
+            names = {entry.name for entry in os.scandir(language.path) if entry.is_dir()}
+        for name in list(language.projects):
+            if name not in names:
+                del language.projects[name]
+                changed = True
+        for name in sorted(names - set(language.projects)):
+            project = ProjectEntry(name, language.path / name)
+            self._refresh_project(project)
+            language.projects[name] = project
+            changed = True
+        if changed:
+            language.projects = dict(sorted(language.projects.items()))
+        return changed
+
+    def _refresh_project(self, project: ProjectEntry) -> bool:
+        """校验项目目录与 project-info.json / README.md"""
+        changed = False
+
+        info_stamp = _stamp(project.path / "project-info.json")
+        if info_stamp != project.info_stamp:
+            project.info_stamp = info_stamp
+            project.info = _load_json(project.path / "project-info.json") if info_stamp else None
+            changed = True
+
+        readme_stamp = _stamp(project.path / "README.md")
+        if readme_stamp != project.readme_stamp:
+            # README内容不进入目录缓存，只影响资源列表
+            changed |= (readme_stamp is None) != (project.readme_stamp is None)
+            project.readme_stamp = readme_stamp
+
+        dir_stamp = _stamp(project.path)
+        if dir_stamp != project.dir_stamp:
+            project.dir_stamp = dir_stamp
+            names = set()
+            if dir_stamp is not None:
+                names = {entry.name for entry in os.scandir(project.path) if entry.is_dir()}
+            for name in list(project.modules):
+                if name not in names:
+                    del project.modules[name]
+                    changed = True
+            for name in sorted(names - set(project.modules)):
+                project.modules[name] = ModuleEntry(name, project.path / name)
+            project.modules = dict(sorted(project.modules.items()))
+
+        for name, module in list(project.modules.items()):
+            # README内容不进入目录缓存，标记仅用于资源响应缓存校验
+            module.readme_stamp = _stamp(module.path / "README.md")
+            metadata_stamp = _stamp(module.path / "metadata.json")
+            if metadata_stamp == module.metadata_stamp:
+                continue
+            module.metadata_stamp = metadata_stamp
+            module.metadata = (_load_json(module.path / "metadata.json") or {}) if metadata_stamp else {}
+            changed = True
+        if changed:
+            project.revision = next(_revisions)
+        return changed
+
+    # ---------- 查询 ----------
+
+    def language(self, name: str) -> Optional[LanguageEntry]:
+        """获取语言条目"""
+        self.refresh()
+        return self.languages.get(name)
+
+    def project(self, language: str, name: str) -> Optional[ProjectEntry]:
+        """获取项目条目"""
+        self.refresh()
+        lang_entry = self.languages.get(language)
+        if not lang_entry:
+            return None
+        return lang_entry.projects.get(name)
+
+    def modules(self, language: str, project: str) -> List[ModuleEntry]:
+        """获取项目下含 metadata.json 的模块"""
+        entry = self.project(language, project)
+        if not entry:
+            return []
+        return [module for module in entry.modules.values() if module.metadata_stamp is not None]
+
+    def module(self, language: str, project: str, name: str) -> Optional[ModuleEntry]:
+        """获取单个模块条目"""
+        entry = self.project(language, project)
+        if not entry:
+            return None
+        module = entry.modules.get(name)
+        if not module or module.metadata_stamp is None:
+            return None
+        return module
+
+    def project_list(self) -> List[Dict[str, Any]]:
+        """/projects 视图"""
+        return self._view("projects")
+
+    def project_list_for(self, language: str) -> List[Dict[str, Any]]:
+        """/projects/{language} 视图"""
+        return self._view("projects_by_language").get(language, [])
+
+    def module_list(self, language: str, project: str) -> List[Dict[str, Any]]:
+        """/modules/{language}/{project} 视图"""
+        return self._view("modules").get((language, project), [])
+
+    def resources(self) -> List[Dict[str, Any]]:
+        """MCP资源列表视图"""
+        return self._view("resources")
+
+    def _view(self, name: str) -> Any:
+        """读取缓存视图，目录版本变化后整体重建"""
+        self.refresh()
+        if self._views_version != self.version:
+            with self._lock:
+                self._views = self._build_views()
+                self._views_version = self.version
+        return self._views[name]
+
+    def _build_views(self) -> Dict[str, Any]:
+        """生成各列表接口使用的紧凑视图"""
+        projects: List[Dict[str, Any]] = []
+        projects_by_language: Dict[str, List[Dict[str, Any]]] = {}
+        modules: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        resources: List[Dict[str, Any]] = []
+
+        for language in self.languages.values():
+            language_projects = projects_by_language.setdefault(language.name, [])
+            for project in language.projects.values():
+                relative_path = str(project.path.relative_to(self.mcp_root))
+                project_metadata = (project.info or {}).get("project_metadata", {})
+                projects.append({
+                    "language": language.name,
+                    "language_display": language.display_name,
+                    "name": project.name,
+                    "path": relative_path,
+                    "metadata": project_metadata,
+                })
+                language_projects.append({
+                    "name": project.name,
+                    "path": relative_path,
+                    "metadata": project_metadata,
+                })
+
+                resources.append({
+                    "uri": f"mcp-docs://project/{language.name}/{project.name}",
+                    "name": f"项目: {project.name} ({language.name})",
+                    "description": f"{language.name}项目的完整文档和元数据",
+                    "mimeType": "application/json"
+                })
+                if project.has_readme:
+                    resources.append({
+                        "uri": f"mcp-docs://readme/{language.name}/{project.name}",
+                        "name": f"README: {project.name}",
+                        "description": f"{project.name}项目的README文档",
+                        "mimeType": "text/markdown"
+                    })
+
+                project_modules = modules.setdefault((language.name, project.name), [])
+                for module in project.modules.values():
+                    if module.metadata_stamp is None:
+                        continue
+                    project_modules.append({
+                        "name": module.name,
+                        "path": str(module.path.relative_to(self.mcp_root)),
+                        "metadata": module.metadata.get("module_metadata", {}),
+                    })
+                    resources.append({
+                        "uri": f"mcp-docs://module/{language.name}/{project.name}/{module.name}",
+                        "name": f"模块: {module.name}",
+                        "description": f"{project.name}项目中的{module.name}模块",
+                        "mimeType": "application/json"
+                    })
+
+        return {
+            "projects": projects,
+            "projects_by_language": projects_by_language,
+            "modules": modules,
+            "resources": resources,
+        }
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown分块
+按标题层级把文档切成可单独寻址的片段，超出词元预算的章节再按段落拆分
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from tokenizer import estimate_tokens
+
+CHUNK_URI_PREFIX = "mcp-docs://chunk/"
+TOC_URI_PREFIX = "mcp-docs://toc/"
+
+# 未配置 ai_integration.context_windows 时的默认预算
+DEFAULT_CONTEXT_WINDOWS = {
+    "project_context": 4000,
+    "module_context": 2000,
+    "api_context": 1000,
+}
+
+_HEADING_LINE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_LINE = re.compile(r"^\s*(```|~~~)")
+_SLUG_STRIP = re.compile(r"[^\w\- ]")
+
+
+class Chunk:
+    """文档片段"""
+
+    __slots__ = ("chunk_id", "title", "trail", "level", "start", "end", "text", "tokens")
+
+    def __init__(self, chunk_id: str, title: str, trail: List[str], level: int, start: int, text: str):
+        self.chunk_id = chunk_id
+        self.title = title
+        # 从一级标题到本节的标题路径
+        self.trail = trail
+        self.level = level
+        self.start = start
+        self.end = start + len(text)
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+    def summary(self, uri: str) -> Dict:
+        """不含正文的片段描述"""
+        return {
+            "uri": uri,
+            "id": self.chunk_id,
+            "title": self.title,
+            "trail": self.trail,
+            "tokens": self.tokens,
+        }
+
+
+def chunk_uri(language: str, project: str, relative_path: str, chunk_id: str) -> str:
+    """mcp-docs://chunk/{language}/{project}/{path}/{chunk}"""
+    return f"{CHUNK_URI_PREFIX}{language}/{project}/{relative_path}/{chunk_id}"
+
+
+def parse_chunk_path(parts: List[str], has_chunk: bool = True) -> Tuple[str, str, str, Optional[str]]:
+    """解析 chunk/toc URI 去掉类型后的路径段，返回 (language, project, 相对路径, 片段ID)
+
+    相对路径可以包含多级目录；toc URI 没有片段ID段。
+    """
+    parts = [unquote(part) for part in parts]
+    if len(parts) < (4 if has_chunk else 3) or not all(parts) or ".." in parts:
+        raise ValueError(f"无效的文档片段路径: {'/'.join(parts)}")
+    if has_chunk:
+        return parts[0], parts[1], "/".join(parts[2:-1]), parts[-1]
+    return parts[0], parts[1], "/".join(parts[2:]), None
+
+
+def context_budget(relative_path: str, context_windows: Dict[str, int]) -> int:
+    """按文件类型选取词元预算：项目README、模块文档、API文档"""
+    windows = {**DEFAULT_CONTEXT_WINDOWS, **context_windows}
+    name = relative_path.rsplit("/", 1)[-1].lower()
+    if name.startswith("api"):
+        return windows["api_context"]
+    if "/" in relative_path:
+        return windows["module_context"]
+    return windows["project_context"]
+
+
+def slugify(title: str) -> str:
+    """GitHub风格锚点：小写、去标点、空格转连字符（保留中文）"""
+    return _SLUG_STRIP.sub("", title.strip().lower()).replace(" ", "-") or "section"
+
+
+def chunk_markdown(text: str, max_tokens: int) -> List[Chunk]:
+    """按标题切分Markdown
+
+    每个标题开始一个新片段，片段ID为去重后的标题锚点，首个标题前的内容为 "preamble"；
+    代码块内的 # 行不视为标题。超过 max_tokens 的章节按段落拆成 "{锚点}-part-N"。
+    """
+    sections: List[Tuple[str, int, int, List[str]]] = []
+    trail: List[Tuple[int, str]] = []
+    title, level, start = "", 0, 0
+    in_fence = False
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        if _FENCE_LINE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = _HEADING_LINE.match(line.rstrip("\r\n"))
+            if match:
+                if offset > start:
+                    sections.append((title, level, start, [name for _, name in trail]))
+                level = len(match.group(1))
+                title = match.group(2)
+                while trail and trail[-1][0] >= level:
+                    trail.pop()
+                trail.append((level, title))
+                start = offset
+        offset += len(line)
+    if offset > start or not sections:
+        sections.append((title, level, start, [name for _, name in trail]))
+
+    chunks: List[Chunk] = []
+    used: Dict[str, int] = {}
+    for index, (title, level, start, section_trail) in enumerate(sections):
+        end = sections[index + 1][2] if index + 1 < len(sections) else len(text)
+        body = text[start:end]
+        anchor = _unique(slugify(title) if title else "preamble", used)
+        pieces = _split_section(body, max_tokens)
+        for part, (piece_start, piece) in enumerate(pieces, 1):
+            chunk_id = anchor if part == 1 else _unique(f"{anchor}-part-{part}", used)
+            chunks.append(Chunk(chunk_id, title, section_trail, level, start + piece_start, piece))
+    return chunks
+
+
+def _unique(anchor: str, used: Dict[str, int]) -> str:
+    """重复锚点依次追加 -1、-2（与GitHub一致）"""
+    count = used.get(anchor)
+    used[anchor] = (count or 0) + 1
+    if count is None:
+        return anchor
+    candidate = f"{anchor}-{count}"
+    return _unique(candidate, used) if candidate in used else candidate
+
+
+def _split_section(body: str, max_tokens: int) -> List[Tuple[int, str]]:
+    """把超出预算的章节按段落（代码块不拆）贪心合并成若干块，返回 (相对偏移, 文本)"""
+    if estimate_tokens(body) <= max_tokens:
+        return [(0, body)]
+
+    # 段落边界：代码块外的空行
+    blocks: List[Tuple[int, str]] = []
+    block_start = 0
+    in_fence = False
+    offset = 0
+    for line in body.splitlines(keepends=True):
+        if _FENCE_LINE.match(line):
+            in_fence = not in_fence
+        offset += len(line)
+        if not in_fence and not line.strip():
+            blocks.append((block_start, body[block_start:offset]))
+            block_start = offset
+    if block_start < len(body):
+        blocks.append((block_start, body[block_start:]))
+
+    pieces: List[Tuple[int, str]] = []
+    current_start, current, current_tokens = 0, "", 0
+    for block_start, block in blocks:
+        for sub_start, sub in _hard_split(block_start, block, max_tokens):
+            tokens = estimate_tokens(sub)
+            if current and current_tokens + tokens > max_tokens:
+                pieces.append((current_start, current))
+                current_start, current, current_tokens = sub_start, "", 0
+            current += sub
+            current_tokens += tokens
+    if current:
+        pieces.append((current_start, current))
+    return pieces
+
+
+def _hard_split(start: int, block: str, max_tokens: int) -> List[Tuple[int, str]]:
+    """单个段落仍超出预算时按行切分，单行超出时按字符切分"""
+    if estimate_tokens(block) <= max_tokens:
+        return [(start, block)]
+    result: List[Tuple[int, str]] = []
+    offset = start
+    for line in block.splitlines(keepends=True):
+        if estimate_tokens(line) <= max_tokens:
+            result.append((offset, line))
+        else:
+            # 按最坏情况（每个字符1个词元）切分
+            for i in range(0, len(line), max_tokens):
+                result.append((offset + i, line[i:i + max_tokens]))
+        offset += len(line)
+    return result
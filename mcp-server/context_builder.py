@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上下文组装
+在词元预算内贪心装入与查询最相关的文档片段、模块元数据和API文档，结果按查询缓存
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from catalog import DocumentationCatalog
+from chunking import Chunk, chunk_uri
+from progress import ProgressReporter
+from search_index import SearchIndex
+from tokenizer import estimate_tokens, tokenize
+
+# 参与组装的命中文档数
+DEFAULT_MAX_DOCUMENTS = 20
+
+# API文档片段相对普通片段的加权
+_API_BOOST = 1.2
+# 与查询无关的模块元数据仍可作为低优先级补充
+_BACKGROUND_SCORE = 0.01
+
+# (language, project, 相对路径) → 片段列表
+ChunkLoader = Callable[[str, str, str], List[Chunk]]
+
+
+class ContextBuilder:
+    """按词元预算组装项目上下文"""
+
+    def __init__(self, search_index: SearchIndex, catalog: DocumentationCatalog, chunk_loader: ChunkLoader,
+                 default_budget: int = 4000, max_documents: int = DEFAULT_MAX_DOCUMENTS,
+                 cache_entries: int = 128):
+        self.search_index = search_index
+        self.catalog = catalog
+        self.chunk_loader = chunk_loader
+        self.default_budget = default_budget
+        self.max_documents = max_documents
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[Tuple, Tuple[Hashable, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def build(self, language: str, project: str, query: str, budget: Optional[int] = None,
+              reporter: Optional[ProgressReporter] = None) -> Dict[str, Any]:
+        """组装上下文；索引或目录变化前相同 (项目, 查询, 预算) 直接返回缓存结果"""
+        budget = max(1, int(budget or self.default_budget))
+        query_hash = hashlib.sha256(" ".join(tokenize(query)).encode("utf-8")).hexdigest()[:16]
+        key = (language, project, query_hash, budget)
+        stamp = (self.search_index.generation, self.catalog.version)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return {**cached[1], "query": query}
+            self.misses += 1
+
+        result = self._assemble(language, project, query, budget, reporter or ProgressReporter())
+        with self._lock:
+            self._cache[key] = (stamp, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    def _assemble(self, language: str, project: str, query: str, budget: int,
+                  reporter: ProgressReporter) -> Dict[str, Any]:
+        project_entry = self.catalog.project(language, project)
+        if not project_entry:
+            raise FileNotFoundError(f"项目未找到: {language}/{project}")
+
+        terms = set(tokenize(query))
+        weights = {term: self.search_index.idf.get(term, 0.0) for term in terms}
+        total_weight = sum(weights.values()) or 1.0
+
+        # 候选项：(分数, 顺序号, 条目)；顺序号保证同分时结果稳定
+        candidates: List[Tuple[float, int, Dict[str, Any]]] = []
+
+        project_metadata = (project_entry.info or {}).get("project_metadata", {})
+        overview = self._item("project", f"mcp-docs://project/{language}/{project}", project,
+                              metadata=project_metadata)
+
+        for module in self.catalog.modules(language, project):
+            metadata = module.metadata.get("module_metadata", {}) if module.metadata else {}
+            if not metadata:
+                continue
+            coverage = self._coverage(json.dumps(metadata, ensure_ascii=False), weights, total_weight)
+            candidates.append((coverage or _BACKGROUND_SCORE, len(candidates), self._item(
+                "module", f"mcp-docs://module/{language}/{project}/{module.name}", module.name,
+                metadata=metadata)))
+
+        ranked = self.search_index.rank(query, language=language, project=project, limit=self.max_documents)
+        top_score = ranked[0][1] if ranked else 1.0
+        for step, (doc_id, score) in enumerate(ranked):
+            reporter.check()
+            reporter.update(step, len(ranked), "ranking chunks")
+            relative_path = self.search_index.docs[doc_id]["relative_path"]
+            try:
+                chunks = self.chunk_loader(language, project, relative_path)
+            except (OSError, ValueError):
+                continue
+            is_api = relative_path.rsplit("/", 1)[-1].lower().startswith("api")
+            for chunk in chunks:
+                coverage = self._coverage(chunk.text, weights, total_weight)
+                if not coverage:
+                    continue
+                relevance = score / top_score * coverage * (_API_BOOST if is_api else 1.0)
+                candidates.append((relevance, len(candidates), self._item(
+                    "api" if is_api else "chunk", chunk_uri(language, project, relative_path, chunk.chunk_id),
+                    chunk.title or relative_path, text=chunk.text, tokens=chunk.tokens, file=relative_path)))
+        reporter.update(len(ranked), len(ranked))
+
+        # 项目概览始终放在最前面，其余按相关度贪心装入，放不下的跳过继续尝试更小的条目
+        items: List[Dict[str, Any]] = []
+        used = 0
+        omitted = 0
+        if overview["tokens"] <= budget:
+            items.append(overview)
+            used += overview["tokens"]
+        for relevance, _, item in sorted(candidates, key=lambda candidate: (-candidate[0], candidate[1])):
+            if used + item["tokens"] > budget:
+                omitted += 1
+                continue
+            item["relevance"] = round(relevance, 4)
+            items.append(item)
+            used += item["tokens"]
+
+        return {
+            "language": language,
+            "project": project,
+            "query": query,
+            "budget": budget,
+            "used_tokens": used,
+            "omitted": omitted,
+            "items": items,
+        }
+
+    @staticmethod
+    def _item(kind: str, uri: str, title: str, text: Optional[str] = None, tokens: Optional[int] = None,
+              file: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"kind": kind, "uri": uri, "title": title}
+        if file is not None:
+            item["file"] = file
+        if metadata is not None:
+            item["metadata"] = metadata
+            tokens = estimate_tokens(json.dumps(metadata, ensure_ascii=False))
+        if text is not None:
+            item["text"] = text
+        item["tokens"] = tokens if tokens is not None else estimate_tokens(text or "")
+        return item
+
+    @staticmethod
+    def _coverage(text: str, weights: Dict[str, float], total_weight: float) -> float:
+        """文本覆盖的查询词权重占比"""
+        present = set(tokenize(text)) & weights.keys()
+        return sum(weights[term] for term in present) / total_weight
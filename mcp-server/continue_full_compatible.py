@@ -12,6 +12,8 @@
 import asyncio
 import json
 import sys
+import threading
+import time
 from pathlib import Path
 
 # 确保MCP库可用
@@ -25,12 +27,88 @@ except ImportError:
     print("MCP library not found. Please install with: pip install mcp")
     sys.exit(1)
 
+from file_watcher import ChangeEvent
+from search_index import SearchIndex
+
 # 创建服务器实例
 server = Server("mcp-documentation")
 
 # 全局变量存储MCP根目录
 mcp_root = Path("D:/data/MCP/mcp-docs")
 
+# 搜索索引（首次搜索时构建）
+search_index = None
+_search_index_lock = threading.Lock()
+_search_index_checked = 0.0
+
+# 语言以目录名区分，与 MCPDocumentationServer 按配置映射的索引布局不同，单独存放以免互相判定过期并覆盖
+INDEX_FILENAME = "search-index.continue.json"
+# 两次比较文件签名的最短间隔（秒）
+REVALIDATE_INTERVAL = 1.0
+
+
+def get_search_index() -> SearchIndex:
+    """获取搜索索引，语言以目录名区分
+
+    会扫描目录并读写索引文件，需在工作线程中调用。距上次检查超过 REVALIDATE_INTERVAL 时
+    重新比较文件签名，只重新索引新增、修改和删除的文件；语言目录增减时重建。
+    """
+    global search_index, _search_index_checked
+    with _search_index_lock:
+        now = time.monotonic()
+        if search_index is not None and now - _search_index_checked < REVALIDATE_INTERVAL:
+            return search_index
+        language_dirs = {
+            lang_dir.name: lang_dir
+            for lang_dir in sorted(mcp_root.glob("*"))
+            if lang_dir.is_dir() and lang_dir.name != "templates"
+        }
+        if search_index is None or search_index.language_dirs != language_dirs:
+            search_index = SearchIndex(mcp_root, language_dirs, index_path=mcp_root / INDEX_FILENAME).load_or_build()
+        else:
+            _apply_signature_changes(search_index)
+        _search_index_checked = time.monotonic()
+        return search_index
+
+
+def _apply_signature_changes(index: SearchIndex) -> None:
+    """把当前文件签名与索引签名的差异作为变更事件增量应用"""
+    current = index._scan_signature()
+    if current == index.signature:
+        return
+    events = [
+        ChangeEvent("deleted" if path not in current else "modified" if path in index.signature else "created",
+                    mcp_root / path)
+        for path in sorted(set(current) | set(index.signature))
+        if current.get(path) != index.signature.get(path)
+    ]
+    index.apply_changes(events)
+    if index.dirty:
+        index.save()
+
+
+def _search(query: str, language: str, limit: int) -> list:
+    """关键词检索并生成摘要（在工作线程中执行）"""
+    index = get_search_index()
+    expanded = index.expand_query(query)
+    terms = expanded[0]
+    results = []
+    for doc_id, score in index.rank(query, language=None if language == "all" else language, limit=limit,
+                                    expanded=expanded):
+        doc = index.docs[doc_id]
+        snippets, preview, chunk = index.snippets(doc_id, terms)
+        results.append({
+            "language": doc["language"],
+            "project": doc["project"],
+            "file": doc["relative_path"],
+            "match": query,
+            "score": round(score, 4),
+            "preview": preview,
+            "snippets": snippets,
+            "chunk": chunk
+        })
+    return results
+
 # ========== 场景1: Continue客户端依赖的基础方法 ==========
 
 @server.list_resources()
@@ -101,6 +179,12 @@ async def handle_list_tools() -> list[types.Tool]:
                         "type": "string",
                         "description": "编程语言（可选）",
                         "enum": ["Java", "GDScript", "all"]
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "返回的最大结果数（可选，默认20）",
+                        "minimum": 1,
+                        "maximum": 100
                     }
                 },
                 "required": ["query"]
@@ -456,32 +540,14 @@ API接口文档说明。
 async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent]:
     """调用工具"""
     if name == "search_documentation":
-        query = arguments.get("query", "").lower()
+        query = arguments.get("query", "")
         language = arguments.get("language", "all")
+        limit = max(1, min(int(arguments.get("limit", 20)), 100))
         results = []
         
         if mcp_root.exists():
-            for lang_dir in mcp_root.glob("*"):
-                if lang_dir.is_dir() and lang_dir.name != "templates":
-                    if language != "all" and language != lang_dir.name:
-                        continue
-                        
-                    for project_dir in lang_dir.glob("*"):
-                        if project_dir.is_dir():
-                            for file_path in project_dir.rglob("*.md"):
-                                if file_path.exists():
-                                    try:
-                                        content = file_path.read_text(encoding='utf-8')
-                                        if query in content.lower():
-                                            results.append({
-                                                "language": lang_dir.name,
-                                                "project": project_dir.name,
-                                                "file": str(file_path.relative_to(project_dir)),
-                                                "match": query,
-                                                "preview": content[:300] + "..." if len(content) > 300 else content
-                                            })
-                                    except:
-                                        pass
+            # 构建、重新校验索引与打分都在工作线程中进行，不阻塞事件循环
+            results = await asyncio.to_thread(_search, query, language, limit)
         
         return [types.TextContent(
             type="text", 
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+依赖图
+节点编号 + 邻接数组的内存依赖图，按项目打补丁；提供传递闭包、环检测与拓扑排序，
+查询结果缓存到受影响的依赖边变化为止
+"""
+
+from array import array
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from dependency_index import DependencyIndex, NodeKey
+
+DEPENDENCIES = "dependencies"
+DEPENDENTS = "dependents"
+
+DEFAULT_CLOSURE_CACHE = 1024
+
+Owner = Tuple[str, str]
+
+
+def node_id(key: NodeKey) -> str:
+    """dependency-graph.json 中的节点ID：java/shop、java/shop/cart、library:log4j"""
+    return f"library:{key[1]}" if key[0] == "library" else "/".join(key[1:])
+
+
+class DependencyGraph:
+    """依赖图（依赖方 → 被依赖方）
+
+    节点键映射为连续编号，每个节点保存出边/入边数组；每个项目拥有的边单独记录，
+    项目变化时只撤销并重新加入该项目的边。非线程安全，由调用方串行访问。
+
+    缓存失效规则：
+    - 传递闭包：记录遍历到的节点集合，变化的边的起点（向下）或终点（向上）落在集合内才失效；
+    - 环与拓扑序：一次Tarjan计算得到强连通分量及其依赖优先的顺序，
+      只有删除分量内部的边、或新增的边与现有顺序相反（可能成环）时才失效。
+    """
+
+    def __init__(self, closure_cache: int = DEFAULT_CLOSURE_CACHE):
+        self._ids: Dict[NodeKey, int] = {}
+        self._keys: List[NodeKey] = []
+        self._out: List[array] = []
+        self._in: List[array] = []
+        # 节点被边或项目声明引用的次数，为0的节点不出现在查询结果中
+        self._refs: List[int] = []
+        self._edges: Dict[Owner, List[Tuple[int, int]]] = {}
+        self._nodes: Dict[Owner, List[int]] = {}
+        self.closure_cache = closure_cache
+        # (起点, 方向) → (可达节点及距离, 遍历到的节点集合)
+        self._closures: "OrderedDict[Tuple[Tuple[int, ...], str], Tuple[List[Tuple[NodeKey, int]], FrozenSet[int]]]" = \
+            OrderedDict()
+        # (节点 → 分量编号, 依赖优先顺序的分量列表)
+        self._structure: Optional[Tuple[List[int], List[List[int]]]] = None
+        # 由 _structure 派生的环与拓扑序，随 _structure 一起失效
+        self._cycles: Optional[List[List[NodeKey]]] = None
+        self._order: Optional[List[NodeKey]] = None
+        self.version = 0
+        self.synced_generation = 0
+        self.patches = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: NodeKey) -> bool:
+        node = self._ids.get(key)
+        return node is not None and self._refs[node] > 0
+
+    # ---------- 增量维护 ----------
+
+    def sync(self, index: DependencyIndex) -> bool:
+        """按依赖索引的变更记录为变化的项目打补丁，返回图是否变化"""
+        if index.generation == self.synced_generation:
+            return False
+        changed = False
+        with index._lock:
+            for owner, generation in index.changes.items():
+                if generation > self.synced_generation:
+                    edges, nodes = index.graph_edges(owner)
+                    changed |= self.patch(owner, edges, nodes)
+            self.synced_generation = index.generation
+        return changed
+
+    def patch(self, owner: Owner, edges: Sequence[Tuple[NodeKey, NodeKey]], nodes: Sequence[NodeKey]) -> bool:
+        """用项目的新边集与节点集替换旧的，返回是否有变化"""
+        new_edges = list(dict.fromkeys((self._id(source), self._id(target)) for source, target in edges))
+        new_nodes = [self._id(key) for key in nodes]
+        old_edges = self._edges.get(owner, [])
+        old_nodes = self._nodes.get(owner, [])
+        if new_edges == old_edges and new_nodes == old_nodes:
+            return False
+
+        new_set, old_set = set(new_edges), set(old_edges)
+        removed = old_set - new_set
+        added = new_set - old_set
+        for source, target in removed:
+            self._out[source].remove(target)
+            self._in[target].remove(source)
+        for source, target in added:
+            self._out[source].append(target)
+            self._in[target].append(source)
+
+        # 引用计数：新的先加后减，节点不会短暂归零
+        appeared = []
+        for node in self._endpoints(new_edges, new_nodes):
+            if self._refs[node] == 0:
+                appeared.append(node)
+            self._refs[node] += 1
+        vanished = []
+        for node in self._endpoints(old_edges, old_nodes):
+            self._refs[node] -= 1
+            if self._refs[node] == 0:
+                vanished.append(node)
+
+        if new_edges or new_nodes:
+            self._edges[owner] = new_edges
+            self._nodes[owner] = new_nodes
+        else:
+            self._edges.pop(owner, None)
+            self._nodes.pop(owner, None)
+
+        self._invalidate(removed, added, appeared, vanished)
+        self.version += 1
+        self.patches += 1
+        return True
+
+    def _id(self, key: NodeKey) -> int:
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._out.append(array("I"))
+            self._in.append(array("I"))
+            self._refs.append(0)
+        return node
+
+    @staticmethod
+    def _endpoints(edges: List[Tuple[int, int]], nodes: List[int]) -> List[int]:
+        return [node for edge in edges for node in edge] + nodes
+
+    def _invalidate(self, removed: set, added: set, appeared: List[int], vanished: List[int]) -> None:
+        changed = removed | added
+        if self._closures and changed:
+            sources = {source for source, _ in changed}
+            targets = {target for _, target in changed}
+            for cache_key, (_, visited) in list(self._closures.items()):
+                touched = sources if cache_key[1] == DEPENDENCIES else targets
+                if not visited.isdisjoint(touched):
+                    del self._closures[cache_key]
+
+        if appeared or vanished:
+            # 拓扑序只列出被引用的节点
+            self._order = None
+        if any(source == target for source, target in added):
+            # 自环不改变分量，但使单节点分量成为环
+            self._cycles = None
+        if self._structure is None:
+            return
+        component = self._structure[0]
+        known = len(component)
+        if any(node >= known for node in appeared):
+            self._structure = None
+        elif any(component[source] == component[target] for source, target in removed):
+            # 分量内部的边被删除，环可能被打破
+            self._structure = None
+        elif any(source >= known or target >= known or component[target] > component[source]
+                 for source, target in added):
+            # 依赖优先顺序中被依赖方本应在前；反向的新边可能成环
+            self._structure = None
+        if self._structure is None:
+            self._cycles = None
+            self._order = None
+
+    # ---------- 查询 ----------
+
+    def closure(self, keys: Sequence[NodeKey], direction: str = DEPENDENCIES) -> List[Tuple[NodeKey, int]]:
+        """从 keys 出发沿依赖（向下）或被依赖（向上）方向可达的节点及最短距离，不含起点"""
+        starts = tuple(sorted(self._ids[key] for key in keys if key in self))
+        if not starts:
+            return []
+        cache_key = (starts, direction)
+        cached = self._closures.get(cache_key)
+        if cached is not None:
+            self._closures.move_to_end(cache_key)
+            self.hits += 1
+            return list(cached[0])
+
+        self.misses += 1
+        adjacency = self._out if direction == DEPENDENCIES else self._in
+        depth = {node: 0 for node in starts}
+        queue = deque(starts)
+        while queue:
+            node = queue.popleft()
+            for neighbor in adjacency[node]:
+                if neighbor not in depth:
+                    depth[neighbor] = depth[node] + 1
+                    queue.append(neighbor)
+        reached = sorted(((self._keys[node], distance) for node, distance in depth.items() if distance),
+                         key=lambda item: (item[1], item[0]))
+        self._closures[cache_key] = (reached, frozenset(depth))
+        if len(self._closures) > self.closure_cache:
+            self._closures.popitem(last=False)
+        return list(reached)
+
+    def cycles(self) -> List[List[NodeKey]]:
+        """依赖环：节点数大于1或有自环的强连通分量，成员按键排序"""
+        _, components = self._components()
+        if self._cycles is None:
+            cycles = []
+            for members in components:
+                if len(members) > 1 or members[0] in self._out[members[0]]:
+                    cycles.append(sorted(self._keys[node] for node in members))
+            self._cycles = sorted(cycles)
+        return [list(cycle) for cycle in self._cycles]
+
+    def topological_order(self) -> List[NodeKey]:
+        """依赖优先的拓扑序（被依赖方在前）；环内节点相邻排列、按键排序"""
+        _, components = self._components()
+        if self._order is None:
+            order = []
+            for members in components:
+                order.extend(sorted(self._keys[node] for node in members if self._refs[node] > 0))
+            self._order = order
+        return list(self._order)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "nodes": sum(1 for refs in self._refs if refs > 0),
+            "edges": sum(len(edges) for edges in self._edges.values()),
+            "version": self.version,
+            "patches": self.patches,
+            "closure_cache": len(self._closures),
+            "hits": self.hits,
+            "misses": self.misses,
+            "structure_cached": self._structure is not None,
+        }
+
+    def _components(self) -> Tuple[List[int], List[List[int]]]:
+        """Tarjan强连通分量（迭代实现）；分量在其可达分量之后产生，即依赖优先顺序"""
+        if self._structure is not None:
+            self.hits += 1
+            return self._structure
+        self.misses += 1
+
+        count = len(self._keys)
+        index = [-1] * count
+        low = [0] * count
+        on_stack = [False] * count
+        component = [-1] * count
+        components: List[List[int]] = []
+        stack: List[int] = []
+        counter = 0
+        for root in sorted(range(count), key=self._keys.__getitem__):
+            if index[root] != -1 or self._refs[root] == 0:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+            while work:
+                node, position = work[-1]
+                neighbors = self._out[node]
+                if position < len(neighbors):
+                    work[-1] = (node, position + 1)
+                    neighbor = neighbors[position]
+                    if index[neighbor] == -1:
+                        index[neighbor] = low[neighbor] = counter
+                        counter += 1
+                        stack.append(neighbor)
+                        on_stack[neighbor] = True
+                        work.append((neighbor, 0))
+                    elif on_stack[neighbor]:
+                        low[node] = min(low[node], index[neighbor])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = len(components)
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(members)
+
+        # 无引用的节点不参与排序，但需要分量编号以便失效判断
+        for node in range(count):
+            if component[node] == -1:
+                component[node] = len(components)
+                components.append([node])
+        self._structure = (component, components)
+        return self._structure
+
+
+def graph_document(index: DependencyIndex, graph: DependencyGraph) -> Dict[str, Any]:
+    """dependency-graph.json 的内容：节点与边按ID排序，附带依赖环"""
+    nodes: Dict[str, Dict[str, Any]] = {}
+    edges = []
+    with index._lock:
+        for owner in sorted(index.changes):
+            graph_edges, graph_nodes = index.graph_edges(owner)
+            for key in graph_nodes:
+                nodes[node_id(key)] = dict(index.node(key), id=node_id(key))
+            for source, target in graph_edges:
+                for key in (source, target):
+                    if node_id(key) not in nodes:
+                        nodes[node_id(key)] = dict(index.node(key), id=node_id(key))
+                attrs = index.forward.get(source, {}).get(target)
+                edge = {"from": node_id(source), "to": node_id(target),
+                        "type": attrs.get("scope", "depends_on") if attrs is not None else "contains"}
+                if attrs is not None and attrs.get("version"):
+                    edge["version"] = attrs["version"]
+                edges.append(edge)
+    return {
+        "nodes": [nodes[key] for key in sorted(nodes)],
+        "edges": sorted(edges, key=lambda edge: (edge["from"], edge["to"])),
+        "cycles": [[node_id(key) for key in cycle] for cycle in graph.cycles()],
+        "generated_at": datetime.now().isoformat(),
+    }
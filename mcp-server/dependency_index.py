@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+依赖反向索引
+从 project-info.json 与 metadata.json 提取 项目/模块 → 第三方库、模块 → 模块 的依赖边，
+同时维护正向表（依赖了什么）与反向表（被谁依赖）；目录变化时只重新提取修订号变化的项目
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from catalog import DocumentationCatalog, ProjectEntry
+
+# 节点键：("library", 规范化库名) / ("project", 语言, 项目) / ("module", 语言, 项目, 模块)
+NodeKey = Tuple[str, ...]
+# 依赖边：(依赖方, 被依赖方, 属性)
+Edge = Tuple[NodeKey, NodeKey, Dict[str, Any]]
+
+_TYPE_ORDER = {"project": 0, "module": 1, "library": 2}
+
+
+def library_key(name: str) -> NodeKey:
+    """库名不区分大小写"""
+    return ("library", name.strip().lower())
+
+
+def project_key(language: str, project: str) -> NodeKey:
+    return ("project", language, project)
+
+
+def module_key(language: str, project: str, module: str) -> NodeKey:
+    return ("module", language, project, module)
+
+
+def _version(value: Any) -> Optional[str]:
+    """模板占位符（如 {library_version}）视为未填写"""
+    if not isinstance(value, str) or not value.strip() or value.startswith("{"):
+        return None
+    return value.strip()
+
+
+def project_edges(language: str, project: ProjectEntry) -> Tuple[List[Edge], Dict[NodeKey, Dict[str, Any]]]:
+    """单个项目贡献的依赖边，以及项目内节点的描述（均来自目录缓存，不读文件）
+
+    - 项目 → 库：technology_stack 的 dependencies（scope=runtime）与 dev_dependencies（scope=dev）
+    - 模块 → 库：metadata.json 的 technical_details.dependencies.external（scope=external）
+    - 模块 → 模块：metadata.json 的 internal 与 project-info.json 中 modules[].dependencies，
+      模块名在同一项目内解析（scope=internal）
+    """
+    info = project.info or {}
+    source = project_key(language, project.name)
+    nodes: Dict[NodeKey, Dict[str, Any]] = {
+        source: {"type": "project", "language": language, "project": project.name,
+                 "uri": f"mcp-docs://project/{language}/{project.name}"},
+    }
+    edges: Dict[Tuple[NodeKey, NodeKey], Dict[str, Any]] = {}
+
+    def add(source_key: NodeKey, target_key: NodeKey, **attrs) -> None:
+        merged = edges.setdefault((source_key, target_key), {})
+        merged.update({name: value for name, value in attrs.items() if value is not None})
+
+    declared = {entry["name"]: entry for entry in info.get("modules", [])
+                if isinstance(entry, dict) and isinstance(entry.get("name"), str)}
+
+    def module_node(name: str) -> NodeKey:
+        key = module_key(language, project.name, name)
+        if key not in nodes:
+            entry = project.modules.get(name)
+            documented = entry is not None and entry.metadata_stamp is not None
+            metadata = (entry.metadata or {}).get("module_metadata", {}) if documented else {}
+            nodes[key] = {"type": "module", "language": language, "project": project.name, "module": name,
+                          "uri": (f"mcp-docs://module/{language}/{project.name}/{name}" if documented
+                                  else f"mcp-docs://project/{language}/{project.name}")}
+            status = metadata.get("status") or declared.get(name, {}).get("status")
+            if isinstance(status, str) and status:
+                nodes[key]["status"] = status
+        return key
+
+    stack = info.get("technology_stack", {})
+    for field, scope in (("dependencies", "runtime"), ("dev_dependencies", "dev")):
+        for dep in stack.get(field, []):
+            if isinstance(dep, dict) and isinstance(dep.get("name"), str) and dep["name"].strip():
+                add(source, library_key(dep["name"]), scope=scope, library=dep["name"].strip(),
+                    version=_version(dep.get("version")))
+
+    for entry in declared.values():
+        module = module_node(entry["name"])
+        for dep in entry.get("dependencies", []):
+            if isinstance(dep, str) and dep and dep != entry["name"]:
+                add(module, module_node(dep), scope="internal")
+
+    for name, entry in project.modules.items():
+        if entry.metadata_stamp is None:
+            continue
+        module = module_node(name)
+        deps = (entry.metadata or {}).get("technical_details", {}).get("dependencies", {})
+        for dep in deps.get("external", []):
+            if isinstance(dep, dict) and isinstance(dep.get("library"), str) and dep["library"].strip():
+                add(module, library_key(dep["library"]), scope="external", library=dep["library"].strip(),
+                    version=_version(dep.get("version")))
+        for dep in deps.get("internal", []):
+            if isinstance(dep, dict) and isinstance(dep.get("module"), str) and dep["module"] not in ("", name):
+                add(module, module_node(dep["module"]), scope="internal",
+                    strength=dep.get("type") if dep.get("type") in ("strong", "weak") else None)
+
+    return [(source_key, target_key, attrs) for (source_key, target_key), attrs in edges.items()], nodes
+
+
+class DependencyIndex:
+    """全部项目的依赖正向/反向表
+
+    每个项目记录提取时的修订号（目录缓存在 project-info.json 或 metadata.json 变化时更新）；
+    目录缓存版本变化后逐项目比较修订号，只撤销并重新加入变化项目的依赖边。
+    """
+
+    def __init__(self, catalog: DocumentationCatalog):
+        self.catalog = catalog
+        # 依赖方 → {被依赖方: 边属性}
+        self.forward: Dict[NodeKey, Dict[NodeKey, Dict[str, Any]]] = {}
+        # 被依赖方 → {依赖方: 边属性}
+        self.reverse: Dict[NodeKey, Dict[NodeKey, Dict[str, Any]]] = {}
+        self._edges: Dict[Tuple[str, str], List[Edge]] = {}
+        self._nodes: Dict[Tuple[str, str], Dict[NodeKey, Dict[str, Any]]] = {}
+        self._revisions: Dict[Tuple[str, str], int] = {}
+        # 库规范化名 → 各写法的引用次数（展示时取最常见的写法）
+        self._spellings: Dict[str, Dict[str, int]] = {}
+        self._version = -1
+        self._lock = threading.Lock()
+        # 依赖边变化时递增（依赖图等派生结构据此失效）
+        self.generation = 0
+        # 项目 → 其依赖边最后一次变化（含删除）时的 generation，供依赖图按项目打补丁
+        self.changes: Dict[Tuple[str, str], int] = {}
+        self.updates = 0
+        self.projects_updated = 0
+        self.update_ms = 0.0
+
+    # ---------- 增量维护 ----------
+
+    def stale(self) -> bool:
+        """查询前是否需要校验目录或更新索引（可能产生文件I/O）"""
+        return self.catalog.stale() or self._version != self.catalog.version
+
+    def ensure_current(self) -> None:
+        """目录缓存版本变化后更新修订号变化的项目"""
+        self.catalog.refresh()
+        if self._version == self.catalog.version:
+            return
+        with self._lock:
+            if self._version != self.catalog.version:
+                self._update()
+
+    def _update(self) -> None:
+        started = time.perf_counter()
+        version = self.catalog.version
+        changed: Dict[Tuple[str, str], Optional[ProjectEntry]] = {}
+        with self.catalog._lock:
+            seen = set()
+            for language in self.catalog.languages.values():
+                for project in language.projects.values():
+                    owner = (language.name, project.name)
+                    seen.add(owner)
+                    if self._revisions.get(owner) != project.revision:
+                        self._revisions[owner] = project.revision
+                        changed[owner] = project
+            for owner in set(self._revisions) - seen:
+                del self._revisions[owner]
+                changed[owner] = None
+
+            modified = []
+            for owner, project in changed.items():
+                edges, nodes = project_edges(owner[0], project) if project is not None else ([], {})
+                if edges == self._edges.get(owner, []) and nodes == self._nodes.get(owner, {}):
+                    # 只改了描述等无关字段
+                    continue
+                self._remove_project(owner)
+                if project is not None:
+                    self._add_project(owner, edges, nodes)
+                modified.append(owner)
+
+            if modified:
+                self.generation += 1
+                for owner in modified:
+                    self.changes[owner] = self.generation
+
+        self._version = version
+        self.updates += 1
+        self.projects_updated += len(changed)
+        self.update_ms = (time.perf_counter() - started) * 1000
+
+    def _add_project(self, owner: Tuple[str, str], edges: List[Edge],
+                     nodes: Dict[NodeKey, Dict[str, Any]]) -> None:
+        self._edges[owner] = edges
+        self._nodes[owner] = nodes
+        for source, target, attrs in edges:
+            self.forward.setdefault(source, {})[target] = attrs
+            self.reverse.setdefault(target, {})[source] = attrs
+            if target[0] == "library":
+                spellings = self._spellings.setdefault(target[1], {})
+                spellings[attrs["library"]] = spellings.get(attrs["library"], 0) + 1
+
+    def _remove_project(self, owner: Tuple[str, str]) -> None:
+        self._nodes.pop(owner, None)
+        for source, target, attrs in self._edges.pop(owner, []):
+            targets = self.forward.get(source, {})
+            targets.pop(target, None)
+            if not targets:
+                self.forward.pop(source, None)
+            sources = self.reverse.get(target, {})
+            sources.pop(source, None)
+            if not sources:
+                self.reverse.pop(target, None)
+            if target[0] == "library":
+                spellings = self._spellings[target[1]]
+                spellings[attrs["library"]] -= 1
+                if not spellings[attrs["library"]]:
+                    del spellings[attrs["library"]]
+                if not spellings:
+                    del self._spellings[target[1]]
+
+    # ---------- 查询 ----------
+
+    def node(self, key: NodeKey) -> Dict[str, Any]:
+        """节点描述：项目/模块取所属项目提取时的描述，库取最常见的写法"""
+        if key[0] == "library":
+            spellings = self._spellings.get(key[1])
+            name = max(sorted(spellings), key=spellings.get) if spellings else key[1]
+            return {"type": "library", "name": name}
+        described = self._nodes.get((key[1], key[2]), {}).get(key)
+        if described is not None:
+            return dict(described)
+        if key[0] == "project":
+            return {"type": "project", "language": key[1], "project": key[2],
+                    "uri": f"mcp-docs://project/{key[1]}/{key[2]}"}
+        return {"type": "module", "language": key[1], "project": key[2], "module": key[3],
+                "uri": f"mcp-docs://project/{key[1]}/{key[2]}"}
+
+    def resolve(self, library: Optional[str] = None, language: Optional[str] = None,
+                project: Optional[str] = None, module: Optional[str] = None) -> NodeKey:
+        """工具参数 → 节点键：指定 library，或 language + project（+ module）"""
+        if library:
+            if language or project or module:
+                raise ValueError("library 不能与 language/project/module 同时指定")
+            return library_key(library)
+        if not language or not project:
+            raise ValueError("需要指定 library，或 language 与 project")
+        if (language, project) not in self._revisions:
+            raise FileNotFoundError(f"项目未找到: {language}/{project}")
+        if not module:
+            return project_key(language, project)
+        key = module_key(language, project, module)
+        if key not in self._nodes.get((language, project), {}):
+            raise FileNotFoundError(f"模块未找到: {module}")
+        return key
+
+    def dependents(self, key: NodeKey) -> List[Dict[str, Any]]:
+        """直接依赖 key 的项目与模块
+
+        项目还会匹配同名的第三方库：其他项目把本项目作为库引用时同样计入（via 给出库名）。
+        """
+        with self._lock:
+            found = {source: dict(attrs) for source, attrs in self.reverse.get(key, {}).items()}
+            for name, library in self.library_aliases(key).items():
+                for source, attrs in self.reverse.get(library, {}).items():
+                    if source[1:3] != key[1:]:
+                        found.setdefault(source, dict(attrs, via=name))
+            return self._describe(found)
+
+    def dependencies(self, key: NodeKey, include_modules: bool = True) -> List[Dict[str, Any]]:
+        """key 直接依赖的库与模块；项目默认同时列出其各模块的依赖（from_module 标明来源）"""
+        with self._lock:
+            entries = self._describe(self.forward.get(key, {}))
+            if key[0] == "project" and include_modules:
+                for source in sorted(self._nodes.get((key[1], key[2]), {})):
+                    if source[0] != "module":
+                        continue
+                    for entry in self._describe(self.forward.get(source, {})):
+                        entry["from_module"] = source[3]
+                        entries.append(entry)
+            return entries
+
+    def graph_edges(self, owner: Tuple[str, str]) -> Tuple[List[Tuple[NodeKey, NodeKey]], List[NodeKey]]:
+        """项目在依赖图中的部分：依赖边加上 项目 → 模块 的包含边，以及项目内的全部节点
+
+        调用方需持有 _lock（依赖图同步时使用）。
+        """
+        nodes = sorted(self._nodes.get(owner, {}))
+        edges = [(source, target) for source, target, _ in self._edges.get(owner, [])]
+        edges += [(project_key(*owner), key) for key in nodes if key[0] == "module"]
+        return edges, nodes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "projects": len(self._revisions),
+            "edges": sum(len(edges) for edges in self._edges.values()),
+            "libraries": len(self._spellings),
+            "generation": self.generation,
+            "updates": self.updates,
+            "projects_updated": self.projects_updated,
+            "update_ms": round(self.update_ms, 2),
+        }
+
+    def library_aliases(self, key: NodeKey) -> Dict[str, NodeKey]:
+        """项目作为第三方库被引用时可能使用的名称（目录名与 project_metadata.name）→ 库节点键"""
+        if key[0] != "project":
+            return {}
+        language = self.catalog.languages.get(key[1])
+        project = language.projects.get(key[2]) if language else None
+        info = (project.info if project else None) or {}
+        names = {key[2], info.get("project_metadata", {}).get("name") or key[2]}
+        return {name: library_key(name) for name in sorted(names) if isinstance(name, str)}
+
+    def _describe(self, found: Dict[NodeKey, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """节点键 → 描述 + 边属性，按 类型/语言/项目/名称 排序"""
+        entries = []
+        for key in sorted(found, key=lambda key: (_TYPE_ORDER[key[0]],) + key[1:]):
+            entry = self.node(key)
+            entry.update((name, value) for name, value in found[key].items() if name != "library")
+            entries.append(entry)
+        return entries
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档目录文件监听器
+Linux下使用inotify，其他平台退化为基于stat快照的轮询；突发写入合并后再推送给订阅者
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ADDED = "added"
+MODIFIED = "modified"
+DELETED = "deleted"
+# 事件丢失（如inotify队列溢出）时通知订阅者整体重新扫描
+RESCAN = "rescan"
+
+DEFAULT_IGNORE_PATTERNS = ("*.tmp", "*.swp", "*~", ".#*", ".git", "search-index.json", "search-index.bin",
+                           "search-index.continue.json", "search-vectors.npy", "search-vectors.json")
+
+# inotify 常量（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+               | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class ChangeEvent:
+    """文件变更事件"""
+
+    __slots__ = ("kind", "path", "is_dir")
+
+    def __init__(self, kind: str, path: Path, is_dir: bool = False):
+        self.kind = kind
+        self.path = path
+        self.is_dir = is_dir
+
+    def __repr__(self) -> str:
+        suffix = "/" if self.is_dir else ""
+        return f"ChangeEvent({self.kind}, {self.path}{suffix})"
+
+
+class EventCoalescer:
+    """合并同一路径上的连续事件"""
+
+    def __init__(self):
+        self._pending: Dict[Path, Tuple[str, bool]] = {}
+        self._rescan: Optional[Path] = None
+        self.first_event_at = 0.0
+        self.last_event_at = 0.0
+
+    def add(self, kind: str, path: Path, is_dir: bool = False) -> None:
+        now = time.monotonic()
+        if not self:
+            self.first_event_at = now
+        self.last_event_at = now
+
+        if kind == RESCAN:
+            self._rescan = path
+            return
+
+        previous = self._pending.get(path)
+        if previous is None:
+            self._pending[path] = (kind, is_dir)
+            return
+
+        previous_kind = previous[0]
+        if previous_kind == ADDED and kind == DELETED:
+            # 新建后又删除，对订阅者不可见
+            del self._pending[path]
+        elif previous_kind == ADDED:
+            self._pending[path] = (ADDED, is_dir)
+        elif previous_kind == DELETED and kind == ADDED:
+            self._pending[path] = (MODIFIED, is_dir)
+        else:
+            self._pending[path] = (kind, is_dir)
+
+    def __bool__(self) -> bool:
+        return self._rescan is not None or bool(self._pending)
+
+    def drain(self) -> List[ChangeEvent]:
+        """取出合并后的事件"""
+        if self._rescan is not None:
+            events = [ChangeEvent(RESCAN, self._rescan, True)]
+        else:
+            events = [ChangeEvent(kind, path, is_dir) for path, (kind, is_dir) in sorted(self._pending.items())]
+        self._pending = {}
+        self._rescan = None
+        return events
+
+
+class _InotifyBackend:
+    """基于inotify的事件源"""
+
+    def __init__(self, root: Path, emit: Callable[[str, Path, bool], None], ignored: Callable[[Path], bool]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.root = root
+        self._emit = emit
+        self._ignored = ignored
+        self._watches: Dict[int, Path] = {}
+        self._add_tree(root, emit_existing=False)
+
+    def _add_tree(self, directory: Path, emit_existing: bool) -> None:
+        """递归添加目录监听；新建目录时补发其中已存在文件的新增事件"""
+        for current, dirnames, filenames in os.walk(directory):
+            current_path = Path(current)
+            dirnames[:] = [name for name in dirnames if not self._ignored(current_path / name)]
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(current), _WATCH_MASK)
+            if wd < 0:
+                logger.warning(f"Failed to watch {current}: errno {ctypes.get_errno()}")
+                continue
+            self._watches[wd] = current_path
+            if emit_existing:
+                if current_path != directory:
+                    self._emit(ADDED, current_path, True)
+                for name in filenames:
+                    if not self._ignored(current_path / name):
+                        self._emit(ADDED, current_path / name, False)
+
+    def wait(self, timeout: float) -> None:
+        """等待并分发一批内核事件"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            self._dispatch(wd, mask, os.fsdecode(name))
+
+    def _dispatch(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflow, requesting full rescan")
+            self._emit(RESCAN, self.root, True)
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+
+        directory = self._watches.get(wd)
+        if directory is None or not name:
+            return
+        path = directory / name
+        if self._ignored(path):
+            return
+
+        is_dir = bool(mask & IN_ISDIR)
+        if mask & (IN_CREATE | IN_MOVED_TO):
+            if is_dir:
+                self._emit(ADDED, path, True)
+                self._add_tree(path, emit_existing=True)
+            else:
+                self._emit(ADDED, path, False)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self._emit(DELETED, path, is_dir)
+        elif mask & (IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB) and not is_dir:
+            self._emit(MODIFIED, path, False)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    """基于stat快照比对的事件源（不读取文件内容）"""
+
+    # 每轮扫描本身就是一次合并窗口，扫描后立即推送
+    batched = True
+
+    def __init__(self, root: Path, emit: Callable[[str, Path, bool], None], ignored: Callable[[Path], bool],
+                 interval: float):
+        self.root = root
+        self._emit = emit
+        self._ignored = ignored
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int, bool]]:
+        snapshot = {}
+        for current, dirnames, filenames in os.walk(self.root):
+            current_path = Path(current)
+            dirnames[:] = [name for name in dirnames if not self._ignored(current_path / name)]
+            for name in dirnames:
+                snapshot[current_path / name] = (0, 0, True)
+            for name in filenames:
+                path = current_path / name
+                if self._ignored(path):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size, False)
+        return snapshot
+
+    def wait(self, timeout: float) -> None:
+        time.sleep(self.interval)
+        current = self._scan()
+        previous = self._snapshot
+        for path, stamp in current.items():
+            old = previous.get(path)
+            if old is None:
+                self._emit(ADDED, path, stamp[2])
+            elif old != stamp:
+                self._emit(MODIFIED, path, stamp[2])
+        for path, stamp in previous.items():
+            if path not in current:
+                self._emit(DELETED, path, stamp[2])
+        self._snapshot = current
+
+    def close(self) -> None:
+        pass
+
+
+class FileWatcher:
+    """文件监听器：后台线程收集事件，静默 debounce 秒后批量推送给订阅者"""
+
+    def __init__(self, root: Path, debounce: float = 0.2, max_delay: float = 2.0, poll_interval: float = 2.0,
+                 backend: str = "auto", ignore_patterns: Tuple[str, ...] = DEFAULT_IGNORE_PATTERNS):
+        self.root = Path(root)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.backend_name = backend
+        self.ignore_patterns = ignore_patterns
+
+        self._subscribers: List[Callable[[List[ChangeEvent]], None]] = []
+        self._coalescer = EventCoalescer()
+        self._backend = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def subscribe(self, callback: Callable[[List[ChangeEvent]], None]) -> None:
+        """注册订阅者，回调在监听线程中执行"""
+        self._subscribers.append(callback)
+
+    def start(self) -> None:
+        """启动监听线程"""
+        if self._thread is not None:
+            return
+        self._backend = self._create_backend()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mcp-file-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"File watcher started on {self.root} ({type(self._backend).__name__})")
+
+    def stop(self) -> None:
+        """停止监听线程"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._backend.close()
+        self._backend = None
+
+    def _create_backend(self):
+        use_inotify = self.backend_name == "inotify" or (self.backend_name == "auto" and sys.platform.startswith("linux"))
+        if use_inotify:
+            try:
+                return _InotifyBackend(self.root, self._coalescer.add, self._is_ignored)
+            except (OSError, AttributeError) as e:
+                if self.backend_name == "inotify":
+                    raise
+                logger.warning(f"inotify unavailable ({e}), falling back to polling")
+        return _PollingBackend(self.root, self._coalescer.add, self._is_ignored, self.poll_interval)
+
+    def _is_ignored(self, path: Path) -> bool:
+        return any(fnmatch.fnmatch(path.name, pattern) for pattern in self.ignore_patterns)
+
+    def _run(self) -> None:
+        batched = getattr(self._backend, "batched", False)
+        while not self._stop.is_set():
+            self._backend.wait(self.debounce if self._coalescer else 0.5)
+            if not self._coalescer:
+                continue
+
+            # 静默 debounce 秒或累计延迟超过 max_delay 时推送
+            now = time.monotonic()
+            if (batched
+                    or now - self._coalescer.last_event_at >= self.debounce
+                    or now - self._coalescer.first_event_at >= self.max_delay):
+                self._flush()
+
+    def _flush(self) -> None:
+        events = self._coalescer.drain()
+        logger.debug(f"Dispatching {len(events)} change events")
+        for callback in list(self._subscribers):
+            try:
+                callback(events)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("File watcher subscriber failed")
@@ -1,17 +1,87 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query, Body, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import argparse
+import asyncio
 import json
 import logging
+import os
+import shutil
+import tempfile
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 import uvicorn
 
-from mcp_protocol_server import MCPDocumentationServer
+from index_snapshot import SNAPSHOT_FILENAME, write_snapshot
+from io_executor import IOExecutorBusy
+from mcp_protocol_server import DEFAULT_SEARCH_LIMIT, MCPDocumentationServer
+from metadata_index import DEFAULT_QUERY_LIMIT
+from pagination import paginate
+from progress import CANCELLED_NOTIFICATION, PROGRESS_NOTIFICATION, ProgressReporter, ProgressSink, ToolCancelled
+from resource_cache import CachedResource
+from sessions import SESSION_HEADER, HttpSession, SessionManager, SessionStore, negotiate_protocol_version
+from streaming import StreamLimitReached, StreamManager, encode_event
 
+# HTTP客户端在订阅表与通知中心中的标识
+HTTP_SUBSCRIBER = "http"
 
-async def _handle_json_rpc(payload: Dict[str, Any], state: Any, service: MCPDocumentationServer) -> Dict[str, Any]:
+# 会话表默认容量与空闲超时（秒）
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_SESSION_IDLE_TIMEOUT = 1800.0
+
+# SSE流数量上限、单流待发送消息上限与保活间隔（秒）
+DEFAULT_MAX_STREAMS = 100
+DEFAULT_STREAM_QUEUE = 256
+DEFAULT_STREAM_HEARTBEAT = 15.0
+
+# 单个批量请求内的并发上限与单次调用超时（秒），可由 mcp-config.json 的 "http" 段覆盖
+DEFAULT_BATCH_CONCURRENCY = 8
+DEFAULT_CALL_TIMEOUT = 30.0
+
+# 多进程模式下轮询共享会话目录中取消标记的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.2
+
+
+class RpcContext:
+    """单次HTTP请求的JSON-RPC上下文"""
+
+    __slots__ = ("sessions", "session", "progress_sink")
+
+    def __init__(self, sessions: SessionManager, session: HttpSession, progress_sink: Optional[ProgressSink] = None):
+        self.sessions = sessions
+        self.session = session
+        # 进度通知的去向：POST的SSE响应流；未设置时经通知中心发到会话的GET流
+        self.progress_sink = progress_sink
+
+
+def _progress_reporter(params: Dict[str, Any], context: RpcContext,
+                       service: MCPDocumentationServer) -> ProgressReporter:
+    """按请求中的 _meta.progressToken 创建进度汇报器"""
+    progress_token = (params.get("_meta") or {}).get("progressToken")
+    if progress_token is None:
+        return ProgressReporter()
+
+    sink = context.progress_sink
+    if sink is None:
+        key = context.session.key
+
+        async def sink(progress_params: Dict[str, Any]) -> None:
+            service.notifications.send(key, PROGRESS_NOTIFICATION, progress_params)
+
+    return ProgressReporter(progress_token, sink)
+
+
+async def _poll_cancel(context: RpcContext, request_id: Any, reporter: ProgressReporter) -> None:
+    """多进程模式下取消通知可能落在其他工作进程，轮询其经共享会话目录转交的取消标记"""
+    session = context.session
+    while not reporter.cancelled:
+        await asyncio.sleep(CANCEL_POLL_INTERVAL)
+        if context.sessions.take_cancel(session, request_id):
+            reporter.cancel()
+
+
+async def _handle_json_rpc(payload: Dict[str, Any], context: RpcContext, service: MCPDocumentationServer) -> Dict[str, Any]:
     logger = logging.getLogger("mcp.http.jsonrpc")
     logger.debug("JSON-RPC request: %s", payload)
     response: Dict[str, Any] = {"jsonrpc": "2.0", "id": payload.get("id")}
@@ -25,40 +95,73 @@ async def _handle_json_rpc(payload: Dict[str, Any], state: Any, service: MCPDocu
 
     try:
         if method == "initialize":
-            state.session["initialized"] = True
-            protocol_version = params.get("protocolVersion", "2024-11-05")
-            state.session["protocolVersion"] = protocol_version
-            capabilities = {
-                "resources": {"listChanged": False},
+            # 每次初始化开启新会话；在已有会话上重新初始化时关闭旧会话（释放其订阅与SSE流）
+            if context.session.session_id is not None:
+                context.sessions.close(context.session.session_id)
+            session = context.sessions.create()
+            session.initialized = True
+            session.protocol_version = negotiate_protocol_version(params.get("protocolVersion"))
+            session.client_info = params.get("clientInfo", {}) or {}
+            session.client_capabilities = params.get("capabilities", {}) or {}
+            # 只读快照模式（--workers）不监听文件，没有资源变更通知
+            notifies = service.watches_files
+            session.server_capabilities = {
+                "resources": {"listChanged": notifies, "subscribe": notifies},
                 "tools": {"listChanged": False},
                 "prompts": {"listChanged": False},
                 "logging": {"levels": []},
             }
+            context.sessions.save(session)
+            context.session = session
             response["result"] = {
-                "protocolVersion": protocol_version,
-                "capabilities": capabilities,
+                "protocolVersion": session.protocol_version,
+                "capabilities": session.server_capabilities,
                 "serverInfo": {"name": "mcp-docs-http", "version": "1.0.0"},
             }
-        elif method == "listTools":
-            response["result"] = {"tools": service.tool_definitions()}
-        elif method in {"tools/list", "tools/list"}:
-            response["result"] = {"tools": service.tool_definitions()}
-        elif method == "listResources":
-            response["result"] = {"resources": service.collect_resources()}
-        elif method == "resources/list":
-            response["result"] = {"resources": service.collect_resources()}
+        elif method in {"listTools", "tools/list"}:
+            response["result"] = _paged("tools", service.tool_definitions(), params, service)
+        elif method in {"listResources", "resources/list"}:
+            response["result"] = _paged("resources", await service.collect_resources(), params, service)
+        elif method == "resources/templates/list":
+            response["result"] = _paged("resourceTemplates", service.resource_templates(), params, service)
         elif method == "readResource" or method == "resources/read":
             resource_uri = params.get("uri")
             if not resource_uri:
                 raise ValueError("uri is required")
             result = await _read_resource_via_service(service, resource_uri)
             response["result"] = {"contents": result}
-        elif method == "callTool":
+        elif method in {"resources/subscribe", "resources/unsubscribe"}:
+            resource_uri = params.get("uri")
+            if not service.watches_files:
+                response["error"] = {"code": -32601, "message": f"{method} is not supported: file watching is disabled"}
+            elif not resource_uri:
+                raise ValueError("uri is required")
+            else:
+                if method == "resources/subscribe":
+                    service.subscriptions.subscribe(context.session.key, resource_uri)
+                else:
+                    service.subscriptions.unsubscribe(context.session.key, resource_uri)
+                response["result"] = {}
+        elif method in {"callTool", "tools/call"}:
             name = params.get("name")
             arguments = params.get("arguments", {})
             if not name:
                 raise ValueError("name is required")
-            tool_result = await service.execute_tool(name, arguments)
+            reporter = _progress_reporter(params, context, service)
+            request_id = payload.get("id")
+            poller = None
+            # 匿名会话由所有未携带会话头的客户端共用，JSON-RPC id 会互相冲突，不登记可取消的请求
+            if request_id is not None and context.session.session_id is not None:
+                context.session.in_flight[request_id] = reporter
+                if context.sessions.store is not None:
+                    poller = asyncio.create_task(_poll_cancel(context, request_id, reporter))
+            try:
+                tool_result = await service.execute_tool(name, arguments, reporter)
+            finally:
+                if context.session.in_flight.get(request_id) is reporter:
+                    del context.session.in_flight[request_id]
+                if poller is not None:
+                    poller.cancel()
             text_payload = json.dumps(tool_result, ensure_ascii=False, indent=2)
             logger.debug("Tool %s result: %s", name, text_payload)
             response["result"] = {
@@ -71,10 +174,15 @@ async def _handle_json_rpc(payload: Dict[str, Any], state: Any, service: MCPDocu
             }
         elif method == "prompts/list":
             response["result"] = {"prompts": []}
+        elif method == CANCELLED_NOTIFICATION:
+            context.sessions.cancel(context.session, params.get("requestId"))
+            response["result"] = {}
         elif method == "notifications/initialized":
             response["result"] = {"acknowledged": True}
         else:
             response["error"] = {"code": -32601, "message": f"Method not found: {method}"}
+    except ToolCancelled:
+        response["error"] = {"code": -32800, "message": "Request cancelled"}
     except ValueError as exc:
         response["error"] = {"code": -32602, "message": str(exc)}
     except Exception as exc:  # pylint: disable=broad-except
@@ -85,33 +193,109 @@ async def _handle_json_rpc(payload: Dict[str, Any], state: Any, service: MCPDocu
     return response
 
 
+def _paged(key: str, items: List[Dict[str, Any]], params: Dict[str, Any],
+           service: MCPDocumentationServer) -> Dict[str, Any]:
+    """列表结果分页，还有下一页时附带nextCursor"""
+    page, next_cursor = paginate(items, params.get("cursor"), service.page_size)
+    result: Dict[str, Any] = {key: page}
+    if next_cursor:
+        result["nextCursor"] = next_cursor
+    return result
+
+
+def _is_notification(payload: Any) -> bool:
+    """不带id的请求是通知，不需要响应"""
+    return isinstance(payload, dict) and "id" not in payload
+
+
+async def _dispatch(payload: Any, context: RpcContext, service: MCPDocumentationServer,
+                    timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+    """执行单个JSON-RPC调用（带超时，timeout为None时不限时），通知返回None"""
+    if not isinstance(payload, dict):
+        return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+
+    try:
+        response = await asyncio.wait_for(_handle_json_rpc(payload, context, service), timeout)
+    except asyncio.TimeoutError:
+        logging.getLogger("mcp.http.jsonrpc").warning(f"JSON-RPC call {payload.get('method')} timed out after {timeout}s")
+        response = {
+            "jsonrpc": "2.0",
+            "id": payload.get("id"),
+            "error": {"code": -32001, "message": f"Request timed out after {timeout}s"},
+        }
+    return None if _is_notification(payload) else response
+
+
+async def _dispatch_batch(payload: List[Any], context: RpcContext, service: MCPDocumentationServer,
+                          concurrency: int, timeout: float) -> List[Dict[str, Any]]:
+    """并发执行批量调用，响应顺序与请求一致，通知不产生响应"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(obj: Any) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await _dispatch(obj, context, service, timeout)
+
+    responses = await asyncio.gather(*(run(obj) for obj in payload))
+    return [response for response in responses if response is not None]
+
+
 async def _read_resource_via_service(service: MCPDocumentationServer, uri: str) -> List[Dict[str, Any]]:
     if not uri.startswith("mcp-docs://"):
         raise ValueError("Unsupported URI scheme")
 
-    components = uri[len("mcp-docs://"):].split("/")
-    resource_type = components[0]
-    if resource_type == "project":
-        language, project = components[1], components[2]
-        data = await service._read_project_resource(language, project)
-        return [{"uri": uri, "mimeType": "application/json", "text": data}]
-    if resource_type == "readme":
-        language, project = components[1], components[2]
-        text = await service._read_readme_resource(language, project)
-        return [{"uri": uri, "mimeType": "text/markdown", "text": text}]
-    if resource_type == "module":
-        language, project, module = components[1], components[2], components[3]
-        data = await service._read_module_resource(language, project, module)
-        return [{"uri": uri, "mimeType": "application/json", "text": data}]
-    raise ValueError(f"Unknown resource type: {resource_type}")
-
-
-def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None) -> FastAPI:
-    service = MCPDocumentationServer(mcp_root)
+    resource = await service.read_resource(uri)
+    return [{"uri": uri, "mimeType": resource.mime_type, "text": resource.text}]
+
+
+def _wants_progress_stream(request: Request, payload: Dict[str, Any]) -> bool:
+    """带进度令牌的工具调用且客户端接受SSE时，以流的方式返回"""
+    if not isinstance(payload, dict) or "id" not in payload:
+        return False
+    if "text/event-stream" not in request.headers.get("accept", ""):
+        return False
+    params = payload.get("params") or {}
+    return isinstance(params, dict) and (params.get("_meta") or {}).get("progressToken") is not None
+
+
+def _session_headers(context: RpcContext) -> Dict[str, str]:
+    """响应头中回传会话ID"""
+    if context.session.session_id is None:
+        return {}
+    return {SESSION_HEADER: context.session.session_id}
+
+
+def _cached_response(request: Request, resource: CachedResource) -> Response:
+    """返回缓存的序列化内容，If-None-Match 命中时返回304"""
+    headers = {"ETag": resource.etag, "Cache-Control": "no-cache"}
+    if resource.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=resource.body, media_type=resource.mime_type, headers=headers)
+
+
+# 多进程模式下主进程通过环境变量把参数传给工作进程
+ENV_MCP_ROOT = "MCP_DOCS_ROOT"
+ENV_SNAPSHOT = "MCP_DOCS_SNAPSHOT"
+ENV_ALLOW_ORIGINS = "MCP_DOCS_ALLOW_ORIGINS"
+ENV_SESSION_DIR = "MCP_DOCS_SESSION_DIR"
+
+
+def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None,
+               snapshot_path: Optional[Path] = None, session_dir: Optional[Path] = None) -> FastAPI:
+    service = MCPDocumentationServer(mcp_root, snapshot_path=snapshot_path)
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        service.start_watcher()
+        try:
+            yield
+        finally:
+            service.stop_watcher()
+
     app = FastAPI(
         title="MCP Documentation HTTP Gateway",
         description="Expose documentation resources and tools over HTTP",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
 
     origins = allow_origins or ["*"]
@@ -121,16 +305,62 @@ def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None) -> Fast
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[SESSION_HEADER],
     )
 
+    @app.exception_handler(IOExecutorBusy)
+    async def io_busy_handler(_: Request, exc: IOExecutorBusy) -> JSONResponse:
+        return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
     app.state.service = service
-    app.state.session = {
-        "initialized": False,
-        "protocolVersion": None
-    }
+    http_config = service.config.get("http", {})
+    batch_concurrency = http_config.get("batch_concurrency", DEFAULT_BATCH_CONCURRENCY)
+    call_timeout = http_config.get("call_timeout", DEFAULT_CALL_TIMEOUT)
+    sessions = SessionManager(
+        max_sessions=http_config.get("max_sessions", DEFAULT_MAX_SESSIONS),
+        idle_timeout=http_config.get("session_idle_timeout", DEFAULT_SESSION_IDLE_TIMEOUT),
+        anonymous_key=HTTP_SUBSCRIBER,
+        store=SessionStore(session_dir) if session_dir is not None else None,
+    )
+
+    streams = StreamManager(
+        service.notifications,
+        max_streams=http_config.get("max_streams", DEFAULT_MAX_STREAMS),
+        max_queue=http_config.get("stream_queue", DEFAULT_STREAM_QUEUE),
+        heartbeat=http_config.get("stream_heartbeat", DEFAULT_STREAM_HEARTBEAT),
+    )
+
+    def release_session(session: HttpSession) -> None:
+        service.subscriptions.drop(session.key)
+        streams.close(session.key)
+
+    sessions.on_close(release_session)
+    app.state.sessions = sessions
+    app.state.streams = streams
+
+    def resolve_session(request: Request) -> Optional[HttpSession]:
+        """按请求头查找会话，未携带时使用匿名会话；会话已失效时返回None"""
+        session_id = request.headers.get(SESSION_HEADER)
+        if not session_id:
+            return sessions.anonymous
+        # 多进程模式下会话可能由其他工作进程创建，SessionManager 从共享会话目录恢复
+        return sessions.get(session_id)
+
+    def session_not_found() -> JSONResponse:
+        # 会话已过期或被关闭，客户端需要重新初始化
+        return JSONResponse(
+            status_code=404,
+            content={
+                "jsonrpc": "2.0",
+                "error": {"code": -32001, "message": "Session not found"},
+                "id": None,
+            },
+        )
 
     @app.get("/")
-    async def root() -> Dict[str, Any]:
+    async def root(request: Request) -> Any:
+        if "text/event-stream" in request.headers.get("accept", ""):
+            return open_event_stream(request)
         return {
             "name": "MCP Documentation HTTP Gateway",
             "version": "1.0.0",
@@ -141,13 +371,29 @@ def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None) -> Fast
                 "/projects",
                 "/projects/{language}",
                 "/projects/{language}/{project}",
+                "/projects/{language}/{project}/readme",
                 "/modules/{language}/{project}",
+                "/modules/{language}/{project}/{module}",
                 "/search",
                 "/tools/{name}"
             ],
             "notes": "Use the HTTP URL in your mcp.json configuration or switch to STDIO mode with start.py --mode mcp."
         }
 
+    def open_event_stream(request: Request) -> Response:
+        """Streamable HTTP 的GET流：推送会话的资源变更等服务器通知"""
+        session = resolve_session(request)
+        if session is None:
+            return session_not_found()
+        try:
+            stream = streams.open(session.key)
+        except StreamLimitReached as exc:
+            return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        if session.session_id is not None:
+            headers[SESSION_HEADER] = session.session_id
+        return StreamingResponse(streams.serve(stream), media_type="text/event-stream", headers=headers)
+
     @app.post("/")
     async def root_post(request: Request) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
         try:
@@ -163,12 +409,66 @@ def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None) -> Fast
                 },
             )
 
-        if isinstance(payload, list):
-            responses = [await _handle_json_rpc(obj, app.state, service) for obj in payload]
-            return JSONResponse(content=responses)
+        session = resolve_session(request)
+        if session is None:
+            return session_not_found()
+        context = RpcContext(sessions, session)
 
-        response = await _handle_json_rpc(payload, app.state, service)
-        return JSONResponse(content=response)
+        if isinstance(payload, list):
+            if not payload:
+                return JSONResponse(content={
+                    "jsonrpc": "2.0",
+                    "error": {"code": -32600, "message": "Invalid Request"},
+                    "id": None,
+                })
+            responses = await _dispatch_batch(payload, context, service, batch_concurrency, call_timeout)
+            if not responses:
+                return Response(status_code=202, headers=_session_headers(context))
+            return JSONResponse(content=responses, headers=_session_headers(context))
+
+        if _wants_progress_stream(request, payload):
+            return stream_request(payload, context)
+
+        response = await _dispatch(payload, context, service, call_timeout)
+        if response is None:
+            return Response(status_code=202, headers=_session_headers(context))
+        return JSONResponse(content=response, headers=_session_headers(context))
+
+    def stream_request(payload: Dict[str, Any], context: RpcContext) -> StreamingResponse:
+        """以SSE返回单个请求：先推送进度通知，最后是响应；客户端断开时取消请求"""
+        queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+
+        async def progress_sink(params: Dict[str, Any]) -> None:
+            queue.put_nowait({"jsonrpc": "2.0", "method": PROGRESS_NOTIFICATION, "params": params})
+
+        context.progress_sink = progress_sink
+        # 持续汇报进度的长时间调用不受 call_timeout 限制，客户端断开连接时取消
+        task = asyncio.create_task(_dispatch(payload, context, service, None))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+
+        async def events():
+            try:
+                while True:
+                    message = await queue.get()
+                    if message is None:
+                        break
+                    yield encode_event(message)
+                response = task.result()
+                if response is not None:
+                    yield encode_event(response)
+            finally:
+                if not task.done():
+                    task.cancel()
+
+        headers = {"Cache-Control": "no-cache", **_session_headers(context)}
+        return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+    @app.delete("/")
+    async def root_delete(request: Request) -> Response:
+        session_id = request.headers.get(SESSION_HEADER)
+        if not session_id:
+            return Response(status_code=400)
+        return Response(status_code=204 if sessions.close(session_id) else 404)
 
     @app.get("/favicon.ico")
     async def favicon() -> Response:
@@ -181,6 +481,15 @@ def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None) -> Fast
             "status": "healthy",
             "mcp_root": str(service.mcp_root),
             "languages": len(config.get("supported_languages", [])),
+            "sessions": len(sessions),
+            "streams": len(streams),
+            "io": service.io.stats(),
+            "resource_cache": service.resource_cache.stats(),
+            "context_cache": service.context_builder.stats(),
+            "metadata_index": service.metadata_index.stats(),
+            "dependency_index": service.dependency_index.stats(),
+            "dependency_graph": service.dependency_graph.stats(),
+            "vectors": service.search_index.vectors.stats() if service.search_index.vectors is not None else None,
         }
 
     @app.get("/languages")
@@ -190,71 +499,50 @@ def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None) -> Fast
 
     @app.get("/projects")
     async def list_projects() -> Dict[str, Any]:
-        projects: List[Dict[str, Any]] = []
-        for lang_config in service.config.get("supported_languages", []):
-            lang_dir = service.mcp_root / lang_config["display_name"]
-            if not lang_dir.exists():
-                continue
-
-            for project_dir in lang_dir.iterdir():
-                if not project_dir.is_dir():
-                    continue
-                project_info = service._load_json_file(project_dir / "project-info.json") or {}
-                projects.append({
-                    "language": lang_config["name"],
-                    "language_display": lang_config["display_name"],
-                    "name": project_dir.name,
-                    "path": str(project_dir.relative_to(service.mcp_root)),
-                    "metadata": project_info.get("project_metadata", {}),
-                })
+        await service.refresh_catalog()
+        projects = service.catalog.project_list()
         return {"projects": projects, "total": len(projects)}
 
     @app.get("/projects/{language}")
     async def list_projects_by_language(language: str) -> Dict[str, Any]:
-        lang_config = next((cfg for cfg in service.config.get("supported_languages", []) if cfg["name"] == language), None)
-        if not lang_config:
+        await service.refresh_catalog()
+        if not service.catalog.language(language):
             raise HTTPException(status_code=404, detail=f"Language '{language}' not supported")
 
-        lang_dir = service.mcp_root / lang_config["display_name"]
-        projects: List[Dict[str, Any]] = []
-        if lang_dir.exists():
-            for project_dir in lang_dir.iterdir():
-                if not project_dir.is_dir():
-                    continue
-                project_info = service._load_json_file(project_dir / "project-info.json") or {}
-                projects.append({
-                    "name": project_dir.name,
-                    "path": str(project_dir.relative_to(service.mcp_root)),
-                    "metadata": project_info.get("project_metadata", {}),
-                })
+        projects = service.catalog.project_list_for(language)
         return {"language": language, "projects": projects, "total": len(projects)}
 
     @app.get("/projects/{language}/{project}")
-    async def project_details(language: str, project: str) -> Dict[str, Any]:
+    async def project_details(language: str, project: str, request: Request) -> Response:
+        try:
+            resource = await service.read_resource(f"mcp-docs://project/{language}/{project}")
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        return _cached_response(request, resource)
+
+    @app.get("/projects/{language}/{project}/readme")
+    async def project_readme(language: str, project: str, request: Request) -> Response:
         try:
-            data = await service._read_project_resource(language, project)
-            return json.loads(data)
+            resource = await service.read_resource(f"mcp-docs://readme/{language}/{project}")
         except FileNotFoundError as exc:
             raise HTTPException(status_code=404, detail=str(exc)) from exc
+        return _cached_response(request, resource)
+
+    @app.get("/modules/{language}/{project}/{module}")
+    async def module_details(language: str, project: str, module: str, request: Request) -> Response:
+        try:
+            resource = await service.read_resource(f"mcp-docs://module/{language}/{project}/{module}")
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        return _cached_response(request, resource)
 
     @app.get("/modules/{language}/{project}")
     async def list_modules(language: str, project: str) -> Dict[str, Any]:
-        project_path = service._get_project_path(language, project)
-        if not project_path or not project_path.exists():
+        await service.refresh_catalog()
+        if not service.catalog.project(language, project):
             raise HTTPException(status_code=404, detail="Project not found")
 
-        modules: List[Dict[str, Any]] = []
-        for module_dir in project_path.iterdir():
-            if not module_dir.is_dir():
-                continue
-            metadata_file = module_dir / "metadata.json"
-            if metadata_file.exists():
-                metadata = service._load_json_file(metadata_file) or {}
-                modules.append({
-                    "name": module_dir.name,
-                    "path": str(module_dir.relative_to(service.mcp_root)),
-                    "metadata": metadata.get("module_metadata", {}),
-                })
+        modules = service.catalog.module_list(language, project)
         return {"language": language, "project": project, "modules": modules, "total": len(modules)}
 
     @app.get("/search")
@@ -262,10 +550,51 @@ def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None) -> Fast
         q: str = Query(..., description="搜索关键词"),
         language: Optional[str] = Query(None),
         project: Optional[str] = Query(None),
+        offset: int = Query(0, ge=0),
+        limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1),
+        mode: str = Query("keyword"),
+        exact_total: bool = Query(False, description="精确统计命中总数（默认返回估计值）"),
     ) -> Dict[str, Any]:
-        result = await service._search_documentation(query=q, language=language, project=project)
+        try:
+            result = await service._search_documentation(query=q, language=language, project=project,
+                                                         offset=offset, limit=limit, mode=mode,
+                                                         exact_total=exact_total)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
         return result
 
+    @app.get("/query")
+    async def query_metadata_get(
+        request: Request,
+        kind: Optional[str] = Query(None, description="project 或 module"),
+        sort: Optional[str] = Query(None, description="逗号分隔的排序字段，前缀 - 表示降序"),
+        count_by: Optional[str] = Query(None, description="逗号分隔的计数字段"),
+        offset: int = Query(0, ge=0),
+        limit: int = Query(DEFAULT_QUERY_LIMIT, ge=0),
+    ) -> Dict[str, Any]:
+        """简单查询：其余查询参数按 字段=值 作为等值过滤（同一字段出现多次表示任一）"""
+        reserved = {"kind", "sort", "count_by", "offset", "limit"}
+        filters: Dict[str, Any] = {}
+        for field in request.query_params.keys():
+            if field not in reserved:
+                values = request.query_params.getlist(field)
+                filters[field] = values if len(values) > 1 else values[0]
+        try:
+            return await service._query_metadata(
+                kind=kind, filters=filters, offset=offset, limit=limit,
+                sort=sort.split(",") if sort else None,
+                count_by=count_by.split(",") if count_by else None)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    @app.post("/query")
+    async def query_metadata_post(arguments: Dict[str, Any] = Body(default_factory=dict)) -> Dict[str, Any]:
+        """完整查询：请求体与 query_metadata 工具参数相同"""
+        try:
+            return await service._query_metadata(**arguments)
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
     @app.post("/tools/{name}")
     async def invoke_tool(name: str, arguments: Dict[str, Any] = Body(default_factory=dict)) -> Dict[str, Any]:
         try:
@@ -279,6 +608,54 @@ def create_app(mcp_root: str, allow_origins: Optional[List[str]] = None) -> Fast
     return app
 
 
+def create_worker_app() -> FastAPI:
+    """多进程模式的工作进程入口（uvicorn factory）"""
+    origins = os.environ.get(ENV_ALLOW_ORIGINS)
+    return create_app(
+        os.environ[ENV_MCP_ROOT],
+        origins.split(",") if origins else None,
+        snapshot_path=Path(os.environ[ENV_SNAPSHOT]),
+        session_dir=Path(os.environ[ENV_SESSION_DIR]),
+    )
+
+
+def run_workers(args: argparse.Namespace) -> None:
+    """主进程构建一次索引快照并负责文件监听，工作进程只读映射快照"""
+    logger = logging.getLogger(__name__)
+    service = MCPDocumentationServer(args.mcp_root)
+    snapshot_path = service.mcp_root.resolve() / SNAPSHOT_FILENAME
+    write_snapshot(snapshot_path, service.search_index, service.catalog)
+    logger.info(f"Wrote index snapshot {snapshot_path} for {args.workers} workers")
+
+    def refresh_snapshot(_events) -> None:
+        # 在 _handle_file_changes 更新索引之后执行
+        write_snapshot(snapshot_path, service.search_index, service.catalog)
+
+    service.start_watcher()
+    if service.watcher is not None:
+        service.watcher.subscribe(refresh_snapshot)
+
+    os.environ[ENV_MCP_ROOT] = str(service.mcp_root.resolve())
+    os.environ[ENV_SNAPSHOT] = str(snapshot_path)
+    # 各工作进程共享的会话目录，随主进程退出删除
+    session_dir = tempfile.mkdtemp(prefix="mcp-sessions-")
+    os.environ[ENV_SESSION_DIR] = session_dir
+    if args.allow_origins:
+        os.environ[ENV_ALLOW_ORIGINS] = ",".join(args.allow_origins)
+    try:
+        uvicorn.run(
+            "http_server:create_worker_app",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level="debug" if args.verbose else "info",
+        )
+    finally:
+        service.stop_watcher()
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="MCP Documentation HTTP Server")
     parser.add_argument("--mcp-root", default="mcp-docs", help="MCP root directory")
@@ -286,12 +663,18 @@ def main() -> None:
     parser.add_argument("--port", type=int, default=7778, help="HTTP port to bind")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
     parser.add_argument("--allow-origin", action="append", dest="allow_origins", help="Allow CORS origin (can repeat)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes sharing a read-only index snapshot")
 
     args = parser.parse_args()
 
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(level=log_level, format="%(levelname)s: %(message)s")
 
+    if args.workers > 1:
+        run_workers(args)
+        return
+
     app = create_app(args.mcp_root, args.allow_origins)
     uvicorn.run(app, host=args.host, port=args.port, log_level="debug" if args.verbose else "info")
 
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+只读索引快照
+多进程模式下由主进程把搜索索引和目录缓存写成一个二进制文件，各工作进程mmap后共享物理内存，
+倒排表按需解码，工作进程启动时不再扫描目录或解析JSON索引
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from catalog import DocumentationCatalog
+from ranking import RankingEngine
+from search_index import DocumentText, SearchIndex
+from snippets import SnippetBuilder
+from term_dictionary import QueryExpander
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILENAME = "search-index.bin"
+SNAPSHOT_MAGIC = b"MCPSNAP1"
+SNAPSHOT_VERSION = 3
+
+_HEADER_LENGTH = struct.Struct("<Q")
+# 文档已删除时的语言编号
+_NO_LANGUAGE = 0xFFFF
+
+
+def _u32(values) -> bytes:
+    return array("I", values).tobytes()
+
+
+def _u64(values) -> bytes:
+    return array("Q", values).tobytes()
+
+
+def write_snapshot(path: Path, index: SearchIndex, catalog: DocumentationCatalog) -> None:
+    """把索引与目录缓存写入快照（先写临时文件再原子替换，已映射旧文件的进程不受影响）"""
+    with index._lock:
+        fields = sorted(index.field_postings)
+        language_names = sorted({doc["language"] for doc in index.docs if doc})
+        project_names = sorted({f"{doc['language']}/{doc['project']}" for doc in index.docs if doc})
+        language_ids = {name: i for i, name in enumerate(language_names)}
+        project_ids = {name: i for i, name in enumerate(project_names)}
+
+        sections: Dict[str, bytes] = {}
+        sections["doc_lengths"] = _u32(index.doc_lengths)
+        sections["doc_language"] = array("H", [
+            language_ids[doc["language"]] if doc else _NO_LANGUAGE for doc in index.docs
+        ]).tobytes()
+        sections["doc_project"] = _u32([
+            project_ids[f"{doc['language']}/{doc['project']}"] if doc else 0 for doc in index.docs
+        ])
+
+        doc_blobs = [json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for doc in index.docs]
+        sections["doc_offsets"] = _u64(_offsets(doc_blobs))
+        sections["doc_blob"] = b"".join(doc_blobs)
+
+        # 摘要用的正文（UTF-8）、位置区间（u32）与片段表（JSON），已删除的文档为空
+        text_blobs = [text.text.encode("utf-8") if text else b"" for text in index.texts]
+        sections["text_offsets"] = _u64(_offsets(text_blobs))
+        sections["text_blob"] = b"".join(text_blobs)
+        span_blobs = [_u32(text.spans) if text else b"" for text in index.texts]
+        sections["span_offsets"] = _u64(_offsets(span_blobs))
+        sections["span_blob"] = b"".join(span_blobs)
+        chunk_blobs = [json.dumps(text.chunks if text else [], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                       for text in index.texts]
+        sections["chunk_offsets"] = _u64(_offsets(chunk_blobs))
+        sections["chunk_blob"] = b"".join(chunk_blobs)
+
+        terms = sorted(set(index.postings) | set(index.idf), key=lambda term: term.encode("utf-8"))
+        term_blobs = [term.encode("utf-8") for term in terms]
+        sections["term_offsets"] = _u64(_offsets(term_blobs))
+        sections["term_blob"] = b"".join(term_blobs)
+        sections["term_idf"] = array("d", [index.idf.get(term, 0.0) for term in terms]).tobytes()
+
+        posting_blobs = [_encode_postings(index, term, fields) for term in terms]
+        sections["posting_offsets"] = _u64(_offsets(posting_blobs))
+        sections["posting_blob"] = b"".join(posting_blobs)
+
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "languages": index._language_layout(),
+            "signature": index.signature,
+            "doc_count": len(index.docs),
+            "term_count": len(terms),
+            "live_docs": index.live_docs,
+            "avg_length": index.avg_length,
+            "fields": fields,
+            "language_names": language_names,
+            "project_names": project_names,
+            "catalog": catalog.export_state(),
+        }
+
+    # 各段按8字节对齐，便于直接cast为数组视图
+    layout = {}
+    offset = 0
+    for name, data in sections.items():
+        layout[name] = [offset, len(data)]
+        offset += len(data) + (-len(data) % 8)
+    header["sections"] = layout
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    header_bytes += b" " * (-(len(SNAPSHOT_MAGIC) + _HEADER_LENGTH.size + len(header_bytes)) % 8)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for data in sections.values():
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(tmp_path, path)
+
+
+def _offsets(blobs: List[bytes]) -> List[int]:
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    return offsets
+
+
+def _encode_postings(index: SearchIndex, term: str, fields: List[str]) -> bytes:
+    """倒排记录：正文 [n, doc_ids, 位置数, 位置...]，随后是各字段 [field_id, n, doc_ids, tfs]"""
+    entries = index.postings.get(term, {})
+    doc_ids = sorted(entries)
+    parts = [_u32([len(doc_ids)]), _u32(doc_ids), _u32([len(entries[doc_id]) for doc_id in doc_ids])]
+    parts.append(_u32([position for doc_id in doc_ids for position in entries[doc_id]]))
+
+    field_parts = []
+    for field_id, field in enumerate(fields):
+        field_entries = index.field_postings[field].get(term)
+        if not field_entries:
+            continue
+        field_doc_ids = sorted(field_entries)
+        field_parts.append(_u32([field_id, len(field_doc_ids)]))
+        field_parts.append(_u32(field_doc_ids))
+        field_parts.append(_u32([field_entries[doc_id] for doc_id in field_doc_ids]))
+    parts.append(_u32([len(field_parts) // 3]))
+    parts.extend(field_parts)
+    return b"".join(parts)
+
+
+class _Snapshot:
+    """一次映射的快照文件"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self.stamp = os.fstat(f.fileno()).st_ino, os.fstat(f.fileno()).st_mtime_ns
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not an index snapshot: {path}")
+        header_start = len(SNAPSHOT_MAGIC) + _HEADER_LENGTH.size
+        (header_length,) = _HEADER_LENGTH.unpack_from(self.mm, len(SNAPSHOT_MAGIC))
+        self.header = json.loads(bytes(self.mm[header_start:header_start + header_length]))
+        if self.header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {self.header.get('version')}")
+
+        self._base = header_start + header_length
+        self.view = memoryview(self.mm)
+        self.doc_lengths = self.section("doc_lengths", "I")
+        self.doc_language = self.section("doc_language", "H")
+        self.doc_project = self.section("doc_project", "I")
+        self.doc_offsets = self.section("doc_offsets", "Q")
+        self.term_offsets = self.section("term_offsets", "Q")
+        self.term_idf = self.section("term_idf", "d")
+        self.posting_offsets = self.section("posting_offsets", "Q")
+        self.text_offsets = self.section("text_offsets", "Q")
+        self.span_offsets = self.section("span_offsets", "Q")
+        self.chunk_offsets = self.section("chunk_offsets", "Q")
+        self.doc_blob = self._section_start("doc_blob")
+        self.text_blob = self._section_start("text_blob")
+        self.span_blob = self._section_start("span_blob")
+        self.chunk_blob = self._section_start("chunk_blob")
+        self.term_blob = self._section_start("term_blob")
+        self.posting_blob = self._section_start("posting_blob")
+        self.term_count = self.header["term_count"]
+
+    def _section_start(self, name: str) -> int:
+        return self._base + self.header["sections"][name][0]
+
+    def section(self, name: str, typecode: str) -> memoryview:
+        start, length = self.header["sections"][name]
+        return self.view[self._base + start:self._base + start + length].cast(typecode)
+
+    def term(self, term_id: int) -> bytes:
+        start = self.term_blob + self.term_offsets[term_id]
+        return self.mm[start:self.term_blob + self.term_offsets[term_id + 1]]
+
+    def find_term(self, term: str) -> int:
+        """有序词典上二分查找，返回词项编号或-1"""
+        key = term.encode("utf-8")
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.term(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self.term(low) == key:
+            return low
+        return -1
+
+    def postings(self, term_id: int) -> Tuple[Dict[int, memoryview], Dict[int, Dict[int, int]]]:
+        """解码词项的正文与字段倒排记录"""
+        words = self.view[self.posting_blob + self.posting_offsets[term_id]:
+                          self.posting_blob + self.posting_offsets[term_id + 1]].cast("I")
+        count = words[0]
+        doc_ids = words[1:1 + count]
+        position_counts = words[1 + count:1 + 2 * count]
+        cursor = 1 + 2 * count
+        body: Dict[int, memoryview] = {}
+        for doc_id, position_count in zip(doc_ids, position_counts):
+            body[doc_id] = words[cursor:cursor + position_count]
+            cursor += position_count
+
+        fields: Dict[int, Dict[int, int]] = {}
+        field_count = words[cursor]
+        cursor += 1
+        for _ in range(field_count):
+            field_id, n = words[cursor], words[cursor + 1]
+            cursor += 2
+            fields[field_id] = dict(zip(words[cursor:cursor + n], words[cursor + n:cursor + 2 * n]))
+            cursor += 2 * n
+        return body, fields
+
+    def doc(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        start = self.doc_blob + self.doc_offsets[doc_id]
+        return json.loads(bytes(self.mm[start:self.doc_blob + self.doc_offsets[doc_id + 1]]))
+
+    def text(self, doc_id: int) -> Optional[DocumentText]:
+        """解码文档正文与片段表，位置区间直接引用映射内存"""
+        text_start = self.text_blob + self.text_offsets[doc_id]
+        text_end = self.text_blob + self.text_offsets[doc_id + 1]
+        span_start = self.span_blob + self.span_offsets[doc_id]
+        span_end = self.span_blob + self.span_offsets[doc_id + 1]
+        chunk_start = self.chunk_blob + self.chunk_offsets[doc_id]
+        chunk_end = self.chunk_blob + self.chunk_offsets[doc_id + 1]
+        if self.doc_language[doc_id] == _NO_LANGUAGE:
+            return None
+        return DocumentText(self.mm[text_start:text_end].decode("utf-8"), self.view[span_start:span_end].cast("I"),
+                            json.loads(bytes(self.mm[chunk_start:chunk_end])))
+
+
+class _DocTable:
+    """文档表视图：按需解码单个文档"""
+
+    def __init__(self, snapshot: _Snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.header["doc_count"]
+
+    def __getitem__(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        return self._snapshot.doc(doc_id)
+
+    def __iter__(self) -> Iterator[Optional[Dict[str, Any]]]:
+        for doc_id in range(len(self)):
+            yield self._snapshot.doc(doc_id)
+
+
+class _TextTable:
+    """文档正文视图：生成摘要时按需解码单个文档"""
+
+    def __init__(self, snapshot: _Snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.header["doc_count"]
+
+    def __getitem__(self, doc_id: int) -> Optional[DocumentText]:
+        return self._snapshot.text(doc_id)
+
+
+class _TermTable:
+    """词项 → 值 的只读映射视图，供排序引擎以 .get(term) 方式访问"""
+
+    def __init__(self, owner: "MappedSearchIndex", getter):
+        self._owner = owner
+        self._getter = getter
+
+    def get(self, term: str, default: Any = None) -> Any:
+        value = self._getter(term)
+        return default if value is None else value
+
+    def __contains__(self, term: str) -> bool:
+        return self._getter(term) is not None
+
+    def __len__(self) -> int:
+        return self._owner._snapshot.term_count
+
+
+class _FieldTable:
+    """field → 词项视图"""
+
+    def __init__(self, owner: "MappedSearchIndex"):
+        self._owner = owner
+
+    def get(self, field: str, default: Any = None) -> Any:
+        if field not in self._owner._field_ids:
+            return default
+        field_id = self._owner._field_ids[field]
+        return _TermTable(self._owner, lambda term: self._owner._decoded(term)[1].get(field_id))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._owner._field_ids)
+
+
+class MappedSearchIndex(SearchIndex):
+    """基于mmap快照的只读搜索索引
+
+    与 SearchIndex 提供相同的查询接口；倒排记录按需解码并做有界缓存，
+    快照文件被主进程替换后在下次查询时重新映射。
+    """
+
+    def __init__(self, snapshot_path: Path, ranker: Optional[RankingEngine] = None,
+                 snippet_builder: Optional[SnippetBuilder] = None,
+                 context_windows: Optional[Dict[str, int]] = None, expander: Optional[QueryExpander] = None,
+                 cache_terms: int = 4096, recheck_interval: float = 1.0):
+        header_owner = _Snapshot(snapshot_path)
+        mcp_root = snapshot_path.parent
+        language_dirs = {language: mcp_root / rel for language, rel in header_owner.header["languages"].items()}
+        super().__init__(mcp_root, language_dirs, ranker=ranker, snippet_builder=snippet_builder,
+                         context_windows=context_windows, expander=expander)
+
+        self.snapshot_path = snapshot_path
+        self.cache_terms = cache_terms
+        self.recheck_interval = recheck_interval
+        self._last_check = time.monotonic()
+        self._decode_cache: "OrderedDict[str, Tuple[Dict, Dict]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._attach(header_owner)
+
+        self.postings = _TermTable(self, lambda term: self._decoded(term)[0] or None)
+        self.field_postings = _FieldTable(self)
+        self.idf = _TermTable(self, self._idf)
+
+    def _attach(self, snapshot: _Snapshot) -> None:
+        header = snapshot.header
+        self._snapshot = snapshot
+        self._field_ids = {field: i for i, field in enumerate(header["fields"])}
+        self._language_ids = {name: i for i, name in enumerate(header["language_names"])}
+        self._project_ids = {name: i for i, name in enumerate(header["project_names"])}
+        self.signature = header["signature"]
+        self.docs = _DocTable(snapshot)
+        self.texts = _TextTable(snapshot)
+        self.doc_lengths = snapshot.doc_lengths
+        self.avg_length = header["avg_length"]
+        self.live_docs = header["live_docs"]
+        self._dictionary = None
+        self.generation += 1
+        with self._cache_lock:
+            self._decode_cache.clear()
+
+    def catalog_state(self) -> Dict[str, Any]:
+        """快照中的目录缓存状态"""
+        return self._snapshot.header["catalog"]
+
+    def reload_if_changed(self) -> bool:
+        """快照文件被替换时重新映射（旧映射在无引用后由GC释放）"""
+        now = time.monotonic()
+        if now - self._last_check < self.recheck_interval:
+            return False
+        self._last_check = now
+        try:
+            stat = os.stat(self.snapshot_path)
+        except OSError:
+            return False
+        if (stat.st_ino, stat.st_mtime_ns) == self._snapshot.stamp:
+            return False
+        try:
+            snapshot = _Snapshot(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to reload index snapshot: {e}")
+            return False
+        with self._lock:
+            self._attach(snapshot)
+        logger.info(f"Reloaded index snapshot ({len(self.docs)} documents)")
+        return True
+
+    def _top(self, query: str, language: Optional[str], project: Optional[str],
+             k: Optional[int], mode: str = "keyword",
+             expanded: Optional[Tuple[List[str], Dict[str, float]]] = None,
+             check: Optional[Callable[[], None]] = None,
+             exact_total: bool = False) -> Tuple[List[Tuple[int, float]], int]:
+        self.reload_if_changed()
+        return super()._top(query, language, project, k, mode, expanded, check, exact_total)
+
+    def expand_query(self, query: str) -> Tuple[List[str], Dict[str, float]]:
+        self.reload_if_changed()
+        return super().expand_query(query)
+
+    def _vocabulary(self) -> Iterator[str]:
+        snapshot = self._snapshot
+        for term_id in range(snapshot.term_count):
+            yield snapshot.term(term_id).decode("utf-8")
+
+    def _doc_matches(self, doc_id: int, language: Optional[str], project: Optional[str]) -> bool:
+        # 过滤只读紧凑数组，不解码文档
+        snapshot = self._snapshot
+        if language:
+            if snapshot.doc_language[doc_id] != self._language_ids.get(language, -1):
+                return False
+        if project:
+            project_name = self._snapshot.header["project_names"][snapshot.doc_project[doc_id]]
+            if project_name.split("/", 1)[1] != project:
+                return False
+        return True
+
+    def _decoded(self, term: str) -> Tuple[Dict, Dict]:
+        with self._cache_lock:
+            cached = self._decode_cache.get(term)
+            if cached is not None:
+                self._decode_cache.move_to_end(term)
+                return cached
+        term_id = self._snapshot.find_term(term)
+        decoded = self._snapshot.postings(term_id) if term_id >= 0 else ({}, {})
+        with self._cache_lock:
+            self._decode_cache[term] = decoded
+            if len(self._decode_cache) > self.cache_terms:
+                self._decode_cache.popitem(last=False)
+        return decoded
+
+    def _idf(self, term: str) -> Optional[float]:
+        term_id = self._snapshot.find_term(term)
+        return self._snapshot.term_idf[term_id] if term_id >= 0 else None
+
+    # 只读索引：更新由主进程完成后通过新快照下发
+    def load_or_build(self) -> "MappedSearchIndex":
+        return self
+
+    def build(self, signature=None) -> None:
+        raise RuntimeError("MappedSearchIndex is read-only")
+
+    def apply_changes(self, events) -> None:
+        pass
+
+    def save(self) -> None:
+        pass
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件I/O执行器
+异步处理器中的阻塞文件访问统一提交到有界线程池，避免阻塞事件循环，并记录排队指标
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class IOExecutorBusy(RuntimeError):
+    """等待队列已满"""
+
+
+class IOExecutor:
+    """有界I/O线程池
+
+    最多 max_workers 个任务并发执行，排队任务超过 max_queue 时直接拒绝，
+    让调用方快速失败而不是无限堆积。max_workers 为0时在事件循环中同步执行（用于对比测试）。
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 256):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="mcp-io") if max_workers > 0 else None
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.active = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_seconds = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """在线程池中执行阻塞函数"""
+        if self._executor is None:
+            return func(*args, **kwargs)
+
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise IOExecutorBusy(f"I/O queue is full ({self.queued} pending)")
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        submitted_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self._wait_seconds += started_at - submitted_at
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+
+    def stats(self) -> Dict[str, Any]:
+        """队列深度与等待时间指标"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self._wait_seconds * 1000 / self.completed, 3) if self.completed else 0.0,
+            }
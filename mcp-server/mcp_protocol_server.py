@@ -11,10 +11,30 @@ import logging
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence
 
+from catalog import DocumentationCatalog
+from chunking import Chunk, chunk_markdown, chunk_uri, context_budget, parse_chunk_path
+from context_builder import ContextBuilder
+from dependency_graph import DEPENDENCIES, DEPENDENTS, DependencyGraph, node_id
+from dependency_index import DependencyIndex
+from file_watcher import FileWatcher
+from index_snapshot import MappedSearchIndex
+from io_executor import IOExecutor
+from metadata_index import DEFAULT_QUERY_LIMIT, FIELDS, MAX_QUERY_LIMIT, MetadataIndex
+from notifications import RESOURCE_LIST_CHANGED, RESOURCE_UPDATED, NotificationHub, SubscriptionRegistry
+from pagination import DEFAULT_PAGE_SIZE, paginate
+from progress import ProgressReporter
+from ranking import create_ranker
+from resource_cache import CachedResource, ResourceCache
+from search_index import SEARCH_MODES, SearchIndex
+from snippets import SnippetBuilder
+from term_dictionary import QueryExpander
+from vector_index import HashingVectorizer, VectorIndex, numpy_available
+
 # 尝试导入官方MCP库
 try:
     import mcp.types as types
     from mcp.server import NotificationOptions, Server
+    from mcp.shared.exceptions import McpError
     from mcp.server.models import InitializationOptions
     import mcp.server.stdio
     MCP_AVAILABLE = True
@@ -24,10 +44,14 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 搜索结果默认/最大页大小
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
 class MCPDocumentationServer:
     """MCP协议文档服务器"""
     
-    def __init__(self, mcp_root: str):
+    def __init__(self, mcp_root: str, snapshot_path: Optional[Path] = None):
         if not MCP_AVAILABLE:
             raise ImportError("MCP library is required for this server")
             
@@ -37,9 +61,99 @@ class MCPDocumentationServer:
         # 加载配置
         self.config = self._load_config()
         
+        # 语言/项目/模块目录缓存（stdio与HTTP网关共用）
+        self.catalog = DocumentationCatalog(
+            self.mcp_root,
+            self.config.get("supported_languages", []),
+            revalidate_interval=self.config.get("catalog", {}).get("revalidate_interval", 1.0)
+        )
+        
+        # 构建/加载搜索索引；多进程工作进程直接映射主进程写出的只读快照
+        search_config = self.config.get("search", {})
+        ranker = create_ranker(search_config.get("ranker", "bm25"))
+        snippet_builder = SnippetBuilder(**search_config.get("snippets", {}))
+        expander = QueryExpander(**search_config.get("fuzzy", {}))
+        # 各类文档的词元预算，文档分块时单个片段不超过对应预算
+        self.context_windows = self.config.get("ai_integration", {}).get("context_windows", {})
+        self.read_only = snapshot_path is not None
+        if self.read_only:
+            self.search_index = MappedSearchIndex(Path(snapshot_path), ranker=ranker, snippet_builder=snippet_builder,
+                                                  context_windows=self.context_windows, expander=expander)
+            self.catalog.restore_state(self.search_index.catalog_state())
+        else:
+            self.search_index = SearchIndex(self.mcp_root, self._language_dirs(), ranker=ranker,
+                                            snippet_builder=snippet_builder,
+                                            context_windows=self.context_windows,
+                                            expander=expander).load_or_build()
+        
+        # 阻塞文件访问统一提交到有界线程池
+        io_config = self.config.get("io", {})
+        self.io = IOExecutor(
+            max_workers=io_config.get("max_workers", 8),
+            max_queue=io_config.get("max_queue", 256)
+        )
+        
+        # 序列化后的资源响应缓存
+        cache_config = self.config.get("resource_cache", {})
+        self.resource_cache = ResourceCache(
+            max_entries=cache_config.get("max_entries", 256),
+            max_bytes=cache_config.get("max_bytes", 32 * 1024 * 1024)
+        )
+        
+        # 可选的语义检索：哈希TF-IDF向量（NumPy内存映射矩阵），工作进程只读映射主进程写出的向量文件
+        self._init_vectors(search_config.get("semantic", {}))
+        
+        # build_context 工具：按词元预算组装上下文，结果按 (项目, 查询, 预算) 缓存
+        context_config = self.config.get("context", {})
+        self.context_builder = ContextBuilder(
+            self.search_index, self.catalog, self.document_chunks,
+            default_budget=context_budget("README.md", self.context_windows),
+            max_documents=context_config.get("max_documents", 20),
+            cache_entries=context_config.get("cache_entries", 128)
+        )
+        
+        # query_metadata 工具：project-info.json / metadata.json 的列式索引，目录版本变化后重建
+        self.metadata_index = MetadataIndex(self.catalog)
+        
+        # find_dependents / find_dependencies 工具：依赖正向/反向表，只重新提取元数据变化的项目
+        self.dependency_index = DependencyIndex(self.catalog)
+        # 传递闭包、依赖环与拓扑序：邻接数组依赖图，按项目从依赖索引打补丁
+        self.dependency_graph = DependencyGraph()
+        
+        # resources/list 等列表接口的分页大小
+        self.page_size = self.config.get("pagination", {}).get("page_size", DEFAULT_PAGE_SIZE)
+        
+        # 文件监听器（run()时启动）
+        self.watcher: Optional[FileWatcher] = None
+        
+        # 变更通知（stdio会话与HTTP网关共用）
+        self.notifications = NotificationHub()
+        self.subscriptions = SubscriptionRegistry()
+        self._stdio_session = None
+        
         # 注册handlers
         self._register_handlers()
     
+    def _init_vectors(self, semantic_config: Dict[str, Any]) -> None:
+        """按 search.semantic 配置挂载向量索引"""
+        if not semantic_config.get("enabled", False):
+            return
+        if not numpy_available():
+            logger.warning("search.semantic is enabled but NumPy is not installed; semantic search disabled")
+            return
+        vectors = VectorIndex(
+            self.mcp_root,
+            HashingVectorizer(dim=semantic_config.get("dim", 512)),
+            read_only=self.read_only,
+            ivf_min_rows=semantic_config.get("ivf_min_rows", 20000),
+            nprobe=semantic_config.get("nprobe", 32),
+            min_score=semantic_config.get("min_score", 0.08),
+            hybrid_weight=semantic_config.get("hybrid_weight", 0.5)
+        )
+        if not self.read_only:
+            vectors.sync(self.search_index)
+        self.search_index.vectors = vectors
+    
     def _load_config(self) -> Dict:
         """加载MCP配置"""
         try:
@@ -54,67 +168,81 @@ class MCPDocumentationServer:
         """注册MCP消息处理器"""
         
         @self.server.list_resources()
-        async def handle_list_resources() -> list[types.Resource]:
-            """列出所有可用资源"""
-            return [
-                types.Resource(
-                    uri=item["uri"],
-                    name=item["name"],
-                    description=item["description"],
-                    mimeType=item["mimeType"]
-                )
-                for item in self.collect_resources()
-            ]
+        async def handle_list_resources(request: types.ListResourcesRequest) -> types.ListResourcesResult:
+            """列出可用资源（分页）"""
+            self._remember_session()
+            page, next_cursor = self._list_page(await self.collect_resources(), request)
+            return types.ListResourcesResult(
+                resources=[
+                    types.Resource(
+                        uri=item["uri"],
+                        name=item["name"],
+                        description=item["description"],
+                        mimeType=item["mimeType"]
+                    )
+                    for item in page
+                ],
+                nextCursor=next_cursor
+            )
+        
+        async def handle_list_resource_templates(request: types.ListResourceTemplatesRequest) -> types.ServerResult:
+            """列出资源模板（分页）；SDK的装饰器不传递cursor，直接注册请求处理器"""
+            self._remember_session()
+            page, next_cursor = self._paginate(self.resource_templates(), request.params)
+            return types.ServerResult(types.ListResourceTemplatesResult(
+                resourceTemplates=[types.ResourceTemplate(**item) for item in page],
+                nextCursor=next_cursor
+            ))
+        
+        self.server.request_handlers[types.ListResourceTemplatesRequest] = handle_list_resource_templates
         
         @self.server.read_resource()
         async def handle_read_resource(uri: str) -> str:
             """读取资源内容"""
+            self._remember_session()
             try:
-                # 解析URI
-                if not uri.startswith("mcp-docs://"):
-                    raise ValueError(f"不支持的URI格式: {uri}")
-                
-                path_parts = uri.replace("mcp-docs://", "").split("/")
-                resource_type = path_parts[0]
-                
-                if resource_type == "project":
-                    language, project = path_parts[1], path_parts[2]
-                    return await self._read_project_resource(language, project)
-                
-                elif resource_type == "readme":
-                    language, project = path_parts[1], path_parts[2]
-                    return await self._read_readme_resource(language, project)
-                
-                elif resource_type == "module":
-                    language, project, module = path_parts[1], path_parts[2], path_parts[3]
-                    return await self._read_module_resource(language, project, module)
-                
-                else:
-                    raise ValueError(f"未知资源类型: {resource_type}")
-            
+                return (await self.read_resource(str(uri))).text
             except Exception as e:
                 logger.error(f"读取资源失败 {uri}: {e}")
                 raise
         
+        @self.server.subscribe_resource()
+        async def handle_subscribe_resource(uri) -> None:
+            """订阅资源变更"""
+            if not self.watches_files:
+                raise ValueError("resources/subscribe is not supported: file watching is disabled")
+            self._remember_session()
+            self.subscriptions.subscribe("stdio", str(uri))
+        
+        @self.server.unsubscribe_resource()
+        async def handle_unsubscribe_resource(uri) -> None:
+            """取消订阅资源变更"""
+            self.subscriptions.unsubscribe("stdio", str(uri))
+        
         @self.server.list_tools()
-        async def handle_list_tools() -> list[types.Tool]:
-            """列出可用工具"""
-            tools = []
-            for item in self.tool_definitions():
-                tools.append(
-                types.Tool(
+        async def handle_list_tools(request: types.ListToolsRequest) -> types.ListToolsResult:
+            """列出可用工具（分页）"""
+            self._remember_session()
+            page, next_cursor = self._list_page(self.tool_definitions(), request)
+            return types.ListToolsResult(
+                tools=[
+                    types.Tool(
                         name=item["name"],
                         description=item["description"],
                         inputSchema=item["inputSchema"]
                     )
-                )
-            return tools
+                    for item in page
+                ],
+                nextCursor=next_cursor
+            )
         
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent]:
             """执行工具调用"""
+            self._remember_session()
+            reporter = self._stdio_progress_reporter()
             try:
-                result = await self.execute_tool(name, arguments)
+                result = await self.execute_tool(name, arguments, reporter)
                 
                 return [types.TextContent(
                     type="text",
@@ -128,34 +256,157 @@ class MCPDocumentationServer:
                     text=f"错误: {str(e)}"
                 )]
     
-    async def _read_project_resource(self, language: str, project: str) -> str:
-        """读取项目资源"""
-        project_path = self._get_project_path(language, project)
-        if not project_path or not project_path.exists():
+    def _list_page(self, items: List[Dict[str, Any]], request: Any) -> tuple:
+        """列表请求的一页；SDK内部刷新工具缓存时以 None 调用处理器，此时返回完整列表"""
+        if request is None:
+            return items, None
+        return self._paginate(items, request.params)
+    
+    def _paginate(self, items: List[Dict[str, Any]], params: Any) -> tuple:
+        """按请求参数中的cursor分页；cursor无效时返回 INVALID_PARAMS 错误"""
+        try:
+            return paginate(items, getattr(params, "cursor", None), self.page_size)
+        except ValueError as e:
+            raise McpError(types.ErrorData(code=types.INVALID_PARAMS, message=str(e))) from e
+    
+    def _stdio_progress_reporter(self) -> ProgressReporter:
+        """按请求中的 _meta.progressToken 创建进度汇报器"""
+        request_context = self.server.request_context
+        meta = request_context.meta
+        progress_token = getattr(meta, "progressToken", None) if meta else None
+        if progress_token is None:
+            return ProgressReporter()
+        
+        session = request_context.session
+        request_id = request_context.request_id
+        
+        async def send_progress(params: Dict[str, Any]) -> None:
+            await session.send_progress_notification(
+                progress_token,
+                params["progress"],
+                total=params.get("total"),
+                message=params.get("message"),
+                related_request_id=request_id,
+            )
+        
+        return ProgressReporter(progress_token, send_progress)
+    
+    def _remember_session(self) -> None:
+        """记录当前stdio会话，用于在请求之外推送通知"""
+        try:
+            session = self.server.request_context.session
+        except LookupError:
+            return
+        if session is self._stdio_session:
+            return
+        self._stdio_session = session
+        self.notifications.register("stdio", self._send_stdio_notification)
+    
+    async def _send_stdio_notification(self, message: Dict[str, Any]) -> None:
+        """把通知消息转换为MCP会话调用"""
+        session = self._stdio_session
+        if session is None:
+            return
+        if message["method"] == RESOURCE_LIST_CHANGED:
+            await session.send_resource_list_changed()
+        elif message["method"] == RESOURCE_UPDATED:
+            await session.send_resource_updated(message["params"]["uri"])
+    
+    async def read_resource(self, uri: str) -> CachedResource:
+        """读取资源（经过响应缓存）"""
+        if not uri.startswith("mcp-docs://"):
+            raise ValueError(f"不支持的URI格式: {uri}")
+        
+        path_parts = uri.replace("mcp-docs://", "").split("/")
+        resource_type = path_parts[0]
+        
+        if resource_type == "project":
+            language, project = path_parts[1], path_parts[2]
+            mime_type, reader = "application/json", lambda: self._load_project_resource(language, project)
+        elif resource_type == "readme":
+            language, project = path_parts[1], path_parts[2]
+            mime_type, reader = "text/markdown", lambda: self._load_readme_resource(language, project)
+        elif resource_type == "module":
+            language, project, module = path_parts[1], path_parts[2], path_parts[3]
+            mime_type, reader = "application/json", lambda: self._load_module_resource(language, project, module)
+        elif resource_type in {"chunk", "toc"}:
+            language, project, relative_path, chunk_id = parse_chunk_path(path_parts[1:], resource_type == "chunk")
+            mime_type, reader = "application/json", lambda: self._load_chunk_resource(
+                language, project, relative_path, chunk_id)
+        else:
+            raise ValueError(f"未知资源类型: {resource_type}")
+        
+        # 目录校验需要stat，放到I/O线程池；缓存命中路径不产生文件访问
+        await self.refresh_catalog()
+        if resource_type in {"chunk", "toc"}:
+            fingerprint = self._document_fingerprint(language, project, relative_path)
+        else:
+            fingerprint = self._resource_fingerprint(resource_type, path_parts[1:])
+        if fingerprint is not None:
+            cached = self.resource_cache.get(uri, fingerprint)
+            if cached is not None:
+                return cached
+        
+        entry = CachedResource(uri, mime_type, await self.io.run(reader), fingerprint)
+        if fingerprint is not None:
+            self.resource_cache.put(entry)
+        return entry
+    
+    def _resource_fingerprint(self, resource_type: str, parts: List[str]) -> Optional[tuple]:
+        """由目录缓存中的源文件标记组成缓存校验值，资源不存在时返回None"""
+        project_entry = self.catalog.project(parts[0], parts[1])
+        if not project_entry:
+            return None
+        if resource_type == "project":
+            module_stamps = tuple((module.name, module.metadata_stamp) for module in project_entry.modules.values())
+            return project_entry.info_stamp, project_entry.readme_stamp, module_stamps
+        if resource_type == "readme":
+            return (project_entry.readme_stamp,) if project_entry.readme_stamp else None
+        module_entry = project_entry.modules.get(parts[2]) if len(parts) > 2 else None
+        if not module_entry:
+            return None
+        return module_entry.metadata_stamp, module_entry.readme_stamp
+    
+    def _document_fingerprint(self, language: str, project: str, relative_path: str) -> Optional[tuple]:
+        """README类文档的缓存校验值；目录缓存不跟踪的文件不缓存"""
+        project_entry = self.catalog.project(language, project)
+        if not project_entry:
+            return None
+        if relative_path == "README.md":
+            return (project_entry.readme_stamp,) if project_entry.readme_stamp else None
+        module_name, _, file_name = relative_path.partition("/")
+        module_entry = project_entry.modules.get(module_name)
+        if file_name == "README.md" and module_entry and module_entry.readme_stamp:
+            return (module_entry.readme_stamp,)
+        return None
+    
+    def _load_project_resource(self, language: str, project: str) -> str:
+        """读取项目资源（在I/O线程池中执行）"""
+        project_entry = self.catalog.project(language, project)
+        if not project_entry:
             raise FileNotFoundError(f"项目未找到: {language}/{project}")
         
-        # 加载项目信息
-        project_info = self._load_json_file(project_path / "project-info.json")
+        # 项目信息来自目录缓存
+        project_info = project_entry.info
         if not project_info:
             raise FileNotFoundError("项目元数据未找到")
         
         # 加载README
         readme_content = ""
-        readme_path = project_path / "README.md"
+        readme_path = project_entry.path / "README.md"
         if readme_path.exists():
             with open(readme_path, 'r', encoding='utf-8') as f:
                 readme_content = f.read()
         
         # 获取模块信息
-        modules = []
-        for module_dir in project_path.iterdir():
-            if module_dir.is_dir() and (module_dir / "metadata.json").exists():
-                module_metadata = self._load_json_file(module_dir / "metadata.json")
-                if module_metadata:
-                    modules.append({
-                        "name": module_dir.name,
-                        "metadata": module_metadata.get("module_metadata", {})
-                    })
+        modules = [
+            {
+                "name": module.name,
+                "metadata": module.metadata.get("module_metadata", {})
+            }
+            for module in self.catalog.modules(language, project)
+            if module.metadata
+        ]
         
         result = {
             "project_info": project_info,
@@ -165,8 +416,8 @@ class MCPDocumentationServer:
         
         return json.dumps(result, indent=2, ensure_ascii=False)
     
-    async def _read_readme_resource(self, language: str, project: str) -> str:
-        """读取README资源"""
+    def _load_readme_resource(self, language: str, project: str) -> str:
+        """读取README资源（在I/O线程池中执行）"""
         project_path = self._get_project_path(language, project)
         if not project_path:
             raise FileNotFoundError(f"项目未找到: {language}/{project}")
@@ -178,8 +429,8 @@ class MCPDocumentationServer:
         with open(readme_path, 'r', encoding='utf-8') as f:
             return f.read()
     
-    async def _read_module_resource(self, language: str, project: str, module: str) -> str:
-        """读取模块资源"""
+    def _load_module_resource(self, language: str, project: str, module: str) -> str:
+        """读取模块资源（在I/O线程池中执行）"""
         project_path = self._get_project_path(language, project)
         if not project_path:
             raise FileNotFoundError(f"项目未找到: {language}/{project}")
@@ -189,7 +440,8 @@ class MCPDocumentationServer:
             raise FileNotFoundError(f"模块未找到: {module}")
         
         # 加载模块元数据
-        metadata = self._load_json_file(module_path / "metadata.json")
+        module_entry = self.catalog.module(language, project, module)
+        metadata = (module_entry.metadata or None) if module_entry else None
         
         # 加载模块README
         readme_content = ""
@@ -205,84 +457,184 @@ class MCPDocumentationServer:
         
         return json.dumps(result, indent=2, ensure_ascii=False)
     
-    async def _search_documentation(self, query: str, language: str = None, project: str = None) -> Dict:
-        """搜索文档"""
-        results = []
-        search_terms = query.lower().split()
+    def document_chunks(self, language: str, project: str, relative_path: str) -> List[Chunk]:
+        """按标题切分项目内的Markdown文档（在I/O线程池中执行）"""
+        project_path = self._get_project_path(language, project)
+        if not project_path:
+            raise FileNotFoundError(f"项目未找到: {language}/{project}")
         
-        # 搜索逻辑（简化版）
-        for lang_config in self.config.get("supported_languages", []):
-            if language and lang_config["name"] != language:
-                continue
-                
-            lang_dir = self.mcp_root / lang_config["display_name"]
-            if not lang_dir.exists():
-                continue
-            
-            for project_dir in lang_dir.iterdir():
-                if not project_dir.is_dir():
-                    continue
-                if project and project_dir.name != project:
-                    continue
-                
-                # 搜索项目文档
-                for file_path in project_dir.rglob("*.md"):
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read().lower()
-                        
-                        score = sum(content.count(term) for term in search_terms)
-                        if score > 0:
-                            results.append({
-                                "language": lang_config["name"],
-                                "project": project_dir.name,
-                                "file": file_path.name,
-                                "score": score,
-                                "preview": content[:200] + "..."
-                            })
-                    except Exception:
-                        continue
-        
-        results.sort(key=lambda x: x["score"], reverse=True)
+        file_path = (project_path / relative_path).resolve()
+        if project_path.resolve() not in file_path.parents or file_path.suffix.lower() != ".md":
+            raise ValueError(f"不支持的文档路径: {relative_path}")
+        if not file_path.exists():
+            raise FileNotFoundError(f"文档未找到: {relative_path}")
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return chunk_markdown(content, context_budget(relative_path, self.context_windows))
+    
+    def _load_chunk_resource(self, language: str, project: str, relative_path: str,
+                             chunk_id: Optional[str]) -> str:
+        """读取文档片段；chunk_id为None时返回片段目录（在I/O线程池中执行）"""
+        chunks = self.document_chunks(language, project, relative_path)
+        uris = [chunk_uri(language, project, relative_path, chunk.chunk_id) for chunk in chunks]
+        
+        if chunk_id is None:
+            result = {
+                "language": language,
+                "project": project,
+                "file": relative_path,
+                "budget": context_budget(relative_path, self.context_windows),
+                "chunks": [chunk.summary(uri) for chunk, uri in zip(chunks, uris)],
+            }
+            return json.dumps(result, indent=2, ensure_ascii=False)
+        
+        for i, chunk in enumerate(chunks):
+            if chunk.chunk_id == chunk_id:
+                result = chunk.summary(uris[i])
+                result.update({
+                    "text": chunk.text,
+                    "previous": uris[i - 1] if i > 0 else None,
+                    "next": uris[i + 1] if i + 1 < len(chunks) else None,
+                })
+                return json.dumps(result, indent=2, ensure_ascii=False)
+        raise FileNotFoundError(f"片段未找到: {relative_path}/{chunk_id}")
+    
+    async def _search_documentation(self, query: str, language: str = None, project: str = None,
+                                    offset: int = 0, limit: int = DEFAULT_SEARCH_LIMIT, mode: str = "keyword",
+                                    exact_total: bool = False, reporter: Optional[ProgressReporter] = None) -> Dict:
+        """搜索文档（offset/limit 翻页；mode 为 keyword / semantic / hybrid；exact_total 精确计数命中总数）"""
+        offset = max(0, int(offset))
+        limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+        return await self.io.run(self.search_index.search, query, language=language, project=project,
+                                 limit=limit, offset=offset, mode=mode, reporter=reporter or ProgressReporter(),
+                                 exact_total=bool(exact_total))
+    
+    async def _build_context(self, language: str, project: str, query: str, budget: Optional[int] = None,
+                             reporter: Optional[ProgressReporter] = None) -> Dict:
+        """在词元预算内组装项目上下文"""
+        await self.refresh_catalog()
+        return await self.io.run(self.context_builder.build, language, project, query, budget,
+                                 reporter or ProgressReporter())
+    
+    async def _query_metadata(self, kind: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+                              sort: Any = None, offset: int = 0, limit: int = DEFAULT_QUERY_LIMIT,
+                              count_by: Any = None, reporter: Optional[ProgressReporter] = None) -> Dict:
+        """按元数据字段过滤、排序、计数（索引是最新的时直接在事件循环中完成）"""
+        if self.metadata_index.stale():
+            await self.io.run(self.metadata_index.ensure_current)
+        return self.metadata_index.query(kind=kind, filters=filters, sort=sort, offset=offset, limit=limit,
+                                         count_by=count_by)
+    
+    async def _sync_dependencies(self) -> None:
+        """依赖索引按需更新（可能产生文件I/O），依赖图只为变化的项目打补丁"""
+        if self.dependency_index.stale():
+            await self.io.run(self.dependency_index.ensure_current)
+        self.dependency_graph.sync(self.dependency_index)
+    
+    def _transitive(self, keys: List[Any], direction: str) -> List[Dict]:
+        """传递闭包 → 节点描述，depth 为最短依赖距离"""
+        return [dict(self.dependency_index.node(key), depth=depth)
+                for key, depth in self.dependency_graph.closure(keys, direction)]
+    
+    async def _find_dependents(self, library: Optional[str] = None, language: Optional[str] = None,
+                               project: Optional[str] = None, module: Optional[str] = None,
+                               transitive: bool = False, reporter: Optional[ProgressReporter] = None) -> Dict:
+        """查询依赖某个库、项目或模块的项目与模块（反向表查找，transitive 时沿依赖图向上求闭包）"""
+        await self._sync_dependencies()
+        target = self.dependency_index.resolve(library, language, project, module)
+        if transitive:
+            starts = [target] + list(self.dependency_index.library_aliases(target).values())
+            dependents = [entry for entry in self._transitive(starts, DEPENDENTS) if entry["type"] != "library"]
+        else:
+            dependents = self.dependency_index.dependents(target)
+        return {
+            "target": self.dependency_index.node(target),
+            "dependents": dependents,
+            "count": len(dependents),
+            "projects": sorted({f"{entry['language']}/{entry['project']}" for entry in dependents}),
+        }
+    
+    async def _find_dependencies(self, language: str, project: str, module: Optional[str] = None,
+                                 include_modules: bool = True, transitive: bool = False,
+                                 reporter: Optional[ProgressReporter] = None) -> Dict:
+        """查询项目或模块依赖的库与模块（正向表查找，transitive 时沿依赖图向下求闭包）"""
+        await self._sync_dependencies()
+        source = self.dependency_index.resolve(language=language, project=project, module=module)
+        if transitive:
+            dependencies = self._transitive([source], DEPENDENCIES)
+        else:
+            dependencies = self.dependency_index.dependencies(source, include_modules)
+        return {
+            "source": self.dependency_index.node(source),
+            "dependencies": dependencies,
+            "count": len(dependencies),
+            "libraries": sorted({entry["name"] for entry in dependencies if entry["type"] == "library"}),
+        }
+    
+    async def _analyze_dependency_graph(self, language: Optional[str] = None, project: Optional[str] = None,
+                                        include_libraries: bool = False,
+                                        reporter: Optional[ProgressReporter] = None) -> Dict:
+        """依赖环检测与拓扑排序（被依赖方在前），可限定语言或项目"""
+        await self._sync_dependencies()
+        if project:
+            if not language:
+                raise ValueError("指定 project 时需要同时指定 language")
+            self.dependency_index.resolve(language=language, project=project)
+        
+        def in_scope(key) -> bool:
+            if key[0] == "library":
+                return include_libraries and not language
+            return (not language or key[1] == language) and (not project or key[2] == project)
         
+        cycles = [[node_id(key) for key in cycle] for cycle in self.dependency_graph.cycles()
+                  if any(in_scope(key) for key in cycle)]
+        order = [node_id(key) for key in self.dependency_graph.topological_order() if in_scope(key)]
         return {
-            "query": query,
-            "total_results": len(results),
-            "results": results[:20]  # 限制结果数量
+            "order": order,
+            "cycles": cycles,
+            "has_cycles": bool(cycles),
+            "node_count": len(order),
         }
     
-    async def _analyze_project_structure(self, language: str, project: str) -> Dict:
+    async def _analyze_project_structure(self, language: str, project: str,
+                                         reporter: Optional[ProgressReporter] = None) -> Dict:
         """分析项目结构"""
-        project_path = self._get_project_path(language, project)
-        if not project_path or not project_path.exists():
+        return await self.io.run(self._collect_project_structure, language, project, reporter or ProgressReporter())
+    
+    def _collect_project_structure(self, language: str, project: str, reporter: ProgressReporter) -> Dict:
+        """分析项目结构（在I/O线程池中执行）"""
+        project_entry = self.catalog.project(language, project)
+        if not project_entry:
             raise FileNotFoundError(f"项目未找到: {language}/{project}")
         
-        # 加载项目信息
-        project_info = self._load_json_file(project_path / "project-info.json")
-        if not project_info:
+        # 项目信息来自目录缓存
+        if not project_entry.info:
             raise FileNotFoundError("项目元数据未找到")
         
         modules = []
         dependencies = set()
         
-        for module_dir in project_path.iterdir():
-            if module_dir.is_dir() and (module_dir / "metadata.json").exists():
-                module_metadata = self._load_json_file(module_dir / "metadata.json")
-                if module_metadata:
-                    module_info = module_metadata.get("module_metadata", {})
-                    modules.append({
-                        "name": module_dir.name,
-                        "status": module_info.get("status", "unknown"),
-                        "description": module_info.get("description", "")
-                    })
-                    
-                    # 收集依赖
-                    tech_details = module_metadata.get("technical_details", {})
-                    deps = tech_details.get("dependencies", {})
-                    if "external" in deps:
-                        for dep in deps["external"]:
-                            dependencies.add(dep.get("library", "unknown"))
+        project_modules = self.catalog.modules(language, project)
+        for i, module in enumerate(project_modules):
+            reporter.update(i, len(project_modules), module.name)
+            module_metadata = module.metadata
+            if module_metadata:
+                module_info = module_metadata.get("module_metadata", {})
+                modules.append({
+                    "name": module.name,
+                    "status": module_info.get("status", "unknown"),
+                    "description": module_info.get("description", "")
+                })
+                
+                # 收集依赖
+                tech_details = module_metadata.get("technical_details", {})
+                deps = tech_details.get("dependencies", {})
+                if "external" in deps:
+                    for dep in deps["external"]:
+                        dependencies.add(dep.get("library", "unknown"))
         
+        reporter.update(len(project_modules), len(project_modules))
         return {
             "project": project,
             "language": language,
@@ -292,8 +644,13 @@ class MCPDocumentationServer:
             "dependency_count": len(dependencies)
         }
     
-    async def _check_documentation_quality(self, scope: str, **kwargs) -> Dict:
+    async def _check_documentation_quality(self, scope: str, reporter: Optional[ProgressReporter] = None,
+                                           **kwargs) -> Dict:
         """检查文档质量"""
+        return await self.io.run(self._collect_documentation_quality, scope, reporter or ProgressReporter(), **kwargs)
+    
+    def _collect_documentation_quality(self, scope: str, reporter: ProgressReporter, **kwargs) -> Dict:
+        """检查文档质量（在I/O线程池中执行）"""
         # 这里可以集成质量检查脚本
         # 为了简化，返回基本信息
         
@@ -302,13 +659,20 @@ class MCPDocumentationServer:
         
         if scope == "all":
             # 检查所有项目
+            project_dirs = []
             for lang_config in self.config.get("supported_languages", []):
                 lang_dir = self.mcp_root / lang_config["display_name"]
                 if lang_dir.exists():
-                    for project_dir in lang_dir.iterdir():
-                        if project_dir.is_dir():
-                            total_files += len(list(project_dir.rglob("*.md")))
-                            total_files += len(list(project_dir.rglob("*.json")))
+                    project_dirs.extend(project_dir for project_dir in lang_dir.iterdir() if project_dir.is_dir())
+            
+            for i, project_dir in enumerate(project_dirs):
+                reporter.update(i, len(project_dirs), project_dir.name)
+                for file_path in project_dir.rglob("*"):
+                    # 取消后尽快停止遍历
+                    reporter.check()
+                    if file_path.suffix in (".md", ".json"):
+                        total_files += 1
+            reporter.update(len(project_dirs), len(project_dirs))
         
         return {
             "scope": scope,
@@ -318,6 +682,13 @@ class MCPDocumentationServer:
             "quality_score": max(0, 100 - len(issues) * 5)  # 简单评分
         }
     
+    def _language_dirs(self) -> Dict[str, Path]:
+        """语言名称到文档目录的映射"""
+        return {
+            lang_config["name"]: self.mcp_root / lang_config["display_name"]
+            for lang_config in self.config.get("supported_languages", [])
+        }
+    
     def _get_project_path(self, language: str, project: str) -> Optional[Path]:
         """获取项目路径"""
         for lang_config in self.config.get("supported_languages", []):
@@ -325,74 +696,131 @@ class MCPDocumentationServer:
                 return self.mcp_root / lang_config["display_name"] / project
         return None
     
-    def _load_json_file(self, file_path: Path) -> Optional[Dict]:
-        """加载JSON文件"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.warning(f"Failed to load {file_path}: {e}")
-            return None
+    @property
+    def watches_files(self) -> bool:
+        """是否监听文件变更并推送资源通知；只读快照（多进程工作进程）与关闭监听时为False"""
+        return not self.read_only and self.config.get("watcher", {}).get("enabled", True)
+
+    def start_watcher(self) -> None:
+        """启动文件监听，变更事件增量刷新目录缓存与搜索索引"""
+        watcher_config = self.config.get("watcher", {})
+        if self.watcher is not None or not self.watches_files:
+            return
+        
+        self.watcher = FileWatcher(
+            self.mcp_root,
+            debounce=watcher_config.get("debounce", 0.2),
+            poll_interval=watcher_config.get("poll_interval", 2.0),
+            backend=watcher_config.get("backend", "auto")
+        )
+        self.watcher.subscribe(self._handle_file_changes)
+        self.watcher.start()
+        
+        # 由事件驱动失效，不再定期stat校验
+        self.catalog.revalidate_interval = float("inf")
+    
+    def _handle_file_changes(self, events) -> None:
+        """文件变更回调（监听线程）：刷新缓存与索引，目录变化时通知客户端"""
+        catalog_changed = self.catalog.apply_changes(events)
+        self.search_index.apply_changes(events)
+        if self.search_index.vectors is not None:
+            self.search_index.vectors.sync(self.search_index)
+        if catalog_changed:
+            self.notifications.publish(RESOURCE_LIST_CHANGED)
+        
+        changed_uris = set()
+        for event in events:
+            changed_uris.update(self.catalog.resource_uris_for(event.path))
+        # 缓存校验值已随目录标记变化，这里只是提前释放旧内容
+        for uri in changed_uris:
+            self.resource_cache.discard(uri)
+        
+        if len(self.subscriptions):
+            for subscriber, uri in self.subscriptions.fan_out(sorted(changed_uris)):
+                self.notifications.send(subscriber, RESOURCE_UPDATED, {"uri": uri})
+    
+    def stop_watcher(self) -> None:
+        """停止文件监听并持久化增量更新后的索引"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self.catalog.revalidate_interval = self.config.get("catalog", {}).get("revalidate_interval", 1.0)
+        if self.search_index.dirty:
+            self.search_index.save()
     
     async def run(self):
         """运行MCP服务器"""
         logger.info("Starting MCP Documentation Server")
         logger.info(f"MCP Root: {self.mcp_root}")
         
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="mcp-documentation-server",
-                    server_version="1.0.0",
-                    capabilities=self.server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
+        capabilities = self.server.get_capabilities(
+            notification_options=NotificationOptions(resources_changed=self.watches_files),
+            experimental_capabilities={},
+        )
+        # 底层SDK不会根据订阅处理器自动声明subscribe能力
+        capabilities.resources.subscribe = self.watches_files
+        
+        self.start_watcher()
+        try:
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    InitializationOptions(
+                        server_name="mcp-documentation-server",
+                        server_version="1.0.0",
+                        capabilities=capabilities,
                     ),
-                ),
-            )
-
-    def collect_resources(self) -> List[Dict[str, Any]]:
-        resources: List[Dict[str, Any]] = []
-        for lang_config in self.config.get("supported_languages", []):
-            lang_dir = self.mcp_root / lang_config["display_name"]
-            if not lang_dir.exists():
-                continue
-
-            for project_dir in lang_dir.iterdir():
-                if not project_dir.is_dir():
-                    continue
-
-                project_name = project_dir.name
-                language = lang_config["name"]
-
-                resources.append({
-                    "uri": f"mcp-docs://project/{language}/{project_name}",
-                    "name": f"项目: {project_name} ({language})",
-                    "description": f"{language}项目的完整文档和元数据",
-                    "mimeType": "application/json"
-                })
-
-                readme_path = project_dir / "README.md"
-                if readme_path.exists():
-                    resources.append({
-                        "uri": f"mcp-docs://readme/{language}/{project_name}",
-                        "name": f"README: {project_name}",
-                        "description": f"{project_name}项目的README文档",
-                        "mimeType": "text/markdown"
-                    })
+                )
+        finally:
+            self.subscriptions.drop("stdio")
+            self.notifications.unregister("stdio")
+            self._stdio_session = None
+            self.stop_watcher()
 
-                for module_dir in project_dir.iterdir():
-                    if module_dir.is_dir() and (module_dir / "metadata.json").exists():
-                        module_name = module_dir.name
-                        resources.append({
-                            "uri": f"mcp-docs://module/{language}/{project_name}/{module_name}",
-                            "name": f"模块: {module_name}",
-                            "description": f"{project_name}项目中的{module_name}模块",
-                            "mimeType": "application/json"
-                        })
-        return resources
+    def resource_templates(self) -> List[Dict[str, Any]]:
+        """资源URI模板"""
+        return [
+            {
+                "uriTemplate": "mcp-docs://project/{language}/{project}",
+                "name": "项目",
+                "description": "项目的完整文档和元数据",
+                "mimeType": "application/json"
+            },
+            {
+                "uriTemplate": "mcp-docs://readme/{language}/{project}",
+                "name": "README",
+                "description": "项目的README文档",
+                "mimeType": "text/markdown"
+            },
+            {
+                "uriTemplate": "mcp-docs://module/{language}/{project}/{module}",
+                "name": "模块",
+                "description": "项目中单个模块的元数据和README",
+                "mimeType": "application/json"
+            },
+            {
+                "uriTemplate": "mcp-docs://toc/{language}/{project}/{path}",
+                "name": "文档片段目录",
+                "description": "按标题切分的片段列表（含词元估算），path为项目内的Markdown路径",
+                "mimeType": "application/json"
+            },
+            {
+                "uriTemplate": "mcp-docs://chunk/{language}/{project}/{path}/{chunk}",
+                "name": "文档片段",
+                "description": "单个标题章节，大小不超过 ai_integration.context_windows 中对应的预算",
+                "mimeType": "application/json"
+            },
+        ]
+    
+    async def refresh_catalog(self) -> None:
+        """目录标记需要重新校验时在I/O线程池中刷新，不在事件循环中stat/scandir"""
+        if self.catalog.stale():
+            await self.io.run(self.catalog.refresh)
+    
+    async def collect_resources(self) -> List[Dict[str, Any]]:
+        await self.refresh_catalog()
+        return self.catalog.resources()
 
     def tool_definitions(self) -> List[Dict[str, Any]]:
         languages = [lang["name"] for lang in self.config.get("supported_languages", [])]
@@ -415,11 +843,185 @@ class MCPDocumentationServer:
                         "project": {
                             "type": "string",
                             "description": "限制搜索的项目（可选）"
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "跳过的结果数，用于翻页（可选，默认0）",
+                            "minimum": 0
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": f"返回的最大结果数（可选，默认{DEFAULT_SEARCH_LIMIT}）",
+                            "minimum": 1,
+                            "maximum": MAX_SEARCH_LIMIT
+                        },
+                        "mode": {
+                            "type": "string",
+                            "description": "检索模式：keyword（默认）、semantic（向量）或 hybrid（混合），后两者需启用 search.semantic",
+                            "enum": list(SEARCH_MODES)
+                        },
+                        "exact_total": {
+                            "type": "boolean",
+                            "description": "精确统计 total_results（可选，默认false时为估计值，较慢）"
                         }
                     },
                     "required": ["query"]
                 }
             },
+            {
+                "name": "build_context",
+                "description": "在词元预算内组装与查询最相关的文档片段、模块元数据和API文档",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "language": {
+                            "type": "string",
+                            "description": "编程语言",
+                            "enum": languages
+                        },
+                        "project": {
+                            "type": "string",
+                            "description": "项目名称"
+                        },
+                        "query": {
+                            "type": "string",
+                            "description": "任务或问题描述"
+                        },
+                        "budget": {
+                            "type": "integer",
+                            "description": "词元预算（可选，默认取 ai_integration.context_windows.project_context）",
+                            "minimum": 1
+                        }
+                    },
+                    "required": ["language", "project", "query"]
+                }
+            },
+            {
+                "name": "query_metadata",
+                "description": "按状态、语言、依赖、版本、更新时间等元数据字段查询项目和模块，支持过滤、排序和分组计数",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "kind": {
+                            "type": "string",
+                            "description": "只查询项目或模块（可选）",
+                            "enum": ["project", "module"]
+                        },
+                        "filters": {
+                            "type": "object",
+                            "description": (
+                                f"字段 → 条件，字段为 {', '.join(FIELDS)}；条件为单值（等于）、数组（任一）或 "
+                                "{\"eq\"|\"ne\"|\"in\"|\"gt\"|\"gte\"|\"lt\"|\"lte\"|\"exists\": 值}，"
+                                "last_updated 另支持 {\"within_days\": 7}"
+                            )
+                        },
+                        "sort": {
+                            "type": "array",
+                            "description": "排序字段，前缀 - 表示降序，如 [\"-last_updated\", \"name\"]（可选）",
+                            "items": {"type": "string"}
+                        },
+                        "count_by": {
+                            "type": "array",
+                            "description": "返回这些字段各取值的命中数（可选）",
+                            "items": {"type": "string", "enum": list(FIELDS)}
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "跳过的结果数（可选，默认0）",
+                            "minimum": 0
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": f"返回的最大结果数（可选，默认{DEFAULT_QUERY_LIMIT}）",
+                            "minimum": 0,
+                            "maximum": MAX_QUERY_LIMIT
+                        }
+                    }
+                }
+            },
+            {
+                "name": "find_dependents",
+                "description": "影响分析：列出直接依赖某个第三方库、项目或模块的项目与模块",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "library": {
+                            "type": "string",
+                            "description": "第三方库名（不区分大小写），与 language/project 二选一"
+                        },
+                        "language": {
+                            "type": "string",
+                            "description": "编程语言",
+                            "enum": languages
+                        },
+                        "project": {
+                            "type": "string",
+                            "description": "项目名称（同时匹配把该项目当作库引用的依赖）"
+                        },
+                        "module": {
+                            "type": "string",
+                            "description": "模块名称（可选）"
+                        },
+                        "transitive": {
+                            "type": "boolean",
+                            "description": "是否包含间接依赖方（可选，默认false；结果带 depth）"
+                        }
+                    }
+                }
+            },
+            {
+                "name": "find_dependencies",
+                "description": "列出项目或模块直接依赖的第三方库与内部模块",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "language": {
+                            "type": "string",
+                            "description": "编程语言",
+                            "enum": languages
+                        },
+                        "project": {
+                            "type": "string",
+                            "description": "项目名称"
+                        },
+                        "module": {
+                            "type": "string",
+                            "description": "模块名称（可选）"
+                        },
+                        "include_modules": {
+                            "type": "boolean",
+                            "description": "查询项目时是否同时列出各模块的依赖（可选，默认true）"
+                        },
+                        "transitive": {
+                            "type": "boolean",
+                            "description": "是否包含间接依赖（可选，默认false；结果带 depth）"
+                        }
+                    },
+                    "required": ["language", "project"]
+                }
+            },
+            {
+                "name": "analyze_dependency_graph",
+                "description": "检测模块依赖环，并给出被依赖方在前的拓扑顺序（构建/升级顺序）",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "language": {
+                            "type": "string",
+                            "description": "只看该语言的项目（可选）",
+                            "enum": languages
+                        },
+                        "project": {
+                            "type": "string",
+                            "description": "只看该项目（可选，需同时指定 language）"
+                        },
+                        "include_libraries": {
+                            "type": "boolean",
+                            "description": "拓扑序中是否包含第三方库（可选，默认false）"
+                        }
+                    }
+                }
+            },
             {
                 "name": "analyze_project_structure",
                 "description": "分析项目结构和依赖关系",
@@ -468,14 +1070,31 @@ class MCPDocumentationServer:
             }
         ]
 
-    async def execute_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute_tool(self, name: str, arguments: Dict[str, Any],
+                           reporter: Optional[ProgressReporter] = None) -> Dict[str, Any]:
         name = name or ""
-        if name == "search_documentation":
-            return await self._search_documentation(**arguments)
-        if name == "analyze_project_structure":
-            return await self._analyze_project_structure(**arguments)
-        if name == "check_documentation_quality":
-            return await self._check_documentation_quality(**arguments)
+        reporter = reporter or ProgressReporter()
+        try:
+            if name == "search_documentation":
+                return await self._search_documentation(reporter=reporter, **arguments)
+            if name == "build_context":
+                return await self._build_context(reporter=reporter, **arguments)
+            if name == "query_metadata":
+                return await self._query_metadata(reporter=reporter, **arguments)
+            if name == "find_dependents":
+                return await self._find_dependents(reporter=reporter, **arguments)
+            if name == "find_dependencies":
+                return await self._find_dependencies(reporter=reporter, **arguments)
+            if name == "analyze_dependency_graph":
+                return await self._analyze_dependency_graph(reporter=reporter, **arguments)
+            if name == "analyze_project_structure":
+                return await self._analyze_project_structure(reporter=reporter, **arguments)
+            if name == "check_documentation_quality":
+                return await self._check_documentation_quality(reporter=reporter, **arguments)
+        except asyncio.CancelledError:
+            # 请求被取消：通知I/O线程中仍在运行的工具停止
+            reporter.cancel()
+            raise
         raise ValueError(f"未知工具: {name}")
 
 
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元数据查询引擎
+把 project-info.json 与 metadata.json 中的类型、语言、状态、依赖、版本、更新时间整理成列式内存索引：
+每列的每个取值对应一个行号位图（Python整数），过滤是位运算，计数是popcount，
+目录缓存版本变化后整体重建
+"""
+
+import bisect
+import re
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from catalog import DocumentationCatalog
+
+# 可过滤/排序/计数的列
+FIELDS = ("kind", "language", "project", "name", "status", "version", "last_updated", "dependency")
+# 多值列：一行可以有多个取值，不能用于排序
+MULTI_VALUED = ("dependency",)
+
+DEFAULT_QUERY_LIMIT = 50
+MAX_QUERY_LIMIT = 1000
+
+_RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_NUMBER_PATTERN = re.compile(r"\d+")
+
+# 过滤条件：单值（等于）、列表（任一）或 {运算符: 操作数}
+Condition = Union[str, int, float, List[Any], Dict[str, Any]]
+
+
+def _normalize(value: Any) -> Optional[str]:
+    """取值统一为去空白的小写字符串，空值为None"""
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    return text or None
+
+
+def _version_key(value: str) -> Optional[Tuple[int, ...]]:
+    """版本号按数字段比较：1.10.0 > 1.9.2；不含数字（如模板占位符）时不可比较"""
+    numbers = _NUMBER_PATTERN.findall(value)
+    return tuple(int(number) for number in numbers) if numbers else None
+
+
+def _date_key(value: str) -> Optional[str]:
+    """ISO日期/时间取日期部分（字符串序即时间序）"""
+    match = _DATE_PATTERN.match(value)
+    return match.group(0) if match else None
+
+
+_SORT_KEYS: Dict[str, Callable[[str], Any]] = {
+    "version": _version_key,
+    "last_updated": _date_key,
+}
+
+
+def _bitmap(rows, size: int) -> int:
+    """行号列表 → 位图：在字节数组中置位后一次转换，耗时 O(size/8 + 行数)"""
+    buffer = bytearray((size >> 3) + 1)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class _Column:
+    """单列：取值 → 行号集合，以及按比较键排序的取值表与前缀检查点（范围查询用）
+
+    命中行数不少于总行数 1/32 的取值保存为位图（Python整数），其余保存为行号数组，
+    查询时再转成位图——项目名、日期这类高基数列不必为每个取值保存整行宽度的位图。
+    """
+
+    __slots__ = ("name", "key", "bitmaps", "postings", "present", "_size", "_ranges")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.key = _SORT_KEYS.get(name, lambda value: value)
+        self.bitmaps: Dict[str, int] = {}
+        self.postings: Dict[str, Any] = {}
+        self.present = 0
+        self._size = 0
+        # 范围查询结构：(排序键, 取值, 检查点位置, 检查点前缀位图)
+        self._ranges: Optional[Tuple[List[Any], List[str], List[int], List[int]]] = None
+
+    def add(self, row: int, value: Optional[str]) -> None:
+        """构建阶段：先收集行号，freeze 时再决定存储形式"""
+        if value is not None:
+            self.postings.setdefault(value, []).append(row)
+
+    def freeze(self, size: int) -> None:
+        self._size = size
+        present = []
+        for value, rows in list(self.postings.items()):
+            present.extend(rows)
+            if len(rows) * 32 >= size:
+                self.bitmaps[value] = _bitmap(rows, size)
+                del self.postings[value]
+            else:
+                self.postings[value] = array("I", rows)
+        self.present = _bitmap(present, size)
+        self._build_ranges()
+
+    def __len__(self) -> int:
+        return len(self.bitmaps) + len(self.postings)
+
+    def values(self) -> List[str]:
+        return list(self.bitmaps) + list(self.postings)
+
+    def equal(self, value: Any) -> int:
+        return self.union([_normalize(value)])
+
+    def union(self, values: List[Optional[str]]) -> int:
+        """多个取值的并集：位图直接按位或，行号数组合并后一次转换"""
+        mask = 0
+        rows: List[int] = []
+        for value in values:
+            bitmap = self.bitmaps.get(value)
+            if bitmap is not None:
+                mask |= bitmap
+            elif value in self.postings:
+                rows.extend(self.postings[value])
+        return mask | _bitmap(rows, self._size) if rows else mask
+
+    def range(self, operator: str, operand: Any) -> int:
+        """比较运算：按比较键二分定位取值区间 [start, end)，结果为两个前缀集合之差"""
+        keys, values, ends, prefixes = self._ranges
+
+        bound = self.key(_normalize(operand) or "")
+        if bound is None:
+            raise ValueError(f"无法比较的取值: {self.name} {operator} {operand}")
+        start, end = 0, len(values)
+        if operator == "gt":
+            start = bisect.bisect_right(keys, bound)
+        elif operator == "gte":
+            start = bisect.bisect_left(keys, bound)
+        elif operator == "lt":
+            end = bisect.bisect_left(keys, bound)
+        else:
+            end = bisect.bisect_right(keys, bound)
+        mask = self._prefix(end)
+        return mask & ~self._prefix(start) if start else mask
+
+    def _build_ranges(self) -> None:
+        """取值按比较键排序；每累计 1/32 的行数记一个检查点，保存此前所有取值的行号并集"""
+        pairs = sorted((key, value) for value, key in
+                       ((value, self.key(value)) for value in self.values()) if key is not None)
+        values = [value for _, value in pairs]
+        ends, prefixes = [0], [0]
+        mask, pending, step = 0, [], max(1, self._size >> 5)
+        for position, value in enumerate(values):
+            if value in self.bitmaps:
+                mask |= self.bitmaps[value]
+            else:
+                pending.extend(self.postings[value])
+            if len(pending) >= step or value in self.bitmaps:
+                mask |= _bitmap(pending, self._size) if pending else 0
+                pending = []
+                ends.append(position + 1)
+                prefixes.append(mask)
+        self._ranges = ([key for key, _ in pairs], values, ends, prefixes)
+
+    def _prefix(self, end: int) -> int:
+        """排序后前end个取值的行号并集：最近的检查点 + 其后不足一个区间的取值"""
+        _, values, ends, prefixes = self._ranges
+        checkpoint = bisect.bisect_right(ends, end) - 1
+        mask = prefixes[checkpoint]
+        if ends[checkpoint] < end:
+            mask |= self.union(values[ends[checkpoint]:end])
+        return mask
+
+    def counts(self, mask: int) -> Dict[str, int]:
+        """mask 内各取值的行数：位图用popcount，行号数组逐个查位"""
+        counts = {}
+        for value, bitmap in self.bitmaps.items():
+            count = (bitmap & mask).bit_count()
+            if count:
+                counts[value] = count
+        if self.postings:
+            bits = bin(mask)[:1:-1]
+            for value, rows in self.postings.items():
+                count = sum(1 for row in rows if row < len(bits) and bits[row] == "1")
+                if count:
+                    counts[value] = count
+        return counts
+
+
+class MetadataIndex:
+    """项目与模块元数据的列式索引
+
+    每个项目一行，每个模块一行（metadata.json 与 project-info.json 的 modules 声明合并）。
+    """
+
+    def __init__(self, catalog: DocumentationCatalog, today: Callable[[], date] = date.today):
+        self.catalog = catalog
+        self.today = today
+        self.rows: List[Dict[str, Any]] = []
+        self.columns: Dict[str, _Column] = {}
+        # 排序键：field → 每行的比较键（缺失为None）
+        self._sort_keys: Dict[str, List[Any]] = {}
+        self._all = 0
+        self._version = -1
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.build_ms = 0.0
+
+    # ---------- 构建 ----------
+
+    def stale(self) -> bool:
+        """查询前是否需要校验目录或重建索引（可能产生文件I/O）"""
+        return self.catalog.stale() or self._version != self.catalog.version
+
+    def ensure_current(self) -> None:
+        """目录缓存版本变化后重建索引"""
+        self.catalog.refresh()
+        if self._version == self.catalog.version:
+            return
+        with self._lock:
+            if self._version != self.catalog.version:
+                self._build()
+
+    def _build(self) -> None:
+        started = time.perf_counter()
+        version = self.catalog.version
+        rows: List[Dict[str, Any]] = []
+        with self.catalog._lock:
+            for language in self.catalog.languages.values():
+                for project in language.projects.values():
+                    rows.extend(self._project_rows(language.name, project))
+
+        # 同一取值（状态、语言、依赖名）大量重复，规范化结果按原始字符串缓存
+        normalized: Dict[str, Optional[str]] = {}
+
+        def normalize(value: Any) -> Optional[str]:
+            if not isinstance(value, str):
+                return _normalize(value)
+            if value not in normalized:
+                normalized[value] = _normalize(value)
+            return normalized[value]
+
+        columns: Dict[str, _Column] = {}
+        sort_keys: Dict[str, List[Any]] = {}
+        for field in FIELDS:
+            column = columns[field] = _Column(field)
+            if field in MULTI_VALUED:
+                for row_id, row in enumerate(rows):
+                    for value in row["dependencies"]:
+                        column.add(row_id, normalize(value))
+            else:
+                values = [normalize(row[field]) for row in rows]
+                for row_id, value in enumerate(values):
+                    column.add(row_id, value)
+                keys = {value: column.key(value) for value in set(values) if value is not None}
+                sort_keys[field] = [keys.get(value) for value in values]
+            column.freeze(len(rows))
+
+        self.rows = rows
+        self.columns = columns
+        self._sort_keys = sort_keys
+        self._all = (1 << len(rows)) - 1
+        self._version = version
+        self.builds += 1
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def _project_rows(language: str, project) -> List[Dict[str, Any]]:
+        """项目行 + 模块行"""
+        info = project.info or {}
+        project_metadata = info.get("project_metadata", {})
+        stack = info.get("technology_stack", {})
+        dependencies = [dep.get("name") for dep in stack.get("dependencies", []) + stack.get("dev_dependencies", [])
+                        if isinstance(dep, dict) and dep.get("name")]
+        status = info.get("status")
+        rows = [{
+            "kind": "project",
+            "language": language,
+            "project": project.name,
+            "name": project.name,
+            "status": status.get("phase") if isinstance(status, dict) else status,
+            "version": project_metadata.get("version"),
+            "last_updated": project_metadata.get("last_updated"),
+            "dependencies": sorted(set(dependencies)),
+            "uri": f"mcp-docs://project/{language}/{project.name}",
+        }]
+
+        # project-info.json 中声明的模块，与模块目录的 metadata.json 合并
+        declared = {entry.get("name"): entry for entry in info.get("modules", [])
+                    if isinstance(entry, dict) and entry.get("name")}
+        modules = {name: module.metadata for name, module in project.modules.items()
+                   if module.metadata_stamp is not None}
+        for name in sorted(set(declared) | set(modules)):
+            entry = declared.get(name, {})
+            metadata = modules.get(name) or {}
+            module_metadata = metadata.get("module_metadata", {})
+            deps = metadata.get("technical_details", {}).get("dependencies", {})
+            dependencies = list(entry.get("dependencies", []))
+            dependencies += [dep.get("library") for dep in deps.get("external", []) if isinstance(dep, dict)]
+            dependencies += [dep.get("module") for dep in deps.get("internal", []) if isinstance(dep, dict)]
+            rows.append({
+                "kind": "module",
+                "language": language,
+                "project": project.name,
+                "name": name,
+                "status": module_metadata.get("status") or entry.get("status"),
+                "version": module_metadata.get("version"),
+                "last_updated": module_metadata.get("last_updated"),
+                "dependencies": sorted({dep for dep in dependencies if isinstance(dep, str) and dep}),
+                "uri": (f"mcp-docs://module/{language}/{project.name}/{name}" if name in modules
+                        else f"mcp-docs://project/{language}/{project.name}"),
+            })
+        return rows
+
+    # ---------- 查询 ----------
+
+    def query(self, kind: Optional[str] = None, filters: Optional[Dict[str, Condition]] = None,
+              sort: Union[str, List[str], None] = None, offset: int = 0, limit: int = DEFAULT_QUERY_LIMIT,
+              count_by: Union[str, List[str], None] = None) -> Dict[str, Any]:
+        """过滤、排序、分页与分组计数
+
+        filters 为 字段 → 条件：单值表示等于，列表表示任一，字典支持
+        eq / ne / in / gt / gte / lt / lte / exists，last_updated 另支持 within_days；
+        sort 为字段名列表，前缀 - 表示降序；count_by 返回各取值的命中数。
+        """
+        started = time.perf_counter_ns()
+        self.ensure_current()
+        offset = max(0, int(offset))
+        limit = max(0, min(int(limit), MAX_QUERY_LIMIT))
+
+        filters = dict(filters or {})
+        if kind is not None:
+            filters["kind"] = kind
+        sort_spec = self._parse_sort(sort)
+        count_fields = [count_by] if isinstance(count_by, str) else list(count_by or [])
+        for field in count_fields:
+            self._check_field(field)
+
+        with self._lock:
+            rows = self.rows
+            mask = self._all
+            for field, condition in filters.items():
+                mask &= self._match(field, condition)
+                if not mask:
+                    break
+
+            total = mask.bit_count()
+            if sort_spec:
+                ids = self._sorted_ids(mask, sort_spec)[offset:offset + limit]
+            else:
+                ids = self._first_ids(mask, offset + limit)[offset:]
+            counts = {field: self._counts(field, mask) for field in count_fields}
+
+        next_offset = offset + len(ids)
+        result: Dict[str, Any] = {
+            "total": total,
+            "offset": offset,
+            "next_offset": next_offset if next_offset < total else None,
+            "results": [rows[row_id] for row_id in ids],
+        }
+        if count_fields:
+            result["counts"] = counts
+        result["took_us"] = round((time.perf_counter_ns() - started) / 1000, 1)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self.rows),
+            "values": {field: len(column) for field, column in self.columns.items()},
+            "builds": self.builds,
+            "build_ms": round(self.build_ms, 2),
+        }
+
+    @staticmethod
+    def _check_field(field: str) -> None:
+        if field not in FIELDS:
+            raise ValueError(f"未知字段: {field}（可用字段: {', '.join(FIELDS)}）")
+
+    def _match(self, field: str, condition: Condition) -> int:
+        """单个字段条件 → 行号位图"""
+        self._check_field(field)
+        column = self.columns[field]
+        if isinstance(condition, list):
+            return column.union([_normalize(value) for value in condition])
+        if not isinstance(condition, dict):
+            return column.equal(condition)
+
+        mask = self._all
+        for operator, operand in condition.items():
+            if operator == "eq":
+                mask &= column.equal(operand)
+            elif operator == "ne":
+                mask &= ~column.equal(operand)
+            elif operator == "in":
+                values = operand if isinstance(operand, list) else [operand]
+                mask &= column.union([_normalize(value) for value in values])
+            elif operator in _RANGE_OPERATORS:
+                mask &= column.range(operator, operand)
+            elif operator == "exists":
+                present = column.present
+                mask &= present if operand else ~present
+            elif operator == "within_days" and field == "last_updated":
+                since = self.today() - timedelta(days=int(operand))
+                mask &= column.range("gte", since.isoformat())
+            else:
+                raise ValueError(f"不支持的运算符: {field}.{operator}")
+        return mask & self._all
+
+    def _parse_sort(self, sort: Union[str, List[str], None]) -> List[Tuple[str, bool]]:
+        """["-last_updated", "name"] → [(字段, 是否降序)]"""
+        if not sort:
+            return []
+        spec = []
+        for item in [sort] if isinstance(sort, str) else sort:
+            descending = item.startswith("-")
+            field = item.lstrip("-+")
+            self._check_field(field)
+            if field in MULTI_VALUED:
+                raise ValueError(f"多值字段不能排序: {field}")
+            spec.append((field, descending))
+        return spec
+
+    def _sorted_ids(self, mask: int, spec: List[Tuple[str, bool]]) -> List[int]:
+        """多字段排序：从最后一个字段起逐次稳定排序，缺失值始终排在最后"""
+        ids = self._first_ids(mask, None)
+        for field, descending in reversed(spec):
+            keys = self._sort_keys[field]
+            present = [row_id for row_id in ids if keys[row_id] is not None]
+            missing = [row_id for row_id in ids if keys[row_id] is None]
+            present.sort(key=keys.__getitem__, reverse=descending)
+            ids = present + missing
+        return ids
+
+    @staticmethod
+    def _first_ids(mask: int, count: Optional[int]) -> List[int]:
+        """位图中从低位起的前count个行号（转成低位在前的二进制串后用find跳到下一个1）"""
+        bits = bin(mask)[:1:-1]
+        ids = []
+        position = bits.find("1")
+        while position >= 0 and (count is None or len(ids) < count):
+            ids.append(position)
+            position = bits.find("1", position + 1)
+        return ids
+
+    def _counts(self, field: str, mask: int) -> Dict[str, int]:
+        counts = self.columns[field].counts(mask)
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
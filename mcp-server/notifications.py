@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MCP通知分发
+文件监听线程发布通知，投递到各客户端连接所在的事件循环
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_LIST_CHANGED = "notifications/resources/list_changed"
+RESOURCE_UPDATED = "notifications/resources/updated"
+
+# 接收JSON-RPC通知消息的协程函数
+NotificationSink = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class NotificationHub:
+    """通知中心：线程安全地把通知投递给已注册的连接"""
+
+    def __init__(self):
+        self._sinks: Dict[Hashable, Tuple[asyncio.AbstractEventLoop, NotificationSink]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: Hashable, sink: NotificationSink, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """注册连接；必须在连接所属的事件循环中调用，或显式传入loop"""
+        with self._lock:
+            self._sinks[key] = (loop or asyncio.get_running_loop(), sink)
+
+    def unregister(self, key: Hashable, sink: Optional[NotificationSink] = None) -> None:
+        """注销连接；指定sink时仅当仍是该sink才注销（避免误删重连后的新连接）"""
+        with self._lock:
+            current = self._sinks.get(key)
+            if current is not None and (sink is None or current[1] == sink):
+                del self._sinks[key]
+
+    def __len__(self) -> int:
+        return len(self._sinks)
+
+    def publish(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """发布通知给所有连接（可在任意线程调用）"""
+        message = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+        with self._lock:
+            targets = list(self._sinks.items())
+        for key, (loop, sink) in targets:
+            self._schedule(key, loop, sink, message)
+
+    def send(self, key: Hashable, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """发送通知给指定连接（可在任意线程调用）"""
+        with self._lock:
+            target = self._sinks.get(key)
+        if target is not None:
+            loop, sink = target
+            self._schedule(key, loop, sink, {"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    def _schedule(self, key: Hashable, loop: asyncio.AbstractEventLoop, sink: NotificationSink,
+                  message: Dict[str, Any]) -> None:
+        if loop.is_closed():
+            self.unregister(key, sink)
+            return
+        loop.call_soon_threadsafe(lambda: loop.create_task(self._deliver(key, sink, message)))
+
+    async def _deliver(self, key: Hashable, sink: NotificationSink, message: Dict[str, Any]) -> None:
+        try:
+            await sink(message)
+        except Exception as e:  # pylint: disable=broad-except
+            # 连接已断开，不再投递
+            logger.debug(f"Dropping notification sink {key}: {e}")
+            self.unregister(key, sink)
+
+
+class SubscriptionRegistry:
+    """资源订阅表：URI → 订阅者
+
+    空闲订阅只占用字典项；只有文件变更映射到的URI才会被查找和通知。
+    """
+
+    def __init__(self):
+        self._by_uri: Dict[str, Set[Hashable]] = {}
+        self._by_subscriber: Dict[Hashable, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscriber: Hashable, uri: str) -> None:
+        with self._lock:
+            self._by_uri.setdefault(uri, set()).add(subscriber)
+            self._by_subscriber.setdefault(subscriber, set()).add(uri)
+
+    def unsubscribe(self, subscriber: Hashable, uri: str) -> None:
+        with self._lock:
+            self._discard(subscriber, uri)
+
+    def drop(self, subscriber: Hashable) -> None:
+        """移除订阅者的全部订阅（连接断开时调用）"""
+        with self._lock:
+            for uri in list(self._by_subscriber.get(subscriber, ())):
+                self._discard(subscriber, uri)
+
+    def subscriptions(self, subscriber: Hashable) -> Set[str]:
+        with self._lock:
+            return set(self._by_subscriber.get(subscriber, ()))
+
+    def __len__(self) -> int:
+        return len(self._by_uri)
+
+    def fan_out(self, uris: Iterable[str]) -> List[Tuple[Hashable, str]]:
+        """返回需要通知的 (订阅者, URI) 列表"""
+        with self._lock:
+            return [
+                (subscriber, uri)
+                for uri in uris
+                for subscriber in self._by_uri.get(uri, ())
+            ]
+
+    def _discard(self, subscriber: Hashable, uri: str) -> None:
+        subscribers = self._by_uri.get(uri)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._by_uri[uri]
+        uris = self._by_subscriber.get(subscriber)
+        if uris is not None:
+            uris.discard(uri)
+            if not uris:
+                del self._by_subscriber[subscriber]
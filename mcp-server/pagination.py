@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MCP列表分页
+cursor 是对客户端不透明的偏移量编码；列表本身来自按版本缓存的视图，翻页只做切片
+"""
+
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """解析cursor，格式不正确时抛出ValueError"""
+    if not cursor:
+        return 0
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))["offset"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return offset
+
+
+def paginate(items: Sequence[Any], cursor: Optional[str], page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Any], Optional[str]]:
+    """返回当前页与下一页的cursor（没有更多时为None）"""
+    offset = decode_cursor(cursor)
+    page = list(items[offset:offset + page_size])
+    next_offset = offset + page_size
+    return page, encode_cursor(next_offset) if next_offset < len(items) else None
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工具执行进度与取消
+工具在I/O线程中调用 update() 汇报进度；客户端取消请求后下一次 update()/check() 抛出 ToolCancelled，停止后续文件访问
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+PROGRESS_NOTIFICATION = "notifications/progress"
+CANCELLED_NOTIFICATION = "notifications/cancelled"
+
+# 接收 notifications/progress 参数的协程函数
+ProgressSink = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ToolCancelled(Exception):
+    """工具执行被客户端取消"""
+
+
+class ProgressReporter:
+    """进度汇报器：可在任意线程调用，按最小间隔节流后投递到事件循环"""
+
+    def __init__(self, progress_token: Any = None, sink: Optional[ProgressSink] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None, min_interval: float = 0.1):
+        self.progress_token = progress_token
+        self._sink = sink if progress_token is not None else None
+        self._loop = loop or (asyncio.get_running_loop() if self._sink else None)
+        self.min_interval = min_interval
+        self._last_sent = 0.0
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """已取消时抛出 ToolCancelled"""
+        if self._cancelled.is_set():
+            raise ToolCancelled("Request cancelled")
+
+    def update(self, progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+        """汇报进度并检查取消；最后一步（progress == total）总是发送"""
+        self.check()
+        if self._sink is None:
+            return
+        now = time.monotonic()
+        if now - self._last_sent < self.min_interval and (total is None or progress < total):
+            return
+        self._last_sent = now
+
+        params: Dict[str, Any] = {"progressToken": self.progress_token, "progress": progress}
+        if total is not None:
+            params["total"] = total
+        if message:
+            params["message"] = message
+        sink = self._sink
+        self._loop.call_soon_threadsafe(lambda: self._loop.create_task(sink(params)))
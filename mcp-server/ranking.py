@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索排序引擎
+默认使用带字段加权的BM25，基于索引中预计算的文档长度与IDF表打分
+"""
+
+import heapq
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 默认字段权重：正文为1，其余字段按倍数叠加到词频上
+DEFAULT_FIELD_BOOSTS = {
+    "heading": 2.0,
+    "project": 3.0,
+    "module": 3.0,
+}
+
+
+# 文档过滤条件：doc_id → 是否保留
+DocFilter = Callable[[int], bool]
+
+# 查询扩展词项的分数权重：term → 倍数（未列出的词项为1）
+TermWeights = Dict[str, float]
+
+# 取消检查点：每处理一个词项调用一次，请求已取消时抛出异常中止打分
+CancelCheck = Callable[[], None]
+
+
+def rank_key(item: Tuple[int, float]) -> Tuple[float, int]:
+    """分数降序，同分按doc_id升序"""
+    return -item[1], item[0]
+
+
+def select_top(candidates: List[Tuple[int, float]], k: Optional[int]) -> List[Tuple[int, float]]:
+    """选出前k个 (doc_id, score)；k为None时全量排序"""
+    if k is None or k >= len(candidates):
+        return sorted(candidates, key=rank_key)
+    return heapq.nsmallest(k, candidates, key=rank_key)
+
+
+class RankingEngine:
+    """排序引擎基类"""
+
+    name = "base"
+
+    def score(self, index, terms: List[str], weights: Optional[TermWeights] = None,
+              check: Optional[CancelCheck] = None) -> Dict[int, float]:
+        """返回 doc_id → 分数"""
+        raise NotImplementedError
+
+    def top_k(self, index, terms: List[str], k: Optional[int], accept: Optional[DocFilter] = None,
+              weights: Optional[TermWeights] = None, check: Optional[CancelCheck] = None,
+              exact_total: bool = False) -> Tuple[List[Tuple[int, float]], int]:
+        """返回 (前k个结果, 命中总数)；默认实现为全量打分后堆选择，总数总是精确值
+
+        exact_total 为False时排序引擎可以返回估计的总数，避免为计数遍历全部命中文档。
+        """
+        scores = self.score(index, terms, weights, check)
+        if accept is None:
+            candidates = list(scores.items())
+        else:
+            candidates = [(doc_id, score) for doc_id, score in scores.items() if accept(doc_id)]
+        return select_top(candidates, k), len(candidates)
+
+
+class TermFrequencyRanker(RankingEngine):
+    """按词频求和打分（与旧版子串计数一致的基线）"""
+
+    name = "tf"
+
+    def score(self, index, terms: List[str], weights: Optional[TermWeights] = None,
+              check: Optional[CancelCheck] = None) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        weights = weights or {}
+        for term in terms:
+            if check is not None:
+                check()
+            weight = weights.get(term, 1)
+            for doc_id, positions in index.postings.get(term, {}).items():
+                scores[doc_id] = scores.get(doc_id, 0) + weight * len(positions)
+        return scores
+
+
+class BM25Ranker(RankingEngine):
+    """BM25F：各字段词频按权重合并后再做长度归一化"""
+
+    name = "bm25"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, field_boosts: Optional[Dict[str, float]] = None):
+        self.k1 = k1
+        self.b = b
+        self.field_boosts = DEFAULT_FIELD_BOOSTS if field_boosts is None else field_boosts
+        # 词项分数上界缓存，索引统计量变化（generation改变）后失效
+        self._bounds: Dict[str, float] = {}
+        self._bounds_owner: Optional[Tuple[int, int]] = None
+
+    def score(self, index, terms: List[str], weights: Optional[TermWeights] = None,
+              check: Optional[CancelCheck] = None) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        weights = weights or {}
+        avg_length = index.avg_length or 1.0
+        doc_lengths = index.doc_lengths
+        k1_plus_1 = self.k1 + 1
+        base = self.k1 * (1 - self.b)
+        per_length = self.k1 * self.b / avg_length
+
+        for term in set(terms):
+            if check is not None:
+                check()
+            idf = index.idf.get(term)
+            if idf is None:
+                continue
+            idf *= weights.get(term, 1.0)
+
+            # 合并正文与加权字段的词频
+            weighted_tf: Dict[int, float] = {}
+            for doc_id, positions in index.postings.get(term, {}).items():
+                weighted_tf[doc_id] = float(len(positions))
+            for field, boost in self.field_boosts.items():
+                for doc_id, tf in index.field_postings.get(field, {}).get(term, {}).items():
+                    weighted_tf[doc_id] = weighted_tf.get(doc_id, 0.0) + boost * tf
+
+            for doc_id, tf in weighted_tf.items():
+                norm = base + per_length * doc_lengths[doc_id]
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * k1_plus_1 / (tf + norm)
+        return scores
+
+    def top_k(self, index, terms: List[str], k: Optional[int], accept: Optional[DocFilter] = None,
+              weights: Optional[TermWeights] = None, check: Optional[CancelCheck] = None,
+              exact_total: bool = False) -> Tuple[List[Tuple[int, float]], int]:
+        """MaxScore剪枝的前k选择
+
+        词项按分数上界降序处理，只有首次出现在当前倒排表中的文档才是新候选；
+        一旦剩余词项的上界之和低于堆中第k名的分数，后面的倒排表不再遍历，
+        单个候选在累计分数加剩余上界不足以入堆时也提前放弃。
+        总数默认为查询词项中最大的文档频率（不计过滤条件），exact_total 时合并全部倒排表精确计数。
+        """
+        if k is None:
+            return super().top_k(index, terms, k, accept, weights, check, exact_total)
+
+        lists = self._term_lists(index, terms, weights or {})
+        total = self._count_matches(lists, accept) if exact_total else self._estimate_matches(lists)
+        if k <= 0 or not lists:
+            return [], total
+
+        lists.sort(key=lambda item: (-item[4], item[0]))
+        remaining = [0.0] * (len(lists) + 1)
+        for i in range(len(lists) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + lists[i][4]
+
+        doc_lengths = index.doc_lengths
+        k1_plus_1 = self.k1 + 1
+        base = self.k1 * (1 - self.b)
+        per_length = self.k1 * self.b / (index.avg_length or 1.0)
+
+        # 小顶堆 (score, -doc_id)：堆顶是当前第k名，threshold为其分数
+        heap: List[Tuple[float, int]] = []
+        threshold = float("-inf")
+        seen = set()
+        last = len(lists)
+        for i, (_, _, body, fields, _) in enumerate(lists):
+            if remaining[i] < threshold:
+                break
+            if check is not None:
+                check()
+            doc_ids = body.keys() if not fields else set(body).union(*(postings for _, postings in fields))
+            for doc_id in doc_ids:
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if accept is not None and not accept(doc_id):
+                    continue
+
+                norm = base + per_length * doc_lengths[doc_id]
+                score = 0.0
+                for j in range(i, last):
+                    if score + remaining[j] < threshold:
+                        break
+                    _, idf, term_body, term_fields, _ = lists[j]
+                    tf = float(len(term_body.get(doc_id, ())))
+                    for boost, postings in term_fields:
+                        tf += boost * postings.get(doc_id, 0)
+                    if tf:
+                        score += idf * tf * k1_plus_1 / (tf + norm)
+                else:
+                    entry = (score, -doc_id)
+                    if len(heap) < k:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+                    else:
+                        continue
+                    if len(heap) >= k:
+                        threshold = heap[0][0]
+
+        return sorted(((-neg_doc_id, score) for score, neg_doc_id in heap), key=rank_key), total
+
+    def _term_lists(self, index, terms: List[str],
+                    weights: TermWeights) -> List[Tuple[str, float, Dict, List[Tuple[float, Dict]], float]]:
+        """查询词项的 (term, idf, 正文倒排, [(权重, 字段倒排)], 分数上界)；idf与上界已乘扩展权重"""
+        owner = (id(index), getattr(index, "generation", 0))
+        if owner != self._bounds_owner:
+            self._bounds = {}
+            self._bounds_owner = owner
+
+        lists = []
+        for term in sorted(set(terms)):
+            idf = index.idf.get(term)
+            if idf is None:
+                continue
+            body = index.postings.get(term, {})
+            fields = []
+            for field, boost in self.field_boosts.items():
+                postings = index.field_postings.get(field, {}).get(term)
+                if postings:
+                    fields.append((boost, postings))
+            bound = self._bounds.get(term)
+            if bound is None:
+                bound = self._bounds[term] = self._upper_bound(index, idf, body, fields)
+            weight = weights.get(term, 1.0)
+            lists.append((term, idf * weight, body, fields, bound * weight))
+        return lists
+
+    def _upper_bound(self, index, idf: float, body: Dict, fields: List[Tuple[float, Dict]]) -> float:
+        """词项在任一文档上能贡献的最大分数"""
+        weighted_tf: Dict[int, float] = {doc_id: float(len(positions)) for doc_id, positions in body.items()}
+        for boost, postings in fields:
+            for doc_id, tf in postings.items():
+                weighted_tf[doc_id] = weighted_tf.get(doc_id, 0.0) + boost * tf
+
+        doc_lengths = index.doc_lengths
+        base = self.k1 * (1 - self.b)
+        per_length = self.k1 * self.b / (index.avg_length or 1.0)
+        best = 0.0
+        for doc_id, tf in weighted_tf.items():
+            best = max(best, tf / (tf + base + per_length * doc_lengths[doc_id]))
+        return idf * (self.k1 + 1) * best
+
+    @staticmethod
+    def _estimate_matches(lists) -> int:
+        """命中文档数的估计：各词项正文或字段倒排表长度的最大值，与命中数无关的O(词项数)"""
+        return max((max([len(body)] + [len(postings) for _, postings in fields]) for _, _, body, fields, _ in lists),
+                   default=0)
+
+    @staticmethod
+    def _count_matches(lists, accept: Optional[DocFilter]) -> int:
+        """命中文档总数（只合并倒排表的doc_id，不打分）"""
+        matched = set()
+        for _, _, body, fields, _ in lists:
+            matched.update(body)
+            for _, postings in fields:
+                matched.update(postings)
+        if accept is None:
+            return len(matched)
+        return sum(1 for doc_id in matched if accept(doc_id))
+
+
+RANKERS = {
+    BM25Ranker.name: BM25Ranker,
+    TermFrequencyRanker.name: TermFrequencyRanker,
+}
+
+
+def create_ranker(name: str = "bm25", **kwargs) -> RankingEngine:
+    """按名称创建排序引擎"""
+    if name not in RANKERS:
+        raise ValueError(f"未知排序引擎: {name}")
+    return RANKERS[name](**kwargs)
+
+
+def bm25_idf(doc_count: int, doc_freq: int) -> float:
+    """BM25 IDF（加1平滑，保证非负）"""
+    return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资源响应缓存
+按URI缓存序列化后的资源内容，源文件标记变化即视为新内容；按条目数和字节数做LRU淘汰
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CachedResource:
+    """序列化后的资源内容"""
+
+    __slots__ = ("uri", "mime_type", "text", "body", "etag", "fingerprint")
+
+    def __init__(self, uri: str, mime_type: str, text: str, fingerprint: Hashable):
+        self.uri = uri
+        self.mime_type = mime_type
+        self.text = text
+        self.body = text.encode("utf-8")
+        # 强校验ETag：序列化字节的摘要
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.fingerprint = fingerprint
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """判断 If-None-Match 请求头是否命中当前ETag"""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or self.etag in candidates
+
+
+class ResourceCache:
+    """容量受限的资源LRU缓存
+
+    fingerprint 由源文件标记 (mtime_ns, inode, size) 组成，命中时不读文件也不做JSON编码。
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResource]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, uri: str, fingerprint: Hashable) -> Optional[CachedResource]:
+        """查找缓存，源文件标记不一致时视为未命中"""
+        with self._lock:
+            entry = self._entries.get(uri)
+            if entry is None or entry.fingerprint != fingerprint:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(uri)
+            self.hits += 1
+            return entry
+
+    def put(self, entry: CachedResource) -> CachedResource:
+        """写入缓存；超过单条容量上限的内容不缓存"""
+        if len(entry.body) > self.max_bytes:
+            return entry
+        with self._lock:
+            previous = self._entries.pop(entry.uri, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[entry.uri] = entry
+            self._bytes += len(entry.body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+        return entry
+
+    def discard(self, uri: str) -> None:
+        with self._lock:
+            previous = self._entries.pop(uri, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+依赖图基准测试
+在不同规模的合成目录上对比 单个项目变化后的增量更新 与 全量重建依赖索引/依赖图 的耗时，
+并测量传递闭包、环检测与拓扑排序在冷缓存与缓存命中时的延迟
+"""
+
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+import argparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalog import LanguageEntry, ModuleEntry, ProjectEntry  # noqa: E402
+from dependency_graph import DEPENDENCIES, DEPENDENTS, DependencyGraph, graph_document  # noqa: E402
+from dependency_index import DependencyIndex, library_key, module_key  # noqa: E402
+
+
+class SyntheticCatalog:
+    """合成目录，提供 DependencyIndex 所需的目录缓存接口（不产生文件I/O）
+
+    模块只依赖编号更小的同项目模块（无环），外部库按Zipf分布选取。
+    """
+
+    def __init__(self, project_count: int, modules_per_project: int, libraries: int, seed: int):
+        self.rng = random.Random(seed)
+        self.library_names = [f"lib-{i}" for i in range(libraries)]
+        self.weights = [1.0 / (rank + 1) for rank in range(libraries)]
+        self.version = 0
+        self._lock = threading.RLock()
+        self.language = LanguageEntry("java", "Java", Path("Java"))
+        self.languages: Dict[str, LanguageEntry] = {"java": self.language}
+        self._stamp = 0
+        for project_id in range(project_count):
+            project = ProjectEntry(f"project-{project_id}", Path(f"Java/project-{project_id}"))
+            project.info_stamp = self._next_stamp()
+            project.info = {"technology_stack": {"dependencies": [
+                {"name": name} for name in self._libraries(4)]}}
+            for module_id in range(modules_per_project):
+                module = ModuleEntry(f"module-{module_id}", project.path / f"module-{module_id}")
+                self.rewrite(module, module_id)
+                project.modules[module.name] = module
+            self.language.projects[project.name] = project
+
+    def _next_stamp(self):
+        self._stamp += 1
+        return (self._stamp, 0, 0)
+
+    def _libraries(self, count: int) -> List[str]:
+        return sorted(set(self.rng.choices(self.library_names, weights=self.weights, k=count)))
+
+    def rewrite(self, module: ModuleEntry, module_id: int) -> None:
+        """模拟 metadata.json 被修改：新的依赖与新的文件标记"""
+        internal = self.rng.sample(range(module_id), min(module_id, 2))
+        module.metadata_stamp = self._next_stamp()
+        module.metadata = {"technical_details": {"dependencies": {
+            "external": [{"library": name} for name in self._libraries(3)],
+            "internal": [{"module": f"module-{other}"} for other in internal],
+        }}}
+
+    def stale(self) -> bool:
+        return False
+
+    def refresh(self, force: bool = False) -> bool:
+        return False
+
+
+def timed(function) -> float:
+    started = time.perf_counter()
+    function()
+    return (time.perf_counter() - started) * 1000
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Documentation Dependency Graph Benchmark")
+    parser.add_argument("--sizes", default="100,1000,5000", help="Comma separated project counts")
+    parser.add_argument("--modules", type=int, default=10, help="Modules per project")
+    parser.add_argument("--libraries", type=int, default=500, help="Distinct library names")
+    parser.add_argument("--changes", type=int, default=50, help="Single-project changes measured")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+
+    args = parser.parse_args()
+
+    print(f"{'projects':>8} {'edges':>8} {'full(ms)':>9} {'dump(ms)':>9} {'patch p50':>10} {'patch p99':>10} "
+          f"{'closure cold':>13} {'closure hit':>12} {'order cold':>11} {'order hit':>10}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        catalog = SyntheticCatalog(size, args.modules, args.libraries, args.seed)
+        index = DependencyIndex(catalog)
+        graph = DependencyGraph()
+
+        def full_build():
+            fresh_index = DependencyIndex(catalog)
+            fresh_index.ensure_current()
+            DependencyGraph().sync(fresh_index)
+
+        full_ms = timed(full_build)
+        index.ensure_current()
+        graph.sync(index)
+        dump_ms = timed(lambda: graph_document(index, graph))
+
+        # 单个项目的一个模块变化：目录版本递增，依赖索引比较签名后只重新提取该项目
+        patches = []
+        projects = list(catalog.language.projects.values())
+        for _ in range(args.changes):
+            project = catalog.rng.choice(projects)
+            module_id = catalog.rng.randrange(args.modules)
+            catalog.rewrite(project.modules[f"module-{module_id}"], module_id)
+            catalog.version += 1
+            patches.append(timed(lambda: (index.ensure_current(), graph.sync(index))))
+
+        # 闭包：随机库的全部（间接）依赖方；拓扑序：第一次计算与缓存命中
+        libraries = [library_key(name) for name in catalog.library_names[:50]]
+        closure_cold = [timed(lambda: graph.closure([key], DEPENDENTS)) for key in libraries]
+        closure_hit = [timed(lambda: graph.closure([key], DEPENDENTS)) for key in libraries]
+        module = module_key("java", projects[0].name, f"module-{args.modules - 1}")
+        graph.closure([module], DEPENDENCIES)
+        order_cold = timed(graph.topological_order)
+        order_hit = timed(graph.topological_order)
+
+        print(f"{size:>8} {graph.stats()['edges']:>8} {full_ms:>9.1f} {dump_ms:>9.1f} "
+              f"{percentile(patches, 0.5):>10.3f} {percentile(patches, 0.99):>10.3f} "
+              f"{percentile(closure_cold, 0.5):>13.3f} {percentile(closure_hit, 0.5):>12.3f} "
+              f"{order_cold:>11.1f} {order_hit:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词项词典基准测试
+在不同规模的合成词表上测量词典构建耗时、前缀补全与拼写纠错扩展的查询延迟，
+并在小样本上与逐词计算编辑距离的线性扫描对比延迟和召回率
+"""
+
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+import argparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from term_dictionary import QueryExpander, TermDictionary, bounded_levenshtein, edit_budget  # noqa: E402
+
+
+def generate_terms(count: int, seed: int) -> List[str]:
+    """合成词表：随机字母词与其复合/派生形式（近似代码标识符拆分后的词项）"""
+    rng = random.Random(seed)
+    roots = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+             for _ in range(count // 4)]
+    suffixes = ["s", "er", "ed", "ing", "ion", "manager", "service", "handler", "config"]
+    terms = set(roots)
+    while len(terms) < count:
+        root = rng.choice(roots)
+        if rng.random() < 0.5:
+            terms.add(root + rng.choice(suffixes))
+        else:
+            terms.add(root + rng.choice(roots))
+    return sorted(terms)
+
+
+def make_typo(term: str, rng: random.Random) -> str:
+    """随机删除、插入、替换或交换一个字符"""
+    i = rng.randrange(len(term))
+    kind = rng.randrange(4)
+    if kind == 0:
+        return term[:i] + term[i + 1:]
+    if kind == 1:
+        return term[:i] + rng.choice(string.ascii_lowercase) + term[i:]
+    if kind == 2:
+        return term[:i] + rng.choice(string.ascii_lowercase) + term[i + 1:]
+    if i + 1 < len(term):
+        return term[:i] + term[i + 1] + term[i] + term[i + 2:]
+    return term[:-1]
+
+
+def sample_queries(terms: List[str], count: int, seed: int) -> Tuple[List[str], List[str]]:
+    """返回 (拼写错误查询, 前缀查询)"""
+    rng = random.Random(seed)
+    typos, prefixes = [], []
+    for term in rng.sample([term for term in terms if len(term) >= 5], count):
+        typos.append(make_typo(term, rng))
+        prefixes.append(term[:rng.randint(3, len(term) - 1)])
+    return typos, prefixes
+
+
+def timed(function, queries: List[str]) -> List[float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        function(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def linear_fuzzy(terms: List[str], query: str) -> List[Tuple[str, int]]:
+    """逐词校验编辑距离的基线"""
+    bound = edit_budget(len(query))
+    matches = []
+    for term in terms:
+        if term == query:
+            continue
+        distance = bounded_levenshtein(query, term, bound)
+        if distance is not None and distance > 0:
+            matches.append((term, distance))
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Documentation Term Dictionary Benchmark")
+    parser.add_argument("--sizes", default="100000,300000,1000000", help="Comma separated dictionary sizes")
+    parser.add_argument("--queries", type=int, default=500, help="Number of sampled queries")
+    parser.add_argument("--baseline-queries", type=int, default=50, help="Queries checked against a linear scan")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+
+    args = parser.parse_args()
+    expander = QueryExpander()
+
+    print(f"{'terms':>8} {'build(ms)':>10} {'prefix p50':>11} {'prefix p99':>11} "
+          f"{'fuzzy p50':>10} {'fuzzy p99':>10} {'expand p99':>11} {'linear p50':>11} {'recall':>7}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        terms = generate_terms(size, args.seed)
+        typos, prefixes = sample_queries(terms, args.queries, args.seed)
+
+        started = time.perf_counter()
+        dictionary = TermDictionary(terms)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        prefix = timed(dictionary.prefix, prefixes)
+        fuzzy = timed(lambda query: dictionary.fuzzy(query, edit_budget(len(query))), typos)
+        expand = timed(lambda query: expander.expand(dictionary, [query]), typos + prefixes)
+
+        baseline = typos[:args.baseline_queries]
+        linear = timed(lambda query: linear_fuzzy(terms, query), baseline)
+        expected = found = 0
+        for query in baseline:
+            exact = set(linear_fuzzy(terms, query))
+            expected += len(exact)
+            found += len(exact & set(dictionary.fuzzy(query, edit_budget(len(query)))))
+        recall = found / expected if expected else 1.0
+
+        print(f"{size:>8} {build_ms:>10.0f} {percentile(prefix, 0.5):>11.3f} {percentile(prefix, 0.99):>11.3f} "
+              f"{percentile(fuzzy, 0.5):>10.3f} {percentile(fuzzy, 0.99):>10.3f} {percentile(expand, 0.99):>11.3f} "
+              f"{percentile(linear, 0.5):>11.1f} {recall:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
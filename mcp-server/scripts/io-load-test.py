@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+I/O执行器负载测试
+并发混合资源读取/搜索/质量检查请求，对比同步执行与线程池执行时各类请求的延迟
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+import argparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from io_executor import IOExecutor  # noqa: E402
+from mcp_protocol_server import MCPDocumentationServer  # noqa: E402
+
+WORDS = [
+    "service", "module", "config", "request", "response", "handler", "client", "server",
+    "用户", "管理", "认证", "权限", "缓存", "配置", "接口", "日志",
+]
+
+
+def generate_tree(root: Path, projects: int, modules: int, seed: int) -> List[str]:
+    """生成文档目录，返回资源URI列表"""
+    rng = random.Random(seed)
+    config = {
+        "supported_languages": [{"name": "java", "display_name": "Java"}],
+        # 关闭响应缓存，保证每次读取都访问文件
+        "resource_cache": {"max_entries": 0},
+        "watcher": {"enabled": False},
+    }
+    with open(root / "mcp-config.json", 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+    uris = []
+    for p in range(projects):
+        project_dir = root / "Java" / f"project-{p:03d}"
+        project_dir.mkdir(parents=True)
+        with open(project_dir / "project-info.json", 'w', encoding='utf-8') as f:
+            json.dump({"project_metadata": {"name": f"project-{p:03d}"}}, f)
+        with open(project_dir / "README.md", 'w', encoding='utf-8') as f:
+            f.write(f"# project-{p:03d}\n\n" + " ".join(rng.choice(WORDS) for _ in range(2000)))
+        uris.append(f"mcp-docs://readme/java/project-{p:03d}")
+        uris.append(f"mcp-docs://project/java/project-{p:03d}")
+        for m in range(modules):
+            module_dir = project_dir / f"module-{m}"
+            module_dir.mkdir()
+            with open(module_dir / "README.md", 'w', encoding='utf-8') as f:
+                f.write(f"# module-{m}\n\n" + " ".join(rng.choice(WORDS) for _ in range(400)))
+            with open(module_dir / "metadata.json", 'w', encoding='utf-8') as f:
+                json.dump({"module_metadata": {"name": f"module-{m}", "description": rng.choice(WORDS)}}, f)
+            uris.append(f"mcp-docs://module/java/project-{p:03d}/module-{m}")
+    return uris
+
+
+async def run_load(server: MCPDocumentationServer, uris: List[str], rate: float, total: int,
+                   seed: int) -> Dict[str, List[float]]:
+    """按泊松到达发送 total 个混合请求（开环），延迟从计划到达时刻算起，包含被阻塞事件循环的排队时间"""
+    rng = random.Random(seed)
+    latencies: Dict[str, List[float]] = {"read": [], "search": [], "quality": [], "loop_lag": []}
+
+    async def request(kind: str, arrival: float, argument: str):
+        if kind == "read":
+            await server.read_resource(argument)
+        elif kind == "search":
+            await server.execute_tool("search_documentation", {"query": argument})
+        else:
+            await server.execute_tool("check_documentation_quality", {"scope": "all"})
+        latencies[kind].append((time.perf_counter() - arrival) * 1000)
+
+    async def lag_probe(stop: asyncio.Event):
+        # 事件循环响应性：定时器实际唤醒时间与计划时间之差
+        while not stop.is_set():
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            latencies["loop_lag"].append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(lag_probe(stop))
+    tasks = []
+    arrival = time.perf_counter()
+    for _ in range(total):
+        arrival += rng.expovariate(rate)
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pick = rng.random()
+        if pick < 0.7:
+            tasks.append(asyncio.create_task(request("read", arrival, rng.choice(uris))))
+        elif pick < 0.97:
+            tasks.append(asyncio.create_task(request("search", arrival, " ".join(rng.sample(WORDS, 2)))))
+        else:
+            tasks.append(asyncio.create_task(request("quality", arrival, "")))
+    await asyncio.gather(*tasks)
+    stop.set()
+    await probe
+    return latencies
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Documentation I/O Load Test")
+    parser.add_argument("--projects", type=int, default=40, help="Number of synthetic projects")
+    parser.add_argument("--modules", type=int, default=10, help="Modules per project")
+    parser.add_argument("--rate", type=float, default=400.0, help="Request arrival rate (per second)")
+    parser.add_argument("--requests", type=int, default=2000, help="Total number of requests")
+    parser.add_argument("--workers", type=int, default=8, help="I/O thread pool size")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        uris = generate_tree(root, args.projects, args.modules, args.seed)
+        server = MCPDocumentationServer(str(root))
+
+        print(f"{'mode':<10} {'type':<8} {'count':>6} {'p50(ms)':>10} {'p99(ms)':>10} {'total(s)':>9}")
+        for mode, workers in (("inline", 0), ("executor", args.workers)):
+            server.io = IOExecutor(max_workers=workers, max_queue=args.requests)
+            started = time.perf_counter()
+            latencies = asyncio.run(run_load(server, uris, args.rate, args.requests, args.seed))
+            total = time.perf_counter() - started
+            for kind, values in latencies.items():
+                if values:
+                    print(f"{mode:<10} {kind:<8} {len(values):>6} {percentile(values, 0.5):>10.2f} "
+                          f"{percentile(values, 0.99):>10.2f} {total:>9.2f}")
+            if workers:
+                print(f"io stats: {server.io.stats()}")
+
+
+if __name__ == "__main__":
+    main()
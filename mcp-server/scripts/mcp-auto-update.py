@@ -6,8 +6,10 @@ MCP文档服务器自动化脚本
 """
 
 import os
+import sys
 import json
 import time
+import queue
 import logging
 import hashlib
 import subprocess
@@ -16,6 +18,13 @@ from pathlib import Path
 from typing import Dict, List, Optional, Set
 import argparse
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalog import DocumentationCatalog  # noqa: E402
+from dependency_graph import DependencyGraph, graph_document  # noqa: E402
+from dependency_index import DependencyIndex  # noqa: E402
+from file_watcher import DELETED, RESCAN, FileWatcher  # noqa: E402
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +45,17 @@ class MCPAutoUpdater:
         self.languages = self._get_supported_languages()
         self.file_hashes = {}
         
+        # 依赖图：目录缓存只在全量扫描或文件事件时校验，依赖索引与依赖图只更新变化的项目
+        self.catalog = DocumentationCatalog(
+            self.mcp_root, self.config.get("supported_languages", []), revalidate_interval=float("inf")
+        )
+        self.dependency_index = DependencyIndex(self.catalog)
+        self.dependency_graph = DependencyGraph()
+        self.graph_file = self.mcp_root / "dependency-graph.json"
+        # 已写出的依赖图内容（不含生成时间）与对应的依赖索引版本
+        self._written_graph: Optional[Dict] = None
+        self._written_generation = -1
+        
     def _load_config(self) -> Dict:
         """加载MCP配置文件"""
         config_path = self.mcp_root / "mcp-config.json"
@@ -47,10 +67,10 @@ class MCPAutoUpdater:
             return {}
     
     def _get_supported_languages(self) -> List[str]:
-        """获取支持的编程语言列表"""
+        """获取支持的编程语言目录列表（目录名为 display_name，如 Java）"""
         languages = []
         for lang_config in self.config.get("supported_languages", []):
-            languages.append(lang_config["name"])
+            languages.append(lang_config.get("display_name", lang_config["name"]))
         return languages
     
     def _calculate_file_hash(self, file_path: Path) -> str:
@@ -133,6 +153,8 @@ class MCPAutoUpdater:
                         
                         with open(project_info, 'w', encoding='utf-8') as f:
                             json.dump(data, f, indent=2, ensure_ascii=False)
+                        # 记录自身写入后的哈希，避免监听器把它当作新的变更
+                        self.file_hashes[str(project_info)] = self._calculate_file_hash(project_info)
                         
                         logger.info(f"Updated timestamps in {project_info}")
                     except Exception as e:
@@ -150,6 +172,7 @@ class MCPAutoUpdater:
                     
                     with open(metadata_file, 'w', encoding='utf-8') as f:
                         json.dump(data, f, indent=2, ensure_ascii=False)
+                    self.file_hashes[str(metadata_file)] = self._calculate_file_hash(metadata_file)
                     
                     logger.info(f"Updated timestamps in {metadata_file}")
                 except Exception as e:
@@ -168,100 +191,132 @@ class MCPAutoUpdater:
             for project_dir in lang_dir.iterdir():
                 if not project_dir.is_dir():
                     continue
+                issues.extend(self._validate_project(project_dir))
+        
+        return issues
+    
+    def _validate_project(self, project_dir: Path) -> List[str]:
+        """验证单个项目的文档"""
+        issues = []
+        
+        # 检查必需文件
+        required_files = ["README.md", "project-info.json"]
+        for req_file in required_files:
+            if not (project_dir / req_file).exists():
+                issues.append(f"Missing required file: {project_dir / req_file}")
+        
+        # 验证project-info.json结构
+        project_info = project_dir / "project-info.json"
+        if project_info.exists():
+            try:
+                with open(project_info, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
                 
-                # 检查必需文件
-                required_files = ["README.md", "project-info.json"]
-                for req_file in required_files:
-                    if not (project_dir / req_file).exists():
-                        issues.append(f"Missing required file: {project_dir / req_file}")
-                
-                # 验证project-info.json结构
-                project_info = project_dir / "project-info.json"
-                if project_info.exists():
-                    try:
-                        with open(project_info, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
+                required_keys = ["project_metadata", "mcp_metadata"]
+                for key in required_keys:
+                    if key not in data:
+                        issues.append(f"Missing key '{key}' in {project_info}")
                         
-                        required_keys = ["project_metadata", "mcp_metadata"]
-                        for key in required_keys:
-                            if key not in data:
-                                issues.append(f"Missing key '{key}' in {project_info}")
-                                
-                    except json.JSONDecodeError as e:
-                        issues.append(f"Invalid JSON in {project_info}: {e}")
-                
-                # 检查模块文档
-                for module_dir in project_dir.iterdir():
-                    if not module_dir.is_dir() or module_dir.name.startswith('.'):
-                        continue
-                    
-                    module_required = ["README.md", "metadata.json"]
-                    for req_file in module_required:
-                        if not (module_dir / req_file).exists():
-                            issues.append(f"Missing module file: {module_dir / req_file}")
+            except json.JSONDecodeError as e:
+                issues.append(f"Invalid JSON in {project_info}: {e}")
+        
+        # 检查模块文档
+        for module_dir in project_dir.iterdir():
+            if not module_dir.is_dir() or module_dir.name.startswith('.'):
+                continue
+            
+            module_required = ["README.md", "metadata.json"]
+            for req_file in module_required:
+                if not (module_dir / req_file).exists():
+                    issues.append(f"Missing module file: {module_dir / req_file}")
         
         return issues
     
     def generate_dependency_graph(self) -> Dict:
-        """生成项目依赖关系图"""
-        dependency_graph = {
-            "nodes": [],
-            "edges": [],
-            "generated_at": datetime.now().isoformat()
-        }
+        """生成项目依赖关系图（依赖索引与依赖图只为变化的项目更新）"""
+        self.dependency_index.ensure_current()
+        self.dependency_graph.sync(self.dependency_index)
+        return graph_document(self.dependency_index, self.dependency_graph)
+    
+    def update_dependency_graph(self, events=None) -> bool:
+        """按文件事件（为None时全量校验）更新依赖图，内容变化时才重写 dependency-graph.json"""
+        if events is None:
+            self.catalog.refresh(force=True)
+        else:
+            self.catalog.apply_changes(events)
+        self.dependency_index.ensure_current()
+        if self.dependency_index.generation == self._written_generation and self.graph_file.exists():
+            return False
         
-        for language in self.languages:
-            lang_dir = self.mcp_root / language
-            if not lang_dir.exists():
+        dependency_graph = self.generate_dependency_graph()
+        content = {key: value for key, value in dependency_graph.items() if key != "generated_at"}
+        if self._written_graph is None and self.graph_file.exists():
+            try:
+                with open(self.graph_file, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)
+                self._written_graph = {key: value for key, value in existing.items() if key != "generated_at"}
+            except Exception as e:
+                logger.warning(f"Failed to read {self.graph_file}: {e}")
+        self._written_generation = self.dependency_index.generation
+        if content == self._written_graph:
+            logger.info("Dependency graph unchanged")
+            return False
+        
+        with open(self.graph_file, 'w', encoding='utf-8') as f:
+            json.dump(dependency_graph, f, indent=2, ensure_ascii=False)
+        self._written_graph = content
+        stats = self.dependency_graph.stats()
+        logger.info(f"Updated dependency graph: {self.graph_file} ({stats['nodes']} nodes, {stats['edges']} edges, "
+                    f"{len(dependency_graph['cycles'])} cycles)")
+        for cycle in dependency_graph["cycles"]:
+            logger.warning(f"Dependency cycle: {', '.join(cycle)}")
+        return True
+    
+    def process_events(self, events) -> Dict[str, Set[str]]:
+        """根据文件监听事件计算变更，只对涉及的元数据文件计算哈希"""
+        changes = {"modified": set(), "added": set(), "deleted": set()}
+        
+        for event in events:
+            path = Path(event.path)
+            if path.name == "project-info.json":
+                target_dir = path.parent
+            elif path.name == "metadata.json":
+                target_dir = path.parent
+            else:
                 continue
             
-            for project_dir in lang_dir.iterdir():
-                if not project_dir.is_dir():
-                    continue
-                
-                project_info = project_dir / "project-info.json"
-                if not project_info.exists():
-                    continue
-                
-                try:
-                    with open(project_info, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    project_name = data["project_metadata"]["name"]
-                    
-                    # 添加项目节点
-                    dependency_graph["nodes"].append({
-                        "id": project_name,
-                        "type": "project",
-                        "language": language,
-                        "description": data["project_metadata"].get("description", "")
-                    })
-                    
-                    # 添加模块节点和依赖关系
-                    for module in data.get("modules", []):
-                        module_name = f"{project_name}.{module['name']}"
-                        
-                        dependency_graph["nodes"].append({
-                            "id": module_name,
-                            "type": "module",
-                            "project": project_name,
-                            "status": module.get("status", "unknown"),
-                            "description": module.get("description", "")
-                        })
-                        
-                        # 添加模块依赖边
-                        for dep in module.get("dependencies", []):
-                            dep_name = f"{project_name}.{dep}"
-                            dependency_graph["edges"].append({
-                                "from": module_name,
-                                "to": dep_name,
-                                "type": "depends_on"
-                            })
-                
-                except Exception as e:
-                    logger.error(f"Failed to process {project_info}: {e}")
+            if event.kind == DELETED or not path.exists():
+                if self.file_hashes.pop(str(path), None) is not None:
+                    changes["deleted"].add(str(target_dir))
+                    logger.info(f"Metadata removed: {path}")
+                continue
+            
+            current_hash = self._calculate_file_hash(path)
+            old_hash = self.file_hashes.get(str(path), "")
+            if not old_hash:
+                changes["added"].add(str(target_dir))
+                logger.info(f"New metadata detected: {path}")
+            elif current_hash != old_hash:
+                changes["modified"].add(str(target_dir))
+                logger.info(f"Metadata modified: {path}")
+            self.file_hashes[str(path)] = current_hash
         
-        return dependency_graph
+        return changes
+    
+    def _apply_changes(self, changes: Dict[str, Set[str]], events=None) -> None:
+        """变更后的处理：更新时间戳并增量更新依赖关系图"""
+        if changes["modified"] or changes["added"] or changes["deleted"]:
+            logger.info(
+                f"Changes detected: {len(changes['modified'])} modified, {len(changes['added'])} added, "
+                f"{len(changes['deleted'])} deleted"
+            )
+            
+            # 更新时间戳
+            all_changes = changes["modified"].union(changes["added"])
+            self.update_timestamps(all_changes)
+        
+        # 依赖关系图按目录缓存的文件标记增量更新（目录删除等不经过哈希比较的变化也会反映），内容不变时不重写
+        self.update_dependency_graph(events)
     
     def run_monitoring_cycle(self) -> None:
         """运行一次监控周期"""
@@ -270,51 +325,71 @@ class MCPAutoUpdater:
         # 1. 扫描变更
         changes = self.scan_for_changes()
         
-        if changes["modified"] or changes["added"]:
-            logger.info(f"Changes detected: {len(changes['modified'])} modified, {len(changes['added'])} added")
-            
-            # 2. 更新时间戳
-            all_changes = changes["modified"].union(changes["added"])
-            self.update_timestamps(all_changes)
-            
-            # 3. 生成依赖关系图
-            dependency_graph = self.generate_dependency_graph()
-            graph_file = self.mcp_root / "dependency-graph.json"
-            with open(graph_file, 'w', encoding='utf-8') as f:
-                json.dump(dependency_graph, f, indent=2, ensure_ascii=False)
-            logger.info(f"Updated dependency graph: {graph_file}")
+        # 2. 更新时间戳、依赖关系图
+        self._apply_changes(changes)
         
-        # 4. 验证文档
+        # 3. 验证文档
         issues = self.validate_documentation()
+        self._report_issues(issues)
+        
+        logger.info("MCP documentation monitoring cycle completed")
+    
+    def _report_issues(self, issues: List[str]) -> None:
         if issues:
             logger.warning(f"Documentation issues found: {len(issues)}")
             for issue in issues:
                 logger.warning(f"  - {issue}")
         else:
             logger.info("All documentation validation checks passed")
-        
-        logger.info("MCP documentation monitoring cycle completed")
     
-    def run_continuous_monitoring(self, interval: int = 300) -> None:
-        """持续监控模式"""
-        logger.info(f"Starting continuous monitoring with {interval}s interval")
+    def run_continuous_monitoring(self, interval: int = 300, backend: str = "auto") -> None:
+        """持续监控模式：首轮全量扫描，之后由文件监听事件驱动"""
+        logger.info(f"Starting continuous monitoring ({backend} watcher, polling interval {interval}s)")
+        
+        # 首轮全量扫描，建立哈希基线
+        self.run_monitoring_cycle()
+        
+        batches: "queue.Queue[list]" = queue.Queue()
+        watcher = FileWatcher(self.mcp_root, poll_interval=interval, backend=backend)
+        watcher.subscribe(batches.put)
+        watcher.start()
         
         try:
             while True:
-                self.run_monitoring_cycle()
-                logger.info(f"Sleeping for {interval} seconds...")
-                time.sleep(interval)
+                events = batches.get()
+                if any(event.kind == RESCAN for event in events):
+                    self.run_monitoring_cycle()
+                    continue
+                
+                changes = self.process_events(events)
+                self._apply_changes(changes, events)
+                
+                # 只验证受影响的项目
+                project_dirs = set()
+                for path in changes["modified"] | changes["added"]:
+                    path_obj = Path(path)
+                    project_dirs.add(path_obj if (path_obj / "project-info.json").exists() else path_obj.parent)
+                issues = []
+                for project_dir in sorted(project_dirs):
+                    if project_dir.is_dir():
+                        issues.extend(self._validate_project(project_dir))
+                if project_dirs:
+                    self._report_issues(issues)
         except KeyboardInterrupt:
             logger.info("Monitoring stopped by user")
         except Exception as e:
             logger.error(f"Monitoring error: {e}")
             raise
+        finally:
+            watcher.stop()
 
 
 def main():
     parser = argparse.ArgumentParser(description="MCP Documentation Auto-Updater")
     parser.add_argument("--mcp-root", default=".", help="MCP root directory")
-    parser.add_argument("--interval", type=int, default=300, help="Monitoring interval in seconds")
+    parser.add_argument("--interval", type=int, default=300, help="Polling interval in seconds (polling watcher only)")
+    parser.add_argument("--watcher", choices=["auto", "inotify", "poll"], default="auto",
+                        help="File watcher backend")
     parser.add_argument("--once", action="store_true", help="Run once and exit")
     parser.add_argument("--validate-only", action="store_true", help="Only validate documentation")
     
@@ -336,7 +411,7 @@ def main():
     if args.once:
         updater.run_monitoring_cycle()
     else:
-        updater.run_continuous_monitoring(args.interval)
+        updater.run_continuous_monitoring(args.interval, args.watcher)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元数据查询基准测试
+在不同规模的合成目录上测量列式索引的构建耗时与典型过滤/排序/计数查询的延迟，
+并与逐行判断条件的线性扫描对比延迟和结果一致性
+"""
+
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+import argparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalog import LanguageEntry, ModuleEntry, ProjectEntry  # noqa: E402
+from metadata_index import MetadataIndex  # noqa: E402
+
+TODAY = date(2026, 1, 1)
+STATUSES = ["active", "active", "active", "development", "deprecated", "archived"]
+
+
+class SyntheticCatalog:
+    """合成目录，提供 MetadataIndex 所需的目录缓存接口（不产生文件I/O）"""
+
+    def __init__(self, project_count: int, modules_per_project: int, libraries: int, seed: int):
+        rng = random.Random(seed)
+        library_names = [f"lib-{i}" for i in range(libraries)]
+        weights = [1.0 / (rank + 1) for rank in range(libraries)]
+        self.version = 0
+        self._lock = threading.RLock()
+        self.languages: Dict[str, LanguageEntry] = {}
+        for name in ("java", "python", "go", "typescript"):
+            self.languages[name] = LanguageEntry(name, name.title(), Path(name))
+
+        def day() -> str:
+            return (TODAY - timedelta(days=rng.randint(0, 720))).isoformat()
+
+        def version() -> str:
+            return f"{rng.randint(0, 3)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}"
+
+        for project_id in range(project_count):
+            language = rng.choice(list(self.languages.values()))
+            project = ProjectEntry(f"project-{project_id}", language.path / f"project-{project_id}")
+            project.info = {
+                "project_metadata": {"name": project.name, "version": version(), "last_updated": day()},
+                "technology_stack": {"dependencies": [{"name": library} for library in
+                                                      set(rng.choices(library_names, weights=weights, k=5))]},
+                "status": {"phase": rng.choice(STATUSES)},
+            }
+            for module_id in range(modules_per_project):
+                module = ModuleEntry(f"module-{module_id}", project.path / f"module-{module_id}")
+                module.metadata_stamp = (0, 0)
+                module.metadata = {
+                    "module_metadata": {"name": module.name, "status": rng.choice(STATUSES),
+                                        "version": version(), "last_updated": day()},
+                    "technical_details": {"dependencies": {
+                        "external": [{"library": library} for library in
+                                     set(rng.choices(library_names, weights=weights, k=3))],
+                        "internal": [],
+                    }},
+                }
+                project.modules[module.name] = module
+            language.projects[project.name] = project
+
+    def stale(self) -> bool:
+        return False
+
+    def refresh(self, force: bool = False) -> bool:
+        return False
+
+
+def linear_query(rows: List[Dict[str, Any]], predicate: Callable[[Dict[str, Any]], bool],
+                 sort_key=None) -> Tuple[int, List[Dict[str, Any]]]:
+    """逐行判断条件的基线：返回 (命中数, 前50行)"""
+    matches = [row for row in rows if predicate(row)]
+    if sort_key is not None:
+        matches.sort(key=sort_key)
+    return len(matches), matches[:50]
+
+
+def version_tuple(value: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in value.split("."))
+
+
+QUERIES = [
+    ("status+dependency",
+     {"kind": "module", "filters": {"status": "deprecated", "dependency": "lib-3"}},
+     lambda row: row["kind"] == "module" and row["status"] == "deprecated" and "lib-3" in row["dependencies"],
+     None),
+    ("language+recent",
+     {"filters": {"language": ["java", "go"], "last_updated": {"within_days": 30}}},
+     lambda row: row["language"] in ("java", "go") and row["last_updated"] >= (TODAY - timedelta(days=30)).isoformat(),
+     None),
+    ("version range+sort",
+     {"kind": "project", "filters": {"version": {"gte": "2.10", "lt": "3"}}, "sort": ["-last_updated"]},
+     lambda row: row["kind"] == "project" and (2, 10) <= version_tuple(row["version"]) < (3,),
+     lambda row: row["last_updated"]),
+    ("count_by status",
+     {"filters": {"status": {"ne": "archived"}}, "count_by": ["status", "language"]},
+     lambda row: row["status"] != "archived",
+     None),
+]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Documentation Metadata Query Benchmark")
+    parser.add_argument("--sizes", default="1000,5000,20000", help="Comma separated project counts")
+    parser.add_argument("--modules", type=int, default=10, help="Modules per project")
+    parser.add_argument("--libraries", type=int, default=500, help="Distinct dependency names")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per query")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'build(ms)':>10} {'query':<20} {'hits':>7} {'index p50(us)':>14} "
+          f"{'index p99(us)':>14} {'scan p50(us)':>13} {'match':>6}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        catalog = SyntheticCatalog(size, args.modules, args.libraries, args.seed)
+        index = MetadataIndex(catalog, today=lambda: TODAY)
+        started = time.perf_counter()
+        index.ensure_current()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        for name, arguments, predicate, sort_key in QUERIES:
+            indexed, scanned = [], []
+            for _ in range(args.repeat):
+                started = time.perf_counter_ns()
+                result = index.query(**arguments)
+                indexed.append((time.perf_counter_ns() - started) / 1000)
+                started = time.perf_counter_ns()
+                total, first = linear_query(index.rows, predicate, sort_key)
+                scanned.append((time.perf_counter_ns() - started) / 1000)
+
+            # 降序排序时并列项顺序不同，只比较命中数与排序键
+            if sort_key is None:
+                match = total == result["total"] and first == result["results"]
+            else:
+                expected = sorted((sort_key(row) for row in index.rows if predicate(row)), reverse=True)[:50]
+                match = total == result["total"] and expected == [sort_key(row) for row in result["results"]]
+            print(f"{len(index.rows):>8} {build_ms:>10.0f} {name:<20} {result['total']:>7} "
+                  f"{percentile(indexed, 0.5):>14.1f} {percentile(indexed, 0.99):>14.1f} "
+                  f"{percentile(scanned, 0.5):>13.1f} {str(match):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档质量检查基准测试
+生成合成文档语料（项目/模块的 README.md、project-info.json、metadata.json），
+以不同的 --jobs 运行 quality-checker.py，比较墙钟耗时与加速比，并校验各次的问题列表完全一致
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+import argparse
+
+CHECKER = Path(__file__).resolve().parent / "quality-checker.py"
+
+STATUSES = ["active", "active", "active", "deprecated", "planned", "under_development", "archived"]
+
+CODE_SAMPLES = {
+    "java": [
+        "public class {name} {{\n    private final Map<String, Object> cache = new HashMap<>();\n\n"
+        "    public Object get(String key) {{\n        return cache.get(key);\n    }}\n}}",
+        "public void handle(Request request) {{\n    if (request.isValid()) {{\n"
+        "        process(request.body());\n    }}\n",
+    ],
+    "python": [
+        "def {name}(items):\n    total = 0\n    for item in items:\n        total += item.price * item.count\n"
+        "    return total\n",
+        "def {name}(items)\n    return [item for item in items if item]\n",
+    ],
+    "javascript": [
+        "export function {name}(options) {{\n  const merged = {{ ...defaults, ...options }};\n"
+        "  return fetch(merged.url, {{ method: 'POST', body: JSON.stringify(merged) }});\n}}",
+        "function {name}(list) {{\n  return list.map((x) => x * 2;\n}}",
+    ],
+    "gdscript": [
+        "func {name}(delta: float) -> void:\n    velocity.y += gravity * delta\n    move_and_slide()",
+        "func {name} delta:\n    pass",
+    ],
+    "json": [
+        '{{"name": "{name}", "enabled": true, "retries": 3}}',
+        '{{"name": "{name}", "enabled": true,}}',
+    ],
+}
+
+
+def markdown(rng: random.Random, title: str, sections: int) -> str:
+    """生成带代码块与链接的Markdown，约2%的代码块有语法问题"""
+    lines = [f"# {title}", ""]
+    if rng.random() < 0.02:
+        lines += [f"# {title} (draft)", ""]
+    for section in range(sections):
+        lines += [f"## Section {section}", ""]
+        lines += [f"{title} handles request routing, caching and retries for section {section}. "
+                  f"See [the guide](./docs/guide-{section}.md) and https://example.com/{title}/{section} "
+                  f"for details, or the [API reference](https://api.example.com/v{section % 3}/{title})."
+                  for _ in range(rng.randint(2, 5))]
+        language = rng.choice(list(CODE_SAMPLES))
+        valid, broken = CODE_SAMPLES[language]
+        sample = broken if rng.random() < 0.02 else valid
+        lines += ["", f"```{language}", sample.format(name=f"{title.replace('-', '_')}_{section}"), "```", ""]
+    return "\n".join(lines) + "\n"
+
+
+def project_info(rng: random.Random, name: str) -> Dict:
+    info = {
+        "project_metadata": {"name": name, "version": f"{rng.randint(0, 3)}.{rng.randint(0, 9)}.{rng.randint(0, 9)}",
+                             "language": "java", "description": f"{name} service"},
+        "mcp_metadata": {"generated_by": "quality-checker-benchmark", "schema_version": "1.0"},
+    }
+    if rng.random() < 0.02:
+        info["project_metadata"]["version"] = "v1"
+    return info
+
+
+def module_metadata(rng: random.Random, name: str) -> Dict:
+    metadata = {
+        "module_metadata": {"name": name, "description": f"{name} module", "status": rng.choice(STATUSES)},
+        "mcp_metadata": {"generated_by": "quality-checker-benchmark", "schema_version": "1.0"},
+    }
+    if rng.random() < 0.02:
+        del metadata["module_metadata"]["description"]
+    return metadata
+
+
+def generate_corpus(root: Path, files: int, modules_per_project: int, seed: int) -> int:
+    """生成约 files 个文件：每个项目 2 个文件，每个模块 README.md + metadata.json 共 2 个"""
+    rng = random.Random(seed)
+    projects = max(1, files // (2 + modules_per_project * 2))
+    written = 0
+    for project_id in range(projects):
+        project_name = f"project-{project_id}"
+        project_dir = root / "Java" / project_name
+        project_dir.mkdir(parents=True)
+        (project_dir / "README.md").write_text(markdown(rng, project_name, rng.randint(3, 6)), encoding="utf-8")
+        (project_dir / "project-info.json").write_text(
+            json.dumps(project_info(rng, project_name), indent=2), encoding="utf-8")
+        written += 2
+        for module_id in range(modules_per_project):
+            module_name = f"module-{module_id}"
+            module_dir = project_dir / module_name
+            module_dir.mkdir()
+            (module_dir / "README.md").write_text(
+                markdown(rng, f"{project_name}-{module_name}", rng.randint(3, 6)), encoding="utf-8")
+            (module_dir / "metadata.json").write_text(
+                json.dumps(module_metadata(rng, module_name), indent=2), encoding="utf-8")
+            written += 2
+    return written
+
+
+def run_checker(root: Path, jobs: int, output: Path) -> Tuple[float, List[str]]:
+    """运行一次质量检查，返回 (墙钟耗时秒, 问题列表)"""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, str(CHECKER), "--mcp-root", str(root), "--output", str(output),
+                    "--jobs", str(jobs)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - started
+    with open(output, "r", encoding="utf-8") as f:
+        return elapsed, json.load(f)["issues"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Documentation Quality Checker Benchmark")
+    parser.add_argument("--files", type=int, default=20000, help="Approximate number of generated files")
+    parser.add_argument("--modules", type=int, default=4, help="Modules per project")
+    parser.add_argument("--jobs", default="1,2,4,8", help="Comma separated --jobs values")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per --jobs value (best is reported)")
+    parser.add_argument("--corpus", help="Existing or target corpus directory (default: temporary)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="quality-benchmark-") as temp:
+        root = Path(args.corpus) if args.corpus else Path(temp) / "mcp-docs"
+        if root.exists():
+            print(f"Using existing corpus: {root}")
+        else:
+            started = time.perf_counter()
+            count = generate_corpus(root, args.files, args.modules, args.seed)
+            print(f"Generated {count} files in {time.perf_counter() - started:.1f}s: {root}")
+        print(f"CPU count: {os.cpu_count()}")
+
+        print(f"{'jobs':>5} {'wall(s)':>8} {'speedup':>8} {'issues':>7} {'match':>6}")
+        baseline_time, baseline_issues = None, None
+        for jobs in (int(value) for value in args.jobs.split(",")):
+            runs = [run_checker(root, jobs, Path(temp) / f"report-{jobs}.json") for _ in range(args.repeat)]
+            elapsed = min(run[0] for run in runs)
+            issues = runs[0][1]
+            if baseline_time is None:
+                baseline_time, baseline_issues = elapsed, issues
+            match = all(run[1] == baseline_issues for run in runs)
+            print(f"{jobs:>5} {elapsed:>8.2f} {baseline_time / elapsed:>7.2f}x {len(issues):>7} {str(match):>6}")
+
+
+if __name__ == "__main__":
+    main()
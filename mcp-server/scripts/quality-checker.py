@@ -7,10 +7,12 @@ MCP文档质量检查器
 
 import os
 import re
+import ast
 import json
 import requests
 import subprocess
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -19,6 +21,9 @@ from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# 每个工作进程分到的分片数，分片越小负载越均衡
+SHARDS_PER_JOB = 4
+
 class QualityIssue:
     """质量问题类"""
     
@@ -299,15 +304,16 @@ class DocumentationQualityChecker:
             ))
             return
         
-        # 检查链接
-        links = self.link_checker.find_links_in_markdown(content)
-        for url, line_num in links:
-            is_valid, message = self.link_checker.check_url(url)
-            if not is_valid:
-                self.issues.append(QualityIssue(
-                    str(file_path), "BROKEN_LINK", 
-                    f"链接无效 '{url}': {message}", line_num
-                ))
+        # 检查链接（未启用链接检查时 link_checker 为 None）
+        if self.link_checker is not None:
+            links = self.link_checker.find_links_in_markdown(content)
+            for url, line_num in links:
+                is_valid, message = self.link_checker.check_url(url)
+                if not is_valid:
+                    self.issues.append(QualityIssue(
+                        str(file_path), "BROKEN_LINK", 
+                        f"链接无效 '{url}': {message}", line_num
+                    ))
         
         # 检查代码块
         code_blocks = self.code_validator.find_code_blocks(content)
@@ -370,32 +376,56 @@ class DocumentationQualityChecker:
                 str(file_path), "METADATA_ERROR", issue
             ))
     
-    def check_directory(self, directory: Path) -> None:
-        """检查目录中的所有文档"""
-        logger.info(f"检查目录: {directory}")
-        
-        # 检查Markdown文件
-        for md_file in directory.rglob("*.md"):
-            logger.debug(f"检查Markdown文件: {md_file}")
-            self.check_markdown_file(md_file)
-        
-        # 检查JSON元数据文件
-        for json_file in directory.rglob("*.json"):
-            logger.debug(f"检查JSON文件: {json_file}")
+    def collect_files(self, directory: Path) -> List[Tuple[Path, str]]:
+        """收集待检查的文件及其类型，按路径排序以保证问题顺序稳定"""
+        files = [(md_file, "markdown") for md_file in sorted(directory.rglob("*.md"))]
+        for json_file in sorted(directory.rglob("*.json")):
             if json_file.name == "project-info.json":
-                self.check_json_file(json_file, "project")
+                files.append((json_file, "project"))
             elif json_file.name == "metadata.json":
-                self.check_json_file(json_file, "module")
+                files.append((json_file, "module"))
             else:
-                self.check_json_file(json_file, "unknown")
+                files.append((json_file, "unknown"))
+        return files
+    
+    def check_file(self, file_path: Path, file_type: str) -> None:
+        """按类型检查单个文件"""
+        if file_type == "markdown":
+            logger.debug(f"检查Markdown文件: {file_path}")
+            self.check_markdown_file(file_path)
+        else:
+            logger.debug(f"检查JSON文件: {file_path}")
+            self.check_json_file(file_path, file_type)
+    
+    def check_directory(self, directory: Path, jobs: int = 1) -> None:
+        """检查目录中的所有文档
+        
+        jobs > 1 时把文件按顺序切成分片交给进程池，结果按分片顺序合并，
+        问题列表与单进程检查完全一致。
+        """
+        logger.info(f"检查目录: {directory}")
+        files = self.collect_files(directory)
+        
+        if jobs <= 1 or len(files) < 2:
+            for file_path, file_type in files:
+                self.check_file(file_path, file_type)
+            return
+        
+        shard_size = -(-len(files) // (jobs * SHARDS_PER_JOB))
+        shards = [files[start:start + shard_size] for start in range(0, len(files), shard_size)]
+        logger.info(f"使用 {jobs} 个进程检查 {len(files)} 个文件（{len(shards)} 个分片）")
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(str(self.mcp_root), self.link_checker is not None)) as executor:
+            for issues in executor.map(_check_shard, shards):
+                self.issues.extend(issues)
     
-    def run_quality_check(self) -> Dict:
+    def run_quality_check(self, jobs: int = 1) -> Dict:
         """运行质量检查"""
         logger.info("开始文档质量检查")
         self.issues.clear()
         
         # 检查整个MCP目录
-        self.check_directory(self.mcp_root)
+        self.check_directory(self.mcp_root, jobs)
         
         # 生成报告
         report = self._generate_report()
@@ -433,14 +463,36 @@ class DocumentationQualityChecker:
             json.dump(report, f, indent=2, ensure_ascii=False)
         logger.info(f"质量检查报告已保存至: {output_file}")
 
+# 工作进程内的检查器，由进程池的 initializer 创建，各分片复用
+_worker_checker: Optional[DocumentationQualityChecker] = None
+
+def _init_worker(mcp_root: str, check_links: bool) -> None:
+    """进程池初始化：每个工作进程创建一个检查器"""
+    global _worker_checker
+    _worker_checker = DocumentationQualityChecker(mcp_root)
+    if not check_links:
+        _worker_checker.link_checker = None
+
+def _check_shard(files: List[Tuple[Path, str]]) -> List[QualityIssue]:
+    """在工作进程中检查一个分片，按文件顺序返回发现的问题"""
+    _worker_checker.issues = []
+    for file_path, file_type in files:
+        _worker_checker.check_file(file_path, file_type)
+    return _worker_checker.issues
+
 def main():
     parser = argparse.ArgumentParser(description="MCP Documentation Quality Checker")
     parser.add_argument("--mcp-root", default=".", help="MCP root directory")
     parser.add_argument("--output", help="Output report file")
     parser.add_argument("--check-links", action="store_true", help="Check external links (slower)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes for checking files (0 = CPU count)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     
     args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    jobs = args.jobs or os.cpu_count() or 1
     
     # 配置日志
     log_level = logging.DEBUG if args.verbose else logging.INFO
@@ -454,7 +506,7 @@ def main():
         checker.link_checker = None
     
     # 运行质量检查
-    report = checker.run_quality_check()
+    report = checker.run_quality_check(jobs)
     
     # 输出结果
     print(f"\n=== MCP文档质量检查报告 ===")
@@ -485,5 +537,4 @@ def main():
     return 1 if report['total_issues'] > 0 else 0
 
 if __name__ == "__main__":
-    import ast
     exit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档搜索基准测试
+在合成语料上对比各排序引擎的相关性（MRR@10、P@1）与查询延迟，
+以及全量排序与前k选择（MaxScore剪枝）的延迟
+"""
+
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+import argparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ranking import RANKERS, create_ranker  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+from tokenizer import tokenize  # noqa: E402
+
+FILLER_WORDS = [
+    "service", "module", "config", "request", "response", "handler", "client", "server",
+    "data", "cache", "thread", "queue", "event", "state", "error", "logger", "test",
+    "build", "deploy", "schema", "record", "field", "value", "index", "option",
+]
+
+CHINESE_WORDS = [
+    "用户", "管理", "认证", "权限", "数据库", "缓存", "配置", "接口", "模块", "服务",
+    "日志", "测试", "部署", "性能", "请求", "响应", "异常", "处理", "存储", "查询",
+]
+
+IDENTIFIERS = ["UserService", "AuthController", "get_user_name", "cacheManager", "JwtTokenProvider"]
+
+
+def generate_corpus(root: Path, doc_count: int, seed: int = 42) -> List[Tuple[str, str]]:
+    """生成合成语料，返回 (查询, 期望命中的相对路径) 列表"""
+    rng = random.Random(seed)
+    lang_dir = root / "Java"
+    lang_dir.mkdir(parents=True)
+    with open(root / "mcp-config.json", 'w', encoding='utf-8') as f:
+        json.dump({"supported_languages": [{"name": "java", "display_name": "Java"}]}, f)
+
+    queries = []
+    # 每个项目：1个长README + 若干短模块文档
+    modules_per_project = 9
+    project_count = max(1, doc_count // (modules_per_project + 1))
+    topic_id = 0
+
+    for p in range(project_count):
+        project_dir = lang_dir / f"project-{p:05d}"
+        project_dir.mkdir()
+        topics = []
+        for m in range(modules_per_project):
+            topic = f"topic{topic_id:06d}"
+            topic_id += 1
+            topics.append(topic)
+            module_dir = project_dir / f"module-{m}"
+            module_dir.mkdir()
+            body = " ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(40, 80)))
+            with open(module_dir / "README.md", 'w', encoding='utf-8') as f:
+                f.write(f"# {topic} module\n\n{body} {topic}\n")
+            with open(module_dir / "metadata.json", 'w', encoding='utf-8') as f:
+                json.dump({"module_metadata": {"name": f"module-{m}", "description": f"{topic} handler"}}, f)
+            rel = module_dir.relative_to(project_dir) / "README.md"
+            queries.append((f"{topic} handler", f"project-{p:05d}/{rel.as_posix()}"))
+
+        # 长README反复提及所有主题，旧的计数打分会偏向它
+        body_lines = []
+        for _ in range(60):
+            line = " ".join(rng.choice(FILLER_WORDS) for _ in range(20))
+            body_lines.append(f"{line} {rng.choice(topics)} {rng.choice(topics)} handler")
+        with open(project_dir / "README.md", 'w', encoding='utf-8') as f:
+            f.write(f"# project-{p:05d}\n\n" + "\n".join(body_lines) + "\n")
+
+    return queries
+
+
+def generate_mixed_corpus(root: Path, doc_count: int, seed: int = 42) -> int:
+    """生成中英文混合语料，返回写入的字节数"""
+    rng = random.Random(seed)
+    lang_dir = root / "Java"
+    total_bytes = 0
+    for i in range(doc_count):
+        module_dir = lang_dir / f"project-{i // 50:04d}" / f"module-{i % 50}"
+        module_dir.mkdir(parents=True)
+        lines = [f"# {rng.choice(CHINESE_WORDS)}{rng.choice(CHINESE_WORDS)} {rng.choice(IDENTIFIERS)}"]
+        for _ in range(rng.randint(10, 30)):
+            words = []
+            for _ in range(12):
+                pick = rng.random()
+                if pick < 0.6:
+                    words.append("".join(rng.choice(CHINESE_WORDS) for _ in range(rng.randint(1, 3))))
+                elif pick < 0.9:
+                    words.append(rng.choice(FILLER_WORDS))
+                else:
+                    words.append(rng.choice(IDENTIFIERS))
+            lines.append("，".join(words) + "。")
+        content = "\n".join(lines) + "\n"
+        data = content.encode("utf-8")
+        total_bytes += len(data)
+        with open(module_dir / "README.md", 'wb') as f:
+            f.write(data)
+    return total_bytes
+
+
+def run_mixed_benchmark(doc_count: int, query_count: int, seed: int) -> None:
+    """中英文混合语料：分词/建索引吞吐量与查询延迟"""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        total_bytes = generate_mixed_corpus(root, doc_count, seed)
+        megabytes = total_bytes / (1024 * 1024)
+
+        texts = [path.read_text(encoding="utf-8") for path in sorted((root / "Java").rglob("*.md"))]
+        started = time.perf_counter()
+        token_count = sum(len(tokenize(text)) for text in texts)
+        tokenize_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = SearchIndex(root, {"java": root / "Java"})
+        index.build()
+        build_seconds = time.perf_counter() - started
+
+        print(f"混合语料: {len(index.docs)} 文档, {megabytes:.1f}MB, {token_count} 词元, {len(index.postings)} 词项")
+        print(f"分词吞吐量: {megabytes / tokenize_seconds:.2f} MB/s")
+        print(f"建索引吞吐量: {megabytes / build_seconds:.2f} MB/s")
+
+        query_sets = {
+            "chinese": lambda: "".join(rng.sample(CHINESE_WORDS, 2)),
+            "english": lambda: " ".join(rng.sample(FILLER_WORDS, 2)),
+            "mixed": lambda: f"{rng.choice(CHINESE_WORDS)}{rng.choice(CHINESE_WORDS)} {rng.choice(IDENTIFIERS)}",
+        }
+        print(f"\n{'queries':<8} {'p50(ms)':>10} {'p99(ms)':>10}")
+        for name, make_query in query_sets.items():
+            latencies = []
+            for _ in range(query_count):
+                query = make_query()
+                started = time.perf_counter()
+                index.search(query)
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"{name:<8} {latencies[len(latencies) // 2]:>10.3f} {p99:>10.3f}")
+
+
+def evaluate(index: SearchIndex, queries: List[Tuple[str, str]], top_k: bool = True) -> Dict[str, float]:
+    """计算相关性与延迟指标；top_k为False时全量排序后截断"""
+    reciprocal_ranks = []
+    hits_at_1 = 0
+    latencies = []
+
+    for query, expected in queries:
+        started = time.perf_counter()
+        ranked = index.rank(query, limit=10) if top_k else index.rank(query)[:10]
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        paths = [f"{index.docs[doc_id]['project']}/{index.docs[doc_id]['relative_path']}" for doc_id, _ in ranked]
+        if expected in paths:
+            rank = paths.index(expected) + 1
+            reciprocal_ranks.append(1.0 / rank)
+            hits_at_1 += rank == 1
+        else:
+            reciprocal_ranks.append(0.0)
+
+    latencies.sort()
+    return {
+        "mrr@10": statistics.mean(reciprocal_ranks),
+        "p@1": hits_at_1 / len(queries),
+        "latency_p50_ms": latencies[len(latencies) // 2],
+        "latency_p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Documentation Search Benchmark")
+    parser.add_argument("--docs", type=int, default=10000, help="Number of synthetic documents")
+    parser.add_argument("--queries", type=int, default=500, help="Number of sampled queries")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--mixed", action="store_true",
+                        help="Measure tokenizer/indexing throughput and latency on a mixed Chinese/English corpus")
+
+    args = parser.parse_args()
+
+    if args.mixed:
+        run_mixed_benchmark(args.docs, args.queries, args.seed)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        queries = generate_corpus(root, args.docs, args.seed)
+        sample = random.Random(args.seed).sample(queries, min(args.queries, len(queries)))
+
+        started = time.perf_counter()
+        index = SearchIndex(root, {"java": root / "Java"})
+        index.build()
+        build_ms = (time.perf_counter() - started) * 1000
+        print(f"语料: {len(index.docs)} 文档, {len(index.postings)} 词项, 构建耗时 {build_ms:.0f}ms")
+
+        print(f"\n{'ranker':<8} {'select':<6} {'MRR@10':>8} {'P@1':>8} {'p50(ms)':>10} {'p99(ms)':>10}")
+        for name in RANKERS:
+            index.ranker = create_ranker(name)
+            for top_k in (False, True):
+                metrics = evaluate(index, sample, top_k=top_k)
+                print(f"{name:<8} {'top10' if top_k else 'full':<6} {metrics['mrr@10']:>8.3f} {metrics['p@1']:>8.3f} "
+                      f"{metrics['latency_p50_ms']:>10.3f} {metrics['latency_p99_ms']:>10.3f}")
+
+        # 前k选择必须与全量排序的前k完全一致
+        index.ranker = create_ranker("bm25")
+        mismatches = sum(
+            [doc_id for doc_id, _ in index.rank(query, limit=10)] != [doc_id for doc_id, _ in index.rank(query)[:10]]
+            for query, _ in sample
+        )
+        print(f"\ntop10 与全量排序前10不一致的查询: {mismatches}/{len(sample)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语义检索基准测试
+在不同规模的合成语料上测量向量编码耗时、暴力检索与IVF检索的查询延迟，以及IVF相对暴力检索的召回率
+"""
+
+import math
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+import argparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ranking import bm25_idf  # noqa: E402
+from vector_index import HashingVectorizer, VectorIndex, numpy_available  # noqa: E402
+
+
+class SyntheticCorpus:
+    """合成语料，提供 VectorIndex.sync 所需的文档表与词频接口
+
+    每个项目属于一个主题：文档一部分词取自主题词表，其余按Zipf分布取自全局词表，
+    近似真实文档按项目/领域聚集的结构。
+    """
+
+    def __init__(self, doc_count: int, vocabulary: int, doc_length: int, seed: int,
+                 topics: int = 200, topic_words: int = 100, topic_share: float = 0.5):
+        rng = random.Random(seed)
+        self.words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+                      for _ in range(vocabulary)]
+        weights = [1.0 / (rank + 1) for rank in range(vocabulary)]
+        topic_vocabularies = [rng.sample(self.words, topic_words) for _ in range(topics)]
+        topic_length = int(doc_length * topic_share)
+
+        self.docs = []
+        self.signature: Dict[str, List[int]] = {}
+        self.counts: List[Dict[str, int]] = []
+        self.doc_freq: Dict[str, int] = {}
+        for doc_id in range(doc_count):
+            counts: Dict[str, int] = {}
+            topic = topic_vocabularies[(doc_id // 10) % topics]
+            words = rng.choices(topic, k=topic_length) + rng.choices(self.words, weights=weights,
+                                                                      k=doc_length - topic_length)
+            for word in words:
+                counts[word] = counts.get(word, 0) + 1
+            for word in counts:
+                self.doc_freq[word] = self.doc_freq.get(word, 0) + 1
+            path = f"Java/p{doc_id // 10}/doc{doc_id}.md"
+            self.docs.append({"path": path})
+            self.signature[path] = [doc_id, doc_length]
+            self.counts.append(counts)
+
+    def term_counts(self, doc_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        return {doc_id: self.counts[doc_id] for doc_id in doc_ids}
+
+    def idf(self, term: str) -> float:
+        return bm25_idf(len(self.docs), self.doc_freq.get(term, 1))
+
+    def sample_queries(self, count: int, seed: int) -> List[str]:
+        """从随机文档中抽取3个词作为查询"""
+        rng = random.Random(seed)
+        queries = []
+        for _ in range(count):
+            counts = self.counts[rng.randrange(len(self.counts))]
+            queries.append(" ".join(rng.sample(sorted(counts), min(3, len(counts)))))
+        return queries
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(vectors: VectorIndex, corpus: SyntheticCorpus, queries: List[str], k: int):
+    """返回 (延迟列表ms, 每个查询的前k结果)"""
+    latencies = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        ranked, _ = vectors.search(query, corpus.idf, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append([doc_id for doc_id, _ in ranked])
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Documentation Semantic Search Benchmark")
+    parser.add_argument("--sizes", default="1000,10000,50000,100000", help="Comma separated corpus sizes")
+    parser.add_argument("--dim", type=int, default=512, help="Vector dimension")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Synthetic vocabulary size")
+    parser.add_argument("--doc-length", type=int, default=80, help="Tokens per document")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries")
+    parser.add_argument("--nprobe", type=int, default=32, help="IVF lists probed per query")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+
+    args = parser.parse_args()
+
+    if not numpy_available():
+        print("需要安装NumPy: pip install numpy")
+        sys.exit(1)
+
+    print(f"{'docs':>8} {'encode(ms)':>11} {'brute p50':>10} {'brute p99':>10} "
+          f"{'ivf train':>10} {'ivf p50':>9} {'ivf p99':>9} {'recall@10':>10}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        corpus = SyntheticCorpus(size, args.vocabulary, args.doc_length, args.seed)
+        queries = corpus.sample_queries(args.queries, args.seed)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            vectors = VectorIndex(Path(tmp), HashingVectorizer(dim=args.dim), nprobe=args.nprobe,
+                                  ivf_min_rows=math.inf, min_score=0.0)
+            started = time.perf_counter()
+            vectors.sync(corpus)
+            encode_ms = (time.perf_counter() - started) * 1000
+
+            brute, exact = measure(vectors, corpus, queries, 10)
+
+            vectors.ivf_min_rows = 0
+            started = time.perf_counter()
+            vectors.search(queries[0], corpus.idf, 10)
+            train_ms = (time.perf_counter() - started) * 1000
+            ivf, approximate = measure(vectors, corpus, queries, 10)
+
+            recall = sum(len(set(a) & set(b)) for a, b in zip(exact, approximate)) / max(
+                1, sum(len(a) for a in exact))
+            print(f"{size:>8} {encode_ms:>11.0f} {percentile(brute, 0.5):>10.3f} {percentile(brute, 0.99):>10.3f} "
+                  f"{train_ms:>10.0f} {percentile(ivf, 0.5):>9.3f} {percentile(ivf, 0.99):>9.3f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
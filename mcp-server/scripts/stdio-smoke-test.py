@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+STDIO往返冒烟测试
+以子进程启动 mcp_protocol_server.py，经 STDIO 完成初始化后，不先调用 tools/list 直接调用工具
+（SDK会以 None 请求刷新工具缓存），再检查分页的 tools/list 与 resources/list；任何一步失败返回非零退出码
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+import argparse
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+SERVER = Path(__file__).resolve().parent.parent / "mcp_protocol_server.py"
+
+
+async def round_trip(mcp_root: str, query: str) -> None:
+    parameters = StdioServerParameters(command=sys.executable,
+                                       args=[str(SERVER), "--mcp-root", mcp_root])
+    async with stdio_client(parameters) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+
+            # 未调用 tools/list 时直接调用工具
+            result = await session.call_tool("search_documentation", {"query": query, "limit": 3})
+            text = result.content[0].text
+            if result.isError or text.startswith("错误"):
+                raise RuntimeError(f"search_documentation failed: {text}")
+            print(f"tools/call search_documentation: {json.loads(text)['total_results']} results")
+
+            tools = await session.list_tools()
+            print(f"tools/list: {len(tools.tools)} tools, nextCursor={tools.nextCursor}")
+            resources = await session.list_resources()
+            print(f"resources/list: {len(resources.resources)} resources, nextCursor={resources.nextCursor}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Documentation STDIO Smoke Test")
+    parser.add_argument("--mcp-root", default=".", help="MCP root directory")
+    parser.add_argument("--query", default="service", help="Query used for the tool call")
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(round_trip(args.mcp_root, args.query))
+    except Exception as e:
+        print(f"❌ STDIO round trip failed: {e}")
+        return 1
+    print("✅ STDIO round trip passed")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档倒排索引
+启动时构建一次并持久化到 mcp-config.json 同目录，查询时只做内存字典查找
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from chunking import chunk_markdown, chunk_uri, context_budget
+from progress import ProgressReporter
+from ranking import RankingEngine, bm25_idf, create_ranker, rank_key
+from snippets import SnippetBuilder, format_preview
+from term_dictionary import QueryExpander, TermDictionary
+from tokenizer import iter_tokens, tokenize
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "search-index.json"
+INDEX_FORMAT_VERSION = 5
+
+# 预览保留的最大字符数
+PREVIEW_CHARS = 300
+
+# keyword: BM25关键词检索；semantic: 向量检索；hybrid: 两者分数归一化后加权
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+# 混合检索时两路各取的最少候选数
+HYBRID_POOL = 50
+
+_HEADING_PATTERN = re.compile(r"^#{1,6}\s+(.+)$", re.MULTILINE)
+
+
+class DocumentText:
+    """生成摘要所需的文档正文与片段表，与倒排表同时记录，查询时不再读取文件、分词或分块"""
+
+    __slots__ = ("text", "spans", "chunks", "chunk_starts")
+
+    def __init__(self, text: str, spans: Sequence[int], chunks: List[list]):
+        self.text = text
+        # 各词项位置的字符区间 [start0, end0, start1, end1, ...]
+        self.spans = spans
+        # 按起点排序的片段：[start, end, chunk_id, title, trail, tokens]
+        self.chunks = chunks
+        self.chunk_starts = [chunk[0] for chunk in chunks]
+
+    def chunk_at(self, offset: int) -> list:
+        """包含字符偏移的片段，偏移不在任何片段内时取第一个"""
+        index = bisect_right(self.chunk_starts, offset) - 1
+        if index >= 0 and offset < self.chunks[index][1]:
+            return self.chunks[index]
+        return self.chunks[0]
+
+
+class SearchIndex:
+    """Markdown文档倒排索引（词项 → 文件、位置、词频）"""
+
+    def __init__(self, mcp_root: Path, language_dirs: Dict[str, Path], index_path: Optional[Path] = None,
+                 ranker: Optional[RankingEngine] = None, snippet_builder: Optional[SnippetBuilder] = None,
+                 context_windows: Optional[Dict[str, int]] = None, expander: Optional[QueryExpander] = None):
+        self.mcp_root = Path(mcp_root)
+        # 语言名称 → 语言目录
+        self.language_dirs = language_dirs
+        self.index_path = index_path or self.mcp_root / INDEX_FILENAME
+        self.ranker = ranker or create_ranker()
+        self.snippet_builder = snippet_builder or SnippetBuilder()
+        # 分块预算（ai_integration.context_windows）
+        self.context_windows = context_windows or {}
+        # 可选的向量索引（search.semantic，需要NumPy）
+        self.vectors = None
+        # 未知查询词的前缀/拼写纠错扩展（search.fuzzy）
+        self.expander = expander or QueryExpander()
+
+        # 文档表：下标即文档ID
+        self.docs: List[Dict[str, Any]] = []
+        # 文档正文与位置区间：下标即文档ID，已删除的文档为None
+        self.texts: List[Optional[DocumentText]] = []
+        # 正文倒排表：term → {doc_id: [positions]}
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        # 加权字段倒排表：field → term → {doc_id: tf}
+        self.field_postings: Dict[str, Dict[str, Dict[int, int]]] = {}
+        # 构建时的文件签名：相对路径 → [mtime_ns, size]
+        self.signature: Dict[str, List[int]] = {}
+
+        # 排序用的预计算统计量
+        self.idf: Dict[str, float] = {}
+        self.doc_freq: Dict[str, int] = {}
+        self.doc_lengths: List[int] = []
+        self.avg_length = 0.0
+        self.live_docs = 0
+        # 统计量版本号，排序引擎据此使缓存的分数上界失效
+        self.generation = 0
+
+        # 增量更新用的反向表（首次增量更新时才构建）
+        self._doc_by_path: Optional[Dict[str, int]] = None
+        self._doc_terms: Optional[Dict[int, set]] = None
+        # 查询扩展用的词项词典（首次需要扩展时才构建）
+        self._dictionary: Optional[TermDictionary] = None
+        # 内存中的索引是否比磁盘新
+        self.dirty = False
+        self._lock = threading.RLock()
+
+    def load_or_build(self) -> "SearchIndex":
+        """优先加载磁盘索引，文件发生变化时重新构建"""
+        current = self._scan_signature()
+        if self._load(current):
+            logger.info(f"Loaded search index from {self.index_path} ({len(self.docs)} documents)")
+            return self
+
+        started = time.perf_counter()
+        self.build(current)
+        logger.info(
+            f"Built search index: {len(self.docs)} documents, {len(self.postings)} terms "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        self.save()
+        return self
+
+    def build(self, signature: Optional[Dict[str, List[int]]] = None) -> None:
+        """全量构建索引"""
+        self.docs = []
+        self.texts = []
+        self.postings = {}
+        self.field_postings = {}
+        self._doc_by_path = None
+        self._doc_terms = None
+        self.signature = signature if signature is not None else self._scan_signature()
+
+        json_cache: Dict[Path, Optional[Dict]] = {}
+        for language, project_dir, file_path in self._iter_markdown_files():
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except Exception as e:
+                logger.warning(f"Failed to index {file_path}: {e}")
+                continue
+            fields = self._extract_fields(project_dir, file_path, content, json_cache)
+            self._add_document(language, project_dir, file_path, content, fields)
+
+        self._compute_statistics()
+
+    def save(self) -> None:
+        """持久化索引"""
+        payload = {
+            "version": INDEX_FORMAT_VERSION,
+            "languages": self._language_layout(),
+            "signature": self.signature,
+            "docs": self.docs,
+            "context_windows": self.context_windows,
+            "texts": [[text.text, list(text.spans), text.chunks] if text else None for text in self.texts],
+            "postings": {
+                term: [[doc_id, positions] for doc_id, positions in entries.items()]
+                for term, entries in self.postings.items()
+            },
+            "field_postings": {
+                field: {
+                    term: [[doc_id, tf] for doc_id, tf in entries.items()]
+                    for term, entries in terms.items()
+                }
+                for field, terms in self.field_postings.items()
+            },
+        }
+        try:
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            tmp_path.replace(self.index_path)
+            self.dirty = False
+        except Exception as e:
+            logger.warning(f"Failed to save search index {self.index_path}: {e}")
+
+    def rank(self, query: str, language: str = None, project: str = None,
+             limit: Optional[int] = None, mode: str = "keyword",
+             expanded: Optional[Tuple[List[str], Dict[str, float]]] = None) -> List[Tuple[int, float]]:
+        """返回按分数降序排列的 (doc_id, score)，指定limit时只选出前limit个
+
+        expanded 为调用方已算好的 expand_query 结果，避免重复扩展查询词。
+        """
+        return self._top(query, language, project, limit, mode, expanded)[0]
+
+    def search(self, query: str, language: str = None, project: str = None,
+               limit: Optional[int] = 20, offset: int = 0, mode: str = "keyword",
+               reporter: Optional[ProgressReporter] = None, exact_total: bool = False) -> Dict:
+        """查询索引，返回与原 search_documentation 相同结构的结果（支持 offset/limit 翻页）
+
+        reporter 在打分时按词项检查取消，生成摘要时逐条汇报进度。
+        多取一条结果判断是否还有下一页；total_results 默认为排序引擎的估计值，
+        exact_total 时才精确计数（需要遍历全部命中文档）。
+        """
+        reporter = reporter or ProgressReporter()
+        terms, weights = self.expand_query(query)
+        ranked, total = self._top(query, language, project, None if limit is None else offset + limit + 1, mode,
+                                  (terms, weights), reporter.check, exact_total)
+        has_more = limit is not None and len(ranked) > offset + limit
+        if has_more:
+            ranked = ranked[:offset + limit]
+
+        results = []
+        page = ranked[offset:]
+        for step, (doc_id, score) in enumerate(page):
+            reporter.update(step, len(page), "building snippets")
+            doc = self.docs[doc_id]
+            snippets, preview, chunk = self.snippets(doc_id, terms)
+            results.append({
+                "language": doc["language"],
+                "project": doc["project"],
+                "file": doc["file"],
+                "score": round(score, 4),
+                "preview": preview,
+                "snippets": snippets,
+                "chunk": chunk,
+            })
+
+        reporter.update(len(page), len(page))
+        next_offset = offset + len(results)
+        if not has_more:
+            # 已取到最后一条，结果数即精确总数
+            total, exact_total = len(ranked), True
+        elif not exact_total:
+            # 估计值不得少于已知的结果数
+            total = max(total, next_offset + 1)
+        return {
+            "query": query,
+            "mode": mode,
+            "expansions": {term: round(weight, 3) for term, weight in weights.items()},
+            "total_results": total,
+            "total_exact": exact_total,
+            "offset": offset,
+            "next_offset": next_offset if has_more else None,
+            "results": results
+        }
+
+    def _top(self, query: str, language: Optional[str], project: Optional[str],
+             k: Optional[int], mode: str = "keyword",
+             expanded: Optional[Tuple[List[str], Dict[str, float]]] = None,
+             check: Optional[Callable[[], None]] = None,
+             exact_total: bool = False) -> Tuple[List[Tuple[int, float]], int]:
+        """打分并选出前k个，返回 (结果, 命中总数)
+
+        前k选择与剪枝由排序引擎完成；同分按doc_id升序，保证翻页结果稳定。
+        expanded 为调用方已算好的 expand_query 结果；check 为排序引擎逐词项调用的取消检查；
+        exact_total 为False时关键词检索的命中总数是排序引擎的估计值。
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"未知搜索模式: {mode}")
+        if mode != "keyword" and self.vectors is None:
+            raise ValueError("语义检索未启用：需要安装numpy并设置 search.semantic.enabled")
+
+        accept = None
+        if language or project:
+            def accept(doc_id: int) -> bool:
+                return self._doc_matches(doc_id, language, project)
+
+        if mode == "semantic":
+            return self.vectors.search(query, self._query_idf, k, accept)
+
+        terms, weights = expanded or self.expand_query(query)
+        pool = k if mode == "keyword" or k is None else max(k * 2, HYBRID_POOL)
+        with self._lock:
+            keyword, keyword_total = self.ranker.top_k(self, terms, pool, accept, weights, check, exact_total)
+        if mode == "keyword":
+            return keyword, keyword_total
+
+        semantic, semantic_total = self.vectors.search(query, self._query_idf, pool, accept)
+        return self._blend(keyword, semantic, k), max(keyword_total, semantic_total)
+
+    def _blend(self, keyword: List[Tuple[int, float]], semantic: List[Tuple[int, float]],
+               k: Optional[int]) -> List[Tuple[int, float]]:
+        """混合检索：两路分数各自除以最高分后按 hybrid_weight 加权求和"""
+        weight = self.vectors.hybrid_weight
+        combined: Dict[int, float] = {}
+        for results, scale in ((keyword, 1.0 - weight), (semantic, weight)):
+            if not results:
+                continue
+            top = results[0][1] or 1.0
+            for doc_id, score in results:
+                combined[doc_id] = combined.get(doc_id, 0.0) + scale * score / top
+        ranked = sorted(combined.items(), key=rank_key)
+        return ranked if k is None else ranked[:k]
+
+    def expand_query(self, query: str) -> Tuple[List[str], Dict[str, float]]:
+        """分词并扩展索引中不存在的查询词，返回 (检索词项, 扩展词项 → 权重)"""
+        terms = tokenize(query)
+        if not self.expander.enabled:
+            return terms, {}
+        with self._lock:
+            if all(term in self.idf for term in terms):
+                return terms, {}
+            weights = self.expander.expand(self.term_dictionary(), terms)
+        return terms + list(weights), weights
+
+    def term_dictionary(self) -> TermDictionary:
+        """词项词典：首次使用时按当前词表构建，之后随增量更新维护"""
+        with self._lock:
+            if self._dictionary is None:
+                started = time.perf_counter()
+                self._dictionary = TermDictionary(self._vocabulary())
+                logger.info(f"Built term dictionary with {len(self._dictionary)} terms "
+                            f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+            return self._dictionary
+
+    def _vocabulary(self) -> Iterable[str]:
+        return self.idf.keys()
+
+    def _query_idf(self, term: str) -> float:
+        """查询向量的词项权重；语料中没有的词按只出现一次计"""
+        idf = self.idf.get(term)
+        return idf if idf is not None else bm25_idf(self.live_docs, 1)
+
+    def term_counts(self, doc_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        """正文词频：doc_id → {term: tf}，供向量索引编码
+
+        已有增量更新用的反向表且文档较少时逐个查倒排表，否则整体扫描一遍倒排表。
+        """
+        wanted = set(doc_ids)
+        counts: Dict[int, Dict[str, int]] = {doc_id: {} for doc_id in wanted}
+        if not wanted:
+            return counts
+        with self._lock:
+            if self._doc_terms is not None and len(wanted) * 8 < len(self.docs):
+                for doc_id in wanted:
+                    for term in self._doc_terms.get(doc_id, ()):
+                        positions = self.postings.get(term, {}).get(doc_id)
+                        if positions:
+                            counts[doc_id][term] = len(positions)
+                return counts
+            for term, entries in self.postings.items():
+                for doc_id, positions in entries.items():
+                    if doc_id in wanted:
+                        counts[doc_id][term] = len(positions)
+        return counts
+
+    def snippets(self, doc_id: int, terms: List[str]) -> Tuple[List[Dict], str, Optional[Dict]]:
+        """生成命中位置附近的摘要，返回 (摘要列表, 预览文本, 最佳摘要所在的文档片段)
+
+        摘要直接从索引时保存的正文与位置区间截取；
+        只匹配到项目名、标题等字段时没有摘要，预览退回文件开头、片段取第一个。
+        """
+        with self._lock:
+            doc = self.docs[doc_id]
+            text = self.texts[doc_id]
+            hits = {}
+            weights = {}
+            for term in set(terms):
+                positions = self.postings.get(term, {}).get(doc_id)
+                if positions:
+                    hits[term] = list(positions)
+                    weights[term] = self.idf.get(term, 1.0)
+
+        snippets = self.snippet_builder.build(text.text, hits, weights, text.spans) if hits else []
+        if snippets:
+            preview = format_preview(doc["chars"], snippets)
+            # 以高亮最多的摘要中第一个命中词定位片段（摘要两侧的上下文可能跨章节）
+            best = max(snippets, key=lambda snippet: len(snippet["highlights"]))
+            offset = best["offset"] + (best["highlights"][0][0] if best["highlights"] else 0)
+        else:
+            preview = doc["head"][:200] + "..."
+            offset = 0
+
+        _, _, chunk_id, title, trail, tokens = text.chunk_at(offset)
+        uri = chunk_uri(doc["language"], doc["project"], doc["relative_path"], chunk_id)
+        return snippets, preview, {"uri": uri, "id": chunk_id, "title": title, "trail": trail, "tokens": tokens}
+
+    def _doc_matches(self, doc_id: int, language: Optional[str], project: Optional[str]) -> bool:
+        """语言/项目过滤"""
+        doc = self.docs[doc_id]
+        if language and doc["language"] != language:
+            return False
+        if project and doc["project"] != project:
+            return False
+        return True
+
+    def _add_document(self, language: str, project_dir: Path, file_path: Path, content: str,
+                      fields: Dict[str, str]) -> None:
+        """把单个文档写入倒排表"""
+        doc_id = len(self.docs)
+        length = 0
+        spans = array("I")
+        for term, position, start, end in iter_tokens(content):
+            self.postings.setdefault(term, {}).setdefault(doc_id, []).append(position)
+            if position * 2 == len(spans):
+                spans.append(start)
+                spans.append(end)
+            length += 1
+        self.docs.append({
+            "language": language,
+            "project": project_dir.name,
+            "file": file_path.name,
+            "path": file_path.relative_to(self.mcp_root).as_posix(),
+            "relative_path": file_path.relative_to(project_dir).as_posix(),
+            "length": length,
+            "chars": len(content),
+            "head": content[:PREVIEW_CHARS],
+        })
+        relative_path = self.docs[doc_id]["relative_path"]
+        chunks = [[chunk.start, chunk.end, chunk.chunk_id, chunk.title, chunk.trail, chunk.tokens]
+                  for chunk in chunk_markdown(content, context_budget(relative_path, self.context_windows))]
+        self.texts.append(DocumentText(content, spans, chunks))
+
+        for field, text in fields.items():
+            field_terms = self.field_postings.setdefault(field, {})
+            for term in tokenize(text):
+                entries = field_terms.setdefault(term, {})
+                entries[doc_id] = entries.get(doc_id, 0) + 1
+
+        if self._doc_terms is not None:
+            terms = {term for term, _, _, _ in iter_tokens(content)}
+            for text in fields.values():
+                terms.update(tokenize(text))
+            self._doc_terms[doc_id] = terms
+            self._doc_by_path[self.docs[doc_id]["path"]] = doc_id
+            self.doc_lengths.append(length)
+
+    def _remove_document(self, doc_id: int) -> set:
+        """从倒排表中移除文档，文档ID保留为空位"""
+        terms = self._doc_terms.pop(doc_id, set())
+        for term in terms:
+            entries = self.postings.get(term)
+            if entries is not None:
+                entries.pop(doc_id, None)
+                if not entries:
+                    del self.postings[term]
+            for field_terms in self.field_postings.values():
+                field_entries = field_terms.get(term)
+                if field_entries is not None:
+                    field_entries.pop(doc_id, None)
+                    if not field_entries:
+                        del field_terms[term]
+        self._doc_by_path.pop(self.docs[doc_id]["path"], None)
+        self.docs[doc_id] = None
+        self.texts[doc_id] = None
+        self.doc_lengths[doc_id] = 0
+        return terms
+
+    def _extract_fields(self, project_dir: Path, file_path: Path, content: str,
+                        json_cache: Dict[Path, Optional[Dict]]) -> Dict[str, str]:
+        """提取加权字段：标题、项目信息、模块描述"""
+        fields = {"heading": " ".join(_HEADING_PATTERN.findall(content))}
+
+        # 项目README携带project-info.json中的名称和描述
+        if file_path.parent == project_dir and file_path.name == "README.md":
+            project_info = self._load_json_cached(project_dir / "project-info.json", json_cache) or {}
+            project_meta = project_info.get("project_metadata", {})
+            fields["project"] = " ".join([
+                str(project_meta.get("name", "")),
+                str(project_meta.get("description", "")),
+            ])
+
+        # 模块目录下的文档携带metadata.json中的模块描述
+        metadata = self._load_json_cached(file_path.parent / "metadata.json", json_cache)
+        if metadata:
+            module_meta = metadata.get("module_metadata", {})
+            fields["module"] = " ".join([
+                str(module_meta.get("name", "")),
+                str(module_meta.get("description", "")),
+            ])
+
+        return {field: text for field, text in fields.items() if text.strip()}
+
+    def _load_json_cached(self, file_path: Path, json_cache: Dict[Path, Optional[Dict]]) -> Optional[Dict]:
+        """构建期间缓存JSON解析结果"""
+        if file_path not in json_cache:
+            json_cache[file_path] = None
+            if file_path.exists():
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        json_cache[file_path] = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Failed to load {file_path}: {e}")
+        return json_cache[file_path]
+
+    def _compute_statistics(self) -> None:
+        """预计算平均文档长度与IDF表"""
+        self.doc_lengths = [doc["length"] if doc else 0 for doc in self.docs]
+        self.live_docs = sum(1 for doc in self.docs if doc)
+        self.avg_length = sum(self.doc_lengths) / self.live_docs if self.live_docs else 0.0
+
+        doc_sets: Dict[str, set] = {term: set(entries) for term, entries in self.postings.items()}
+        for terms in self.field_postings.values():
+            for term, entries in terms.items():
+                doc_sets.setdefault(term, set()).update(entries)
+        self.doc_freq = {term: len(doc_ids) for term, doc_ids in doc_sets.items()}
+        self.idf = {term: bm25_idf(self.live_docs, df) for term, df in self.doc_freq.items()}
+        self._dictionary = None
+        self.generation += 1
+
+    # ---------- 增量更新 ----------
+
+    def apply_changes(self, events) -> None:
+        """文件监听器回调：只重新索引事件涉及的文件"""
+        with self._lock:
+            if any(event.kind == "rescan" for event in events):
+                self.build()
+                self.dirty = True
+                return
+
+            self._ensure_incremental_state()
+            targets: Dict[Path, Tuple[str, Path]] = {}
+            removed_prefixes: List[str] = []
+
+            for event in events:
+                path = Path(event.path)
+                located = self._locate(path)
+                if located is None:
+                    continue
+                language, project_dir = located
+
+                if event.is_dir or path == project_dir:
+                    if event.kind == "deleted":
+                        removed_prefixes.append(path.relative_to(self.mcp_root).as_posix() + "/")
+                    elif path.exists():
+                        for file_path in path.rglob("*.md"):
+                            targets[file_path] = (language, project_dir)
+                elif path.suffix == ".md":
+                    targets[path] = (language, project_dir)
+                elif path.name == "project-info.json":
+                    targets[project_dir / "README.md"] = (language, project_dir)
+                elif path.name == "metadata.json":
+                    # 模块描述作用于同目录下的全部文档
+                    for file_path in path.parent.glob("*.md"):
+                        targets[file_path] = (language, project_dir)
+                else:
+                    continue
+                self._update_signature(path)
+
+            touched_terms: set = set()
+            live_before = self.live_docs
+            for prefix in removed_prefixes:
+                for doc_path in [p for p in self._doc_by_path if p.startswith(prefix)]:
+                    touched_terms |= self._remove_document(self._doc_by_path[doc_path])
+                    self.live_docs -= 1
+                for sig_path in [p for p in self.signature if p.startswith(prefix)]:
+                    del self.signature[sig_path]
+
+            json_cache: Dict[Path, Optional[Dict]] = {}
+            for file_path, (language, project_dir) in sorted(targets.items()):
+                touched_terms |= self._reindex_file(language, project_dir, file_path, json_cache)
+
+            if touched_terms or removed_prefixes:
+                self._refresh_statistics(touched_terms, self.live_docs != live_before)
+                self.dirty = True
+
+    def _ensure_incremental_state(self) -> None:
+        """从倒排表反推 文档 → 词项 与 路径 → 文档 映射"""
+        if self._doc_terms is not None:
+            return
+        self._doc_terms = {doc_id: set() for doc_id, doc in enumerate(self.docs) if doc}
+        for term, entries in self.postings.items():
+            for doc_id in entries:
+                self._doc_terms[doc_id].add(term)
+        for terms in self.field_postings.values():
+            for term, entries in terms.items():
+                for doc_id in entries:
+                    self._doc_terms[doc_id].add(term)
+        self._doc_by_path = {doc["path"]: doc_id for doc_id, doc in enumerate(self.docs) if doc}
+
+    def _locate(self, path: Path) -> Optional[Tuple[str, Path]]:
+        """定位路径所属的语言与项目目录"""
+        for language, lang_dir in self.language_dirs.items():
+            try:
+                parts = path.relative_to(lang_dir).parts
+            except ValueError:
+                continue
+            if parts:
+                return language, lang_dir / parts[0]
+        return None
+
+    def _reindex_file(self, language: str, project_dir: Path, file_path: Path,
+                      json_cache: Dict[Path, Optional[Dict]]) -> set:
+        """重新索引单个文件，返回受影响的词项"""
+        touched: set = set()
+        doc_path = file_path.relative_to(self.mcp_root).as_posix()
+        old_doc_id = self._doc_by_path.get(doc_path)
+        if old_doc_id is not None:
+            touched |= self._remove_document(old_doc_id)
+            self.live_docs -= 1
+
+        if not file_path.is_file():
+            self.signature.pop(doc_path, None)
+            return touched
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            logger.warning(f"Failed to index {file_path}: {e}")
+            return touched
+
+        fields = self._extract_fields(project_dir, file_path, content, json_cache)
+        self._add_document(language, project_dir, file_path, content, fields)
+        self.live_docs += 1
+        self._update_signature(file_path)
+        return touched | self._doc_terms[len(self.docs) - 1]
+
+    def _update_signature(self, path: Path) -> None:
+        rel = path.relative_to(self.mcp_root).as_posix()
+        try:
+            stat = path.stat()
+        except OSError:
+            self.signature.pop(rel, None)
+            return
+        if path.is_file():
+            self.signature[rel] = [stat.st_mtime_ns, stat.st_size]
+
+    def _refresh_statistics(self, touched_terms: set, doc_count_changed: bool) -> None:
+        """增量刷新统计量：词频表只更新受影响词项，文档数变化时重算IDF"""
+        self.generation += 1
+        self.avg_length = sum(self.doc_lengths) / self.live_docs if self.live_docs else 0.0
+        for term in touched_terms:
+            doc_ids = set(self.postings.get(term, ()))
+            for terms in self.field_postings.values():
+                doc_ids.update(terms.get(term, ()))
+            if doc_ids:
+                if self._dictionary is not None and term not in self.doc_freq:
+                    self._dictionary.add(term)
+                self.doc_freq[term] = len(doc_ids)
+            else:
+                self.doc_freq.pop(term, None)
+                self.idf.pop(term, None)
+                if self._dictionary is not None:
+                    self._dictionary.discard(term)
+
+        terms_to_update = self.doc_freq if doc_count_changed else touched_terms & self.doc_freq.keys()
+        for term in terms_to_update:
+            self.idf[term] = bm25_idf(self.live_docs, self.doc_freq[term])
+
+    def _iter_markdown_files(self) -> Iterable[Tuple[str, Path, Path]]:
+        """遍历所有语言/项目下的Markdown文件"""
+        for language, lang_dir in self.language_dirs.items():
+            if not lang_dir.exists():
+                continue
+            for project_dir in sorted(lang_dir.iterdir()):
+                if not project_dir.is_dir():
+                    continue
+                for file_path in sorted(project_dir.rglob("*.md")):
+                    yield language, project_dir, file_path
+
+    def _language_layout(self) -> Dict[str, str]:
+        """语言名称 → 相对目录，用于区分不同服务器的索引布局"""
+        return {
+            language: lang_dir.relative_to(self.mcp_root).as_posix()
+            for language, lang_dir in self.language_dirs.items()
+        }
+
+    def _scan_signature(self) -> Dict[str, List[int]]:
+        """只做stat，不读取文件内容"""
+        signature = {}
+        for language, lang_dir in self.language_dirs.items():
+            if not lang_dir.exists():
+                continue
+            for project_dir in sorted(lang_dir.iterdir()):
+                if not project_dir.is_dir():
+                    continue
+                for file_path in sorted(project_dir.rglob("*")):
+                    if file_path.suffix != ".md" and file_path.name not in ("project-info.json", "metadata.json"):
+                        continue
+                    try:
+                        stat = file_path.stat()
+                    except OSError:
+                        continue
+                    signature[file_path.relative_to(self.mcp_root).as_posix()] = [stat.st_mtime_ns, stat.st_size]
+        return signature
+
+    def _load(self, current_signature: Dict[str, List[int]]) -> bool:
+        """加载磁盘索引，签名不一致时视为失效"""
+        if not self.index_path.exists():
+            return False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load search index {self.index_path}: {e}")
+            return False
+
+        if (payload.get("version") != INDEX_FORMAT_VERSION
+                or payload.get("languages") != self._language_layout()
+                or payload.get("context_windows") != self.context_windows
+                or payload.get("signature") != current_signature):
+            logger.info("Search index is stale, rebuilding")
+            return False
+
+        self.signature = payload["signature"]
+        self.docs = payload["docs"]
+        self.texts = [DocumentText(entry[0], array("I", entry[1]), entry[2]) if entry else None
+                      for entry in payload["texts"]]
+        self.postings = {
+            term: {doc_id: positions for doc_id, positions in entries}
+            for term, entries in payload["postings"].items()
+        }
+        self.field_postings = {
+            field: {
+                term: {doc_id: tf for doc_id, tf in entries}
+                for term, entries in terms.items()
+            }
+            for field, terms in payload.get("field_postings", {}).items()
+        }
+        self._compute_statistics()
+        return True
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP会话管理
+按 Mcp-Session-Id 隔离各客户端的协议版本与能力声明，空闲会话自动淘汰，会话总数有上限；
+多进程模式下协商结果写入共享的会话目录，各工作进程据此恢复其他进程创建的会话，
+落在其他进程上的取消通知也经该目录转交给执行请求的进程
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_HEADER = "Mcp-Session-Id"
+
+# 会话ID同时用作共享目录中的文件名，只接受安全字符
+_SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+SUPPORTED_PROTOCOL_VERSIONS = ("2024-11-05", "2025-03-26", "2025-06-18")
+DEFAULT_PROTOCOL_VERSION = "2024-11-05"
+
+
+def negotiate_protocol_version(requested: Optional[str]) -> str:
+    """客户端请求的版本受支持时沿用，否则返回服务器支持的最新版本"""
+    if requested in SUPPORTED_PROTOCOL_VERSIONS:
+        return requested
+    if requested is None:
+        return DEFAULT_PROTOCOL_VERSION
+    return SUPPORTED_PROTOCOL_VERSIONS[-1]
+
+
+class HttpSession:
+    """单个客户端会话"""
+
+    __slots__ = ("session_id", "key", "initialized", "protocol_version", "client_info",
+                 "client_capabilities", "server_capabilities", "created_at", "last_seen", "in_flight")
+
+    def __init__(self, session_id: Optional[str], key: str):
+        self.session_id = session_id
+        # 在订阅表与通知中心中的标识
+        self.key = key
+        self.initialized = False
+        self.protocol_version: Optional[str] = None
+        self.client_info: Dict[str, Any] = {}
+        self.client_capabilities: Dict[str, Any] = {}
+        self.server_capabilities: Dict[str, Any] = {}
+        self.created_at = time.monotonic()
+        self.last_seen = self.created_at
+        # 执行中的请求：request id → 进度汇报器（用于取消）
+        self.in_flight: Dict[Any, Any] = {}
+
+
+class SessionStore:
+    """跨工作进程共享的会话目录：每个会话一个JSON文件，文件修改时间即最近访问时间
+
+    只保存 initialize 协商的结果；订阅、SSE流与执行中的请求仍属于各工作进程，
+    其他进程收到的取消通知以 {session_id}.{请求ID摘要}.cancel 标记文件转交。
+    """
+
+    _FIELDS = ("protocol_version", "client_info", "client_capabilities", "server_capabilities")
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id: str) -> Optional[Path]:
+        if not _SESSION_ID_PATTERN.match(session_id):
+            return None
+        return self.directory / f"{session_id}.json"
+
+    def save(self, session: HttpSession) -> None:
+        path = self._path(session.session_id)
+        if path is None:
+            return
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({field: getattr(session, field) for field in self._FIELDS}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, session_id: str, idle_timeout: float) -> Optional[HttpSession]:
+        """读取会话；不存在或空闲超时（同时删除文件）时返回None"""
+        if not self.touch(session_id, idle_timeout):
+            return None
+        try:
+            with open(self._path(session_id), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        session = HttpSession(session_id, f"http:{session_id}")
+        session.initialized = True
+        for field in self._FIELDS:
+            if field in state:
+                setattr(session, field, state[field])
+        return session
+
+    def touch(self, session_id: str, idle_timeout: float) -> bool:
+        """刷新访问时间，返回会话是否仍然有效（其他进程可能已删除或使其过期）"""
+        path = self._path(session_id)
+        if path is None:
+            return False
+        try:
+            if path.stat().st_mtime < time.time() - idle_timeout:
+                path.unlink()
+                return False
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def remove(self, session_id: str, idle_timeout: Optional[float] = None) -> None:
+        """删除会话文件；给出 idle_timeout 时只删除在所有进程中都已空闲超时的会话"""
+        path = self._path(session_id)
+        if path is None:
+            return
+        try:
+            if idle_timeout is None or path.stat().st_mtime < time.time() - idle_timeout:
+                path.unlink()
+        except OSError:
+            return
+        for marker in self.directory.glob(f"{session_id}.*.cancel"):
+            marker.unlink(missing_ok=True)
+
+    def _cancel_path(self, session_id: str, request_id: Any) -> Optional[Path]:
+        if not _SESSION_ID_PATTERN.match(session_id):
+            return None
+        digest = hashlib.sha1(json.dumps(request_id).encode("utf-8")).hexdigest()[:16]
+        return self.directory / f"{session_id}.{digest}.cancel"
+
+    def request_cancel(self, session_id: str, request_id: Any) -> None:
+        """留下取消标记，由执行该请求的进程轮询"""
+        path = self._cancel_path(session_id, request_id)
+        if path is not None:
+            path.touch()
+
+    def take_cancel(self, session_id: str, request_id: Any) -> bool:
+        """存在取消标记时删除并返回True（删除是原子的，标记只会被消费一次）"""
+        path = self._cancel_path(session_id, request_id)
+        if path is None:
+            return False
+        try:
+            path.unlink()
+            return True
+        except OSError:
+            return False
+
+    def prune(self, idle_timeout: float) -> int:
+        """删除所有进程中都已空闲超时的会话文件与过期的取消标记，返回删除的会话数量"""
+        deadline = time.time() - idle_timeout
+        for marker in self.directory.glob("*.cancel"):
+            try:
+                if marker.stat().st_mtime < deadline:
+                    marker.unlink()
+            except OSError:
+                continue
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                if path.stat().st_mtime < deadline:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+class SessionManager:
+    """会话表：按最近访问时间排序，淘汰时只检查最旧的会话
+
+    不带会话头的旧客户端共用 anonymous 会话，行为与引入会话前一致。
+    设置 store 时本进程的会话表只是共享会话目录的缓存。
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_timeout: float = 1800.0, anonymous_key: str = "http",
+                 store: Optional[SessionStore] = None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.store = store
+        self._pruned_at = time.monotonic()
+        self.anonymous = HttpSession(None, anonymous_key)
+        self._sessions: "OrderedDict[str, HttpSession]" = OrderedDict()
+        self._close_callbacks: List[Callable[[HttpSession], None]] = []
+
+    def on_close(self, callback: Callable[[HttpSession], None]) -> None:
+        """注册会话关闭（显式删除或淘汰）时的清理回调"""
+        self._close_callbacks.append(callback)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, session_id: Optional[str] = None) -> HttpSession:
+        """创建新会话；达到上限时淘汰最久未访问的会话"""
+        self.evict_idle()
+        if self.store is not None and time.monotonic() - self._pruned_at > min(self.idle_timeout, 60.0):
+            # 只在任何进程都未访问过的会话文件需要清理，随新会话的创建顺带进行
+            self._pruned_at = time.monotonic()
+            self.store.prune(self.idle_timeout)
+        while len(self._sessions) >= self.max_sessions:
+            _, oldest = self._sessions.popitem(last=False)
+            logger.info(f"Session limit reached, evicting {oldest.session_id}")
+            self._closed(oldest)
+
+        session_id = session_id or secrets.token_hex(16)
+        session = HttpSession(session_id, f"http:{session_id}")
+        self._sessions[session_id] = session
+        return session
+
+    def _insert(self, session: HttpSession) -> None:
+        """加入从共享目录恢复的会话，遵守会话总数上限"""
+        while len(self._sessions) >= self.max_sessions:
+            _, oldest = self._sessions.popitem(last=False)
+            self._closed(oldest)
+        self._sessions[session.session_id] = session
+
+    def get(self, session_id: str) -> Optional[HttpSession]:
+        """查找会话并刷新访问时间；不存在或已过期时返回None
+
+        有共享会话目录时以目录为准：其他进程删除的会话在本进程也失效，
+        本进程没有的会话从目录恢复（多进程模式下请求不保证落在同一进程）。
+        """
+        self.evict_idle()
+        session = self._sessions.get(session_id)
+        if self.store is not None:
+            if session is None:
+                session = self.store.load(session_id, self.idle_timeout)
+                if session is None:
+                    return None
+                self._insert(session)
+            elif not self.store.touch(session_id, self.idle_timeout):
+                del self._sessions[session_id]
+                self._closed(session)
+                return None
+        if session is None:
+            return None
+        session.last_seen = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def save(self, session: HttpSession) -> None:
+        """初始化完成后发布会话状态，供其他工作进程恢复"""
+        if self.store is not None and session.session_id is not None:
+            self.store.save(session)
+
+    def cancel(self, session: HttpSession, request_id: Any) -> bool:
+        """取消请求：本进程执行中的请求直接取消，否则有共享会话目录时留下取消标记
+
+        返回是否已取消或已转交；匿名会话在其他进程中的请求无法定位。
+        """
+        reporter = session.in_flight.get(request_id)
+        if reporter is not None:
+            reporter.cancel()
+            return True
+        if self.store is None or session.session_id is None:
+            return False
+        self.store.request_cancel(session.session_id, request_id)
+        return True
+
+    def take_cancel(self, session: HttpSession, request_id: Any) -> bool:
+        """本进程执行的请求是否被其他进程转交了取消"""
+        if self.store is None or session.session_id is None:
+            return False
+        return self.store.take_cancel(session.session_id, request_id)
+
+    def close(self, session_id: str) -> bool:
+        """显式关闭会话；有共享会话目录时其他进程创建的会话同样可以关闭"""
+        session = self._sessions.pop(session_id, None)
+        if self.store is not None:
+            shared = self.store.touch(session_id, self.idle_timeout)
+            self.store.remove(session_id)
+            if session is None:
+                return shared
+        if session is None:
+            return False
+        self._closed(session)
+        return True
+
+    def evict_idle(self) -> int:
+        """淘汰空闲超时的会话，返回淘汰数量"""
+        deadline = time.monotonic() - self.idle_timeout
+        evicted = 0
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_seen > deadline:
+                break
+            self._sessions.popitem(last=False)
+            self._closed(session)
+            if self.store is not None:
+                self.store.remove(session.session_id, self.idle_timeout)
+            evicted += 1
+        if evicted:
+            logger.info(f"Evicted {evicted} idle sessions")
+        return evicted
+
+    def _closed(self, session: HttpSession) -> None:
+        for callback in self._close_callbacks:
+            try:
+                callback(session)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Session close callback failed")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索结果摘要
+利用倒排表中的词项位置选出命中最密集的窗口，按索引时记录的各位置字符区间截取原文并标出高亮
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from tokenizer import iter_tokens
+
+DEFAULT_MAX_CHARS = 300
+DEFAULT_MAX_TOKENS = 60
+DEFAULT_MAX_WINDOWS = 2
+
+# 窗口内重复命中的加分（远小于一个不同词项的权重）
+_REPEAT_BONUS = 0.1
+
+# (分数, 起始位置, 结束位置)
+Window = Tuple[float, int, int]
+
+
+def token_spans(text: str) -> array:
+    """各词项位置的字符区间，交错存放为 [start0, end0, start1, end1, ...]
+
+    标识符拆分出的子词与完整标识符共享位置和区间，每个位置只记录一次。
+    """
+    spans = array("I")
+    for _, position, start, end in iter_tokens(text):
+        if position * 2 == len(spans):
+            spans.append(start)
+            spans.append(end)
+    return spans
+
+
+class SnippetBuilder:
+    """摘要生成器
+
+    预算同时按字符数和词元数限制：max_tokens 决定位置窗口的宽度，
+    max_chars 截断最终文本；多个窗口平分预算。
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 max_windows: int = DEFAULT_MAX_WINDOWS):
+        self.max_chars = max(1, max_chars)
+        self.max_tokens = max(1, max_tokens)
+        self.max_windows = max(1, max_windows)
+
+    def build(self, content: str, hits: Dict[str, Sequence[int]],
+              weights: Optional[Dict[str, float]] = None, spans: Optional[Sequence[int]] = None) -> List[Dict]:
+        """生成摘要列表：[{"text", "offset", "highlights": [[start, end], ...]}]
+
+        hits 为 词项 → 文档内位置，weights 为词项权重（通常是IDF），
+        spans 为索引时记录的 token_spans(content)；未提供时重新分词计算。
+        """
+        if not hits:
+            return []
+        windows = self.select_windows(hits, weights or {})
+        return self._render(content, token_spans(content) if spans is None else spans, windows, hits)
+
+    def select_windows(self, hits: Dict[str, Sequence[int]], weights: Dict[str, float]) -> List[Tuple[int, int]]:
+        """选出得分最高且互不重叠的位置窗口，按文档顺序返回 (起始位置, 结束位置)"""
+        width = max(1, self.max_tokens // self.max_windows)
+        events = sorted((position, term) for term, positions in hits.items() for position in positions)
+
+        candidates: List[Window] = []
+        counts: Dict[str, int] = {}
+        score = 0.0
+        right = 0
+        for left, (start, _) in enumerate(events):
+            while right < len(events) and events[right][0] < start + width:
+                term = events[right][1]
+                counts[term] = counts.get(term, 0) + 1
+                score += weights.get(term, 1.0) if counts[term] == 1 else _REPEAT_BONUS
+                right += 1
+            candidates.append((score, start, events[right - 1][0]))
+
+            term = events[left][1]
+            counts[term] -= 1
+            score -= weights.get(term, 1.0) if counts[term] == 0 else _REPEAT_BONUS
+
+        chosen: List[Tuple[int, int]] = []
+        for _, start, end in sorted(candidates, key=lambda window: (-window[0], window[1])):
+            if all(end < other_start or start > other_end for other_start, other_end in chosen):
+                chosen.append((start, end))
+                if len(chosen) >= self.max_windows:
+                    break
+
+        # 命中之外的剩余宽度平均分到两侧作为上下文
+        windows = []
+        for start, end in sorted(chosen):
+            padding = max(0, width - (end - start + 1)) // 2
+            windows.append((max(0, start - padding), end + padding))
+        return windows
+
+    def _render(self, content: str, spans: Sequence[int], windows: List[Tuple[int, int]],
+                hits: Dict[str, Sequence[int]]) -> List[Dict]:
+        """把位置窗口映射为字符区间并截取文本（只访问窗口内的位置，不重新分词）"""
+        count = len(spans) // 2
+        positions = sorted({position for term_positions in hits.values() for position in term_positions})
+        budget = max(1, self.max_chars // len(windows))
+        snippets = []
+        previous = -1
+        for first, last in windows:
+            # 相邻窗口重叠的部分只归入前一个窗口
+            first, last = max(first, previous + 1), min(last, count - 1)
+            if first > last:
+                continue
+            previous = last
+            # 各位置的结束偏移单调不减，窗口区间即首位置起点到末位置终点
+            start, end = spans[2 * first], spans[2 * last + 1]
+            highlights = [(spans[2 * position], spans[2 * position + 1])
+                          for position in positions[bisect_left(positions, first):bisect_right(positions, last)]]
+            if end - start > budget:
+                # 超出字符预算时以第一个高亮为中心截取
+                anchor = highlights[0][0] if highlights else start
+                start = max(start, min(anchor - budget // 4, end - budget))
+                end = start + budget
+            snippets.append({
+                "text": content[start:end],
+                "offset": start,
+                "highlights": [[s - start, e - start] for s, e in highlights if s >= start and e <= end],
+            })
+        return snippets
+
+
+def format_preview(content_length: int, snippets: List[Dict]) -> str:
+    """把摘要拼接为单行预览文本，省略处用...表示"""
+    parts = []
+    for snippet in snippets:
+        text = " ".join(snippet["text"].split())
+        prefix = "..." if snippet["offset"] > 0 else ""
+        suffix = "..." if snippet["offset"] + len(snippet["text"]) < content_length else ""
+        parts.append(f"{prefix}{text}{suffix}")
+    return " ".join(parts)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streamable HTTP 服务端推送
+每个会话一条SSE流，通知中心的消息写入有界队列；消费过慢的流被关闭，由客户端重连
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Hashable, Optional
+
+from notifications import NotificationHub
+
+logger = logging.getLogger(__name__)
+
+
+def encode_event(message: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    """把JSON-RPC消息编码为SSE事件"""
+    data = json.dumps(message, ensure_ascii=False)
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: message\ndata: {data}\n\n".encode("utf-8")
+
+
+class StreamLimitReached(RuntimeError):
+    """打开的SSE流数量已达上限"""
+
+
+class EventStream:
+    """单条SSE流"""
+
+    def __init__(self, key: Hashable, max_queue: int):
+        self.key = key
+        self._queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(max_queue)
+        self._event_id = 0
+        self.closed = False
+
+    async def push(self, message: Dict[str, Any]) -> None:
+        """通知中心的投递入口；队列满说明客户端跟不上，关闭流而不是无限缓冲"""
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning(f"SSE stream {self.key} is not keeping up, closing it")
+            self.close()
+            raise ConnectionError("slow consumer") from None
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # 丢弃未发送的消息，放入结束标记唤醒发送循环
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def events(self, heartbeat: float) -> AsyncIterator[bytes]:
+        """编码后的SSE事件；空闲时发送注释行保活"""
+        yield b": stream opened\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(self._queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if message is None:
+                return
+            self._event_id += 1
+            yield encode_event(message, self._event_id)
+
+
+class StreamManager:
+    """SSE流表：每个会话最多一条流，全局数量有上限"""
+
+    def __init__(self, hub: NotificationHub, max_streams: int = 100, max_queue: int = 256, heartbeat: float = 15.0):
+        self.hub = hub
+        self.max_streams = max_streams
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self._streams: Dict[Hashable, EventStream] = {}
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def open(self, key: Hashable) -> EventStream:
+        """为会话打开流；同一会话重连时替换旧流。必须在事件循环中调用"""
+        previous = self._streams.get(key)
+        if previous is None and len(self._streams) >= self.max_streams:
+            raise StreamLimitReached(f"Too many open streams ({len(self._streams)})")
+        if previous is not None:
+            previous.close()
+
+        stream = EventStream(key, self.max_queue)
+        self._streams[key] = stream
+        self.hub.register(key, stream.push)
+        return stream
+
+    def release(self, stream: EventStream) -> None:
+        """流结束（客户端断开或被关闭）后清理"""
+        stream.close()
+        if self._streams.get(stream.key) is stream:
+            del self._streams[stream.key]
+            self.hub.unregister(stream.key, stream.push)
+
+    def close(self, key: Hashable) -> None:
+        """关闭会话的流（会话被删除或淘汰时）"""
+        stream = self._streams.get(key)
+        if stream is not None:
+            self.release(stream)
+
+    async def serve(self, stream: EventStream) -> AsyncIterator[bytes]:
+        """StreamingResponse 的数据源，结束时自动释放"""
+        try:
+            async for chunk in stream.events(self.heartbeat):
+                yield chunk
+        finally:
+            self.release(stream)
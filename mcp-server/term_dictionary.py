@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词项词典
+有序词项数组支持前缀补全，字符三元组倒排配合有界编辑距离支持拼写纠错，
+用于把索引中不存在的查询词扩展为相近的已有词项
+"""
+
+import bisect
+import heapq
+from array import array
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_MAX_EXPANSIONS = 5
+DEFAULT_MIN_PREFIX = 3
+
+# 前缀补全最多检查的词项数（按字典序），保证高频前缀的扩展时间有界
+_PREFIX_SCAN = 256
+# 拼写纠错最多校验的候选数（按共享三元组数从多到少），保证常见词缀导致候选过多时耗时有界
+_MAX_FUZZY_CANDIDATES = 1000
+
+
+def trigrams(term: str) -> set:
+    """带首尾标记的字符三元组：长度为n的词项有n个"""
+    padded = f"^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_budget(length: int) -> int:
+    """按词长决定允许的编辑次数
+
+    一次编辑最多破坏3个三元组，词长须大于 3 × 编辑次数 才能用三元组过滤候选。
+    """
+    if length < 4:
+        return 0
+    if length < 8:
+        return 1
+    return 2
+
+
+def bounded_levenshtein(a: str, b: str, bound: int) -> Optional[int]:
+    """编辑距离不超过bound时返回距离，否则返回None
+
+    位并行算法（Myers/Hyyrö）：a 的每个位置对应整数中的一位，b 的每个字符只需常数次整数运算。
+    """
+    if abs(len(a) - len(b)) > bound:
+        return None
+    if not a or not b:
+        return max(len(a), len(b))
+    match: Dict[str, int] = {}
+    for i, char in enumerate(a):
+        match[char] = match.get(char, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    positive, negative = mask, 0
+    distance = len(a)
+    for char in b:
+        eq = match.get(char, 0)
+        vertical = eq | negative
+        horizontal = (((eq & positive) + positive) ^ positive) | eq
+        h_positive = negative | ~(horizontal | positive)
+        h_negative = positive & horizontal
+        if h_positive & last:
+            distance += 1
+        elif h_negative & last:
+            distance -= 1
+        h_positive = (h_positive << 1) | 1
+        h_negative <<= 1
+        positive = (h_negative | ~(vertical | h_positive)) & mask
+        negative = h_positive & vertical & mask
+    return distance if distance <= bound else None
+
+
+class TermDictionary:
+    """索引词项表
+
+    词项按字典序保存在有序数组中（前缀查询为一段连续区间），
+    另有 (三元组, 词长) → 词项编号 倒排，纠错时只合并长度差不超过编辑次数的倒排表；
+    删除的词项只做标记，失效编号过多时重建倒排。
+    """
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self._rebuild(set(terms))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._ids
+
+    def add(self, term: str) -> None:
+        if term in self._ids:
+            return
+        term_id = len(self._terms)
+        self._ids[term] = term_id
+        self._terms.append(term)
+        bisect.insort(self._sorted, term)
+        for gram in trigrams(term):
+            self._grams.setdefault((gram, len(term)), array("I")).append(term_id)
+
+    def discard(self, term: str) -> None:
+        term_id = self._ids.pop(term, None)
+        if term_id is None:
+            return
+        self._terms[term_id] = None
+        del self._sorted[bisect.bisect_left(self._sorted, term)]
+        self._dead += 1
+        if self._dead > len(self._ids):
+            self._rebuild(set(self._ids))
+
+    def prefix(self, prefix: str, limit: int = _PREFIX_SCAN) -> List[str]:
+        """以prefix开头的词项（不含自身），按字典序最多返回limit个"""
+        start = bisect.bisect_right(self._sorted, prefix)
+        result = []
+        for term in self._sorted[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            result.append(term)
+        return result
+
+    def fuzzy(self, term: str, max_edits: int) -> List[Tuple[str, int]]:
+        """编辑距离在 1..max_edits 之间的词项 (词项, 距离)
+
+        一次编辑最多破坏3个三元组，候选必须与查询词共享至少 |G| - 3×max_edits 个三元组：
+        先对长度差不超过 max_edits 的三元组倒排表计数过滤，再按共享数从多到少
+        校验至多 _MAX_FUZZY_CANDIDATES 个候选的编辑距离。
+        """
+        grams = trigrams(term)
+        required = len(grams) - 3 * max_edits
+        if max_edits <= 0 or required <= 0:
+            return []
+        shared: Counter = Counter()
+        for length in range(max(1, len(term) - max_edits), len(term) + max_edits + 1):
+            for gram in grams:
+                term_ids = self._grams.get((gram, length))
+                if term_ids:
+                    shared.update(term_ids)
+
+        candidates = [item for item in shared.items() if item[1] >= required]
+        if len(candidates) > _MAX_FUZZY_CANDIDATES:
+            candidates = heapq.nlargest(_MAX_FUZZY_CANDIDATES, candidates, key=itemgetter(1))
+
+        matches = []
+        for term_id, _ in candidates:
+            candidate = self._terms[term_id]
+            if candidate is None or candidate == term:
+                continue
+            distance = bounded_levenshtein(term, candidate, max_edits)
+            if distance is not None:
+                matches.append((candidate, distance))
+        return matches
+
+    def _rebuild(self, terms: set) -> None:
+        self._sorted: List[str] = sorted(terms)
+        self._terms: List[Optional[str]] = list(self._sorted)
+        self._ids: Dict[str, int] = {term: term_id for term_id, term in enumerate(self._terms)}
+        self._grams: Dict[Tuple[str, int], array] = {}
+        for term_id, term in enumerate(self._terms):
+            for gram in trigrams(term):
+                self._grams.setdefault((gram, len(term)), array("I")).append(term_id)
+        self._dead = 0
+
+
+class QueryExpander:
+    """把词典中不存在的查询词扩展为前缀补全或拼写相近的词项
+
+    扩展词项带权重：前缀补全为 已输入长度 / 补全词长度，拼写纠错为 1 - 距离 / 词长，
+    排序时乘到该词项的分数上；每个查询词最多保留 max_expansions 个扩展。
+    """
+
+    def __init__(self, enabled: bool = True, max_expansions: int = DEFAULT_MAX_EXPANSIONS,
+                 min_prefix: int = DEFAULT_MIN_PREFIX):
+        self.enabled = enabled
+        self.max_expansions = max(0, max_expansions)
+        self.min_prefix = max(1, min_prefix)
+
+    def expand(self, dictionary: TermDictionary, terms: List[str]) -> Dict[str, float]:
+        """返回扩展词项 → 权重（不含原查询中已存在的词项）"""
+        weights: Dict[str, float] = {}
+        if not self.enabled or not self.max_expansions:
+            return weights
+        for term in dict.fromkeys(terms):
+            if term in dictionary:
+                continue
+            candidates: Dict[str, float] = {}
+            if len(term) >= self.min_prefix:
+                for candidate in dictionary.prefix(term):
+                    candidates[candidate] = len(term) / len(candidate)
+            for candidate, distance in dictionary.fuzzy(term, edit_budget(len(term))):
+                weight = 1.0 - distance / len(term)
+                candidates[candidate] = max(weight, candidates.get(candidate, 0.0))
+
+            best = sorted(candidates.items(), key=lambda item: (-item[1], item[0]))[:self.max_expansions]
+            for candidate, weight in best:
+                if candidate not in terms:
+                    weights[candidate] = max(weight, weights.get(candidate, 0.0))
+        return weights
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中英文混合分词器
+CJK文本切分为字符二元组，拉丁文本按单词切分，并拆分camelCase/snake_case标识符
+"""
+
+import re
+from typing import Iterator, List, Tuple
+
+# CJK统一表意文字、扩展A、兼容表意文字、日文假名、韩文音节
+_CJK_RANGES = "㐀-䶿一-鿿豈-﫿぀-ヿ가-힯"
+
+_SEGMENT_PATTERN = re.compile(rf"(?P<cjk>[{_CJK_RANGES}]+)|(?P<word>[^\W{_CJK_RANGES}]+)")
+_IDENTIFIER_PART_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_CJK_CHAR_PATTERN = re.compile(rf"[{_CJK_RANGES}]")
+
+# 非CJK文本平均每个词元对应的字符数
+_CHARS_PER_TOKEN = 4
+
+# 词项、位置、起始偏移、结束偏移
+Token = Tuple[str, int, int, int]
+
+
+def iter_tokens(text: str) -> Iterator[Token]:
+    """逐个产出 (term, position, start, end)
+
+    标识符拆分出的子词与完整标识符共享同一位置，保证位置连续可用于短语和摘要定位。
+    """
+    position = 0
+    for match in _SEGMENT_PATTERN.finditer(text):
+        start = match.start()
+        segment = match.group()
+
+        if match.lastgroup == "cjk":
+            if len(segment) == 1:
+                yield segment, position, start, start + 1
+                position += 1
+                continue
+            for i in range(len(segment) - 1):
+                yield segment[i:i + 2], position, start + i, start + i + 2
+                position += 1
+            continue
+
+        end = match.end()
+        yield segment.lower(), position, start, end
+        for part in _split_identifier(segment):
+            yield part, position, start, end
+        position += 1
+
+
+def tokenize(text: str) -> List[str]:
+    """将文本切分为词项列表"""
+    return [token[0] for token in iter_tokens(text)]
+
+
+def estimate_tokens(text: str) -> int:
+    """快速估算LLM词元数：CJK字符按1个词元计，其余按每4个字符1个词元计"""
+    cjk = len(text) - len(_CJK_CHAR_PATTERN.sub("", text))
+    return cjk + (len(text) - cjk + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def _split_identifier(word: str) -> List[str]:
+    """拆分camelCase与snake_case标识符，单一词段时返回空列表"""
+    if "_" not in word and word.islower():
+        return []
+    parts = []
+    for piece in word.split("_"):
+        parts.extend(part.lower() for part in _IDENTIFIER_PART_PATTERN.findall(piece))
+    if len(parts) <= 1:
+        return []
+    return parts
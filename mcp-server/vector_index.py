@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+向量索引
+哈希技巧TF-IDF向量（词项 + 字符三元组）存放在NumPy内存映射矩阵中，
+小语料暴力检索，大语料使用IVF（球面k-means聚类）只扫描最近的若干个簇
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ranking import DocFilter
+from tokenizer import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖，未安装时语义检索不可用
+    np = None
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILENAME = "search-vectors.npy"
+VECTORS_META_FILENAME = "search-vectors.json"
+VECTOR_FORMAT_VERSION = 1
+
+DEFAULT_DIM = 512
+DEFAULT_IVF_MIN_ROWS = 20000
+DEFAULT_NPROBE = 32
+DEFAULT_MIN_SCORE = 0.08
+DEFAULT_HYBRID_WEIGHT = 0.5
+
+# 编码时每批处理的 (文档, 词项) 对数，限制临时矩阵内存
+_ENCODE_BLOCK = 16384
+# IVF训练：每个簇的采样行数与迭代次数
+_IVF_SAMPLES_PER_LIST = 40
+_IVF_ITERATIONS = 10
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+class HashingVectorizer:
+    """无需训练、可离线使用的哈希向量化器
+
+    每个词项映射到自身及其字符三元组（词长≥4时）的带符号哈希桶，
+    三元组让 evict/eviction、login/log-in 这类词形变化也能部分匹配。
+    文档向量只用对数词频并做L2归一化，IDF只加在查询向量上，索引更新后无需重算旧文档。
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, ngram_weight: float = 0.5, min_ngram_term: int = 4):
+        self.dim = dim
+        self.ngram_weight = ngram_weight
+        self.min_ngram_term = min_ngram_term
+        self._features: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+
+    def features(self, term: str) -> Tuple[Tuple[int, float], ...]:
+        """词项的 (哈希桶, 带符号权重)；使用crc32保证跨进程稳定"""
+        cached = self._features.get(term)
+        if cached is not None:
+            return cached
+        grams = [(term, 1.0)]
+        if len(term) >= self.min_ngram_term:
+            padded = f"^{term}$"
+            ngrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+            weight = self.ngram_weight / math.sqrt(len(ngrams))
+            grams.extend((f"#{gram}", weight) for gram in ngrams)
+
+        features = []
+        for text, weight in grams:
+            digest = zlib.crc32(text.encode("utf-8"))
+            features.append((digest % self.dim, weight if digest & 0x80000000 else -weight))
+        cached = self._features[term] = tuple(features)
+        return cached
+
+    def encode_counts(self, counts: Sequence[Dict[str, int]]) -> "np.ndarray":
+        """把一批文档的词频编码为L2归一化的矩阵"""
+        term_ids: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        weights: List[float] = []
+        for row, term_counts in enumerate(counts):
+            for term, tf in term_counts.items():
+                rows.append(row)
+                cols.append(term_ids.setdefault(term, len(term_ids)))
+                weights.append(1.0 + math.log(tf))
+
+        # 只为本批出现的词项生成稠密特征表
+        table = np.zeros((len(term_ids), self.dim), dtype=np.float32)
+        for term, term_id in term_ids.items():
+            for bucket, weight in self.features(term):
+                table[term_id, bucket] += weight
+
+        # (文档, 词项) 对按行有序，分块后用 reduceat 按行求和；跨块的行分两次累加
+        matrix = np.zeros((len(counts), self.dim), dtype=np.float32)
+        row_array = np.asarray(rows, dtype=np.int64)
+        col_array = np.asarray(cols, dtype=np.int64)
+        weight_array = np.asarray(weights, dtype=np.float32)
+        for start in range(0, len(rows), _ENCODE_BLOCK):
+            block = slice(start, start + _ENCODE_BLOCK)
+            block_rows, first = np.unique(row_array[block], return_index=True)
+            products = table[col_array[block]] * weight_array[block, None]
+            matrix[block_rows] += np.add.reduceat(products, first, axis=0)
+        return _normalize(matrix)
+
+    def encode_query(self, text: str, idf: Callable[[str], float]) -> "np.ndarray":
+        """查询向量：对数词频 × IDF"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        counts: Dict[str, int] = {}
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            scale = (1.0 + math.log(tf)) * idf(term)
+            for bucket, weight in self.features(term):
+                vector[bucket] += weight * scale
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """文档向量矩阵：第i行对应搜索索引中的doc_id i
+
+    矩阵保存在 mcp-docs/search-vectors.npy（内存映射，按容量倍增），
+    每行的源文件签名保存在 search-vectors.json；同步时只重新编码签名变化的文档。
+    read_only 模式供多进程工作进程使用，文件被主进程更新后自动重新映射。
+    """
+
+    def __init__(self, root: Path, vectorizer: Optional[HashingVectorizer] = None, read_only: bool = False,
+                 ivf_min_rows: int = DEFAULT_IVF_MIN_ROWS, nprobe: int = DEFAULT_NPROBE,
+                 min_score: float = DEFAULT_MIN_SCORE, hybrid_weight: float = DEFAULT_HYBRID_WEIGHT,
+                 recheck_interval: float = 1.0):
+        if np is None:
+            raise RuntimeError("NumPy is required for semantic search (pip install numpy)")
+        self.path = Path(root) / VECTORS_FILENAME
+        self.meta_path = Path(root) / VECTORS_META_FILENAME
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.read_only = read_only
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+        self.min_score = min_score
+        # 混合检索中向量分数的权重（关键词分数占 1 - hybrid_weight）
+        self.hybrid_weight = hybrid_weight
+        self.recheck_interval = recheck_interval
+
+        self._matrix: Optional["np.ndarray"] = None
+        self.rows = 0
+        self.keys: List[Optional[List[Any]]] = []
+        self._meta_stamp: Optional[Tuple[int, int]] = None
+        self._last_check = time.monotonic()
+        # IVF：(簇中心, 按簇排序的doc_id, 各簇起始偏移, 按簇排序的向量副本, 每行所属簇, 训练时行数)
+        self._ivf: Optional[Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", int]] = None
+        self._lock = threading.RLock()
+        self._load()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def ivf_enabled(self) -> bool:
+        return self.rows >= self.ivf_min_rows
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "dim": self.vectorizer.dim,
+            "ivf_lists": 0 if self._ivf is None else len(self._ivf[0]),
+        }
+
+    # ---------- 同步 ----------
+
+    def sync(self, index) -> int:
+        """按搜索索引的文档表同步向量，返回重新编码的行数"""
+        if self.read_only:
+            raise RuntimeError("Read-only vector index cannot be synced")
+        docs = list(index.docs)
+        keys = [self._doc_key(index, doc) for doc in docs]
+        changed = [doc_id for doc_id, key in enumerate(keys)
+                   if doc_id >= len(self.keys) or self.keys[doc_id] != key]
+        if not changed and len(keys) == self.rows:
+            return 0
+
+        started = time.perf_counter()
+        live = [doc_id for doc_id in changed if keys[doc_id] is not None]
+        counts = index.term_counts(live)
+        vectors = self.vectorizer.encode_counts([counts.get(doc_id, {}) for doc_id in live])
+
+        with self._lock:
+            self._ensure_capacity(len(keys))
+            matrix = self._matrix
+            if live:
+                matrix[np.asarray(live, dtype=np.int64)] = vectors
+            dead = [doc_id for doc_id in changed if keys[doc_id] is None]
+            if dead:
+                matrix[np.asarray(dead, dtype=np.int64)] = 0.0
+            if len(keys) < self.rows:
+                matrix[len(keys):self.rows] = 0.0
+            matrix.flush()
+            self.rows = len(keys)
+            self.keys = keys
+            self._reassign_ivf(changed)
+            self._write_meta()
+        logger.info(f"Encoded {len(live)} document vectors in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return len(changed)
+
+    @staticmethod
+    def _doc_key(index, doc: Optional[Dict[str, Any]]) -> Optional[List[Any]]:
+        """源文件签名：[相对路径, mtime_ns, size]，已删除文档为None"""
+        if doc is None:
+            return None
+        return [doc["path"], *index.signature.get(doc["path"], [0, 0])]
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """容量不足时按倍数扩容：新文件写完后原子替换"""
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if rows <= capacity and self._matrix is not None:
+            return
+        new_capacity = max(rows, capacity * 2, 1024)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32,
+                                           shape=(new_capacity, self.vectorizer.dim))
+        if self._matrix is not None and self.rows:
+            matrix[:self.rows] = self._matrix[:self.rows]
+        matrix.flush()
+        os.replace(tmp_path, self.path)
+        self._matrix = matrix
+
+    def _write_meta(self) -> None:
+        payload = {
+            "version": VECTOR_FORMAT_VERSION,
+            "dim": self.vectorizer.dim,
+            "rows": self.rows,
+            "keys": self.keys,
+        }
+        tmp_path = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.meta_path)
+
+    def _load(self) -> bool:
+        """加载已有的向量文件；版本或维度不一致时丢弃"""
+        try:
+            stat = os.stat(self.meta_path)
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if payload.get("version") != VECTOR_FORMAT_VERSION or payload.get("dim") != self.vectorizer.dim:
+                return False
+            matrix = np.load(self.path, mmap_mode="r" if self.read_only else "r+")
+            if matrix.ndim != 2 or matrix.shape[1] != self.vectorizer.dim or matrix.shape[0] < payload["rows"]:
+                return False
+        except (OSError, ValueError) as e:
+            if self.read_only:
+                logger.warning(f"Failed to load vector index {self.path}: {e}")
+            return False
+
+        with self._lock:
+            self._matrix = matrix
+            self.rows = payload["rows"]
+            self.keys = payload["keys"]
+            self._meta_stamp = (stat.st_ino, stat.st_mtime_ns)
+            self._ivf = None
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """只读模式：主进程重写向量文件后重新映射"""
+        now = time.monotonic()
+        if now - self._last_check < self.recheck_interval:
+            return False
+        self._last_check = now
+        try:
+            stat = os.stat(self.meta_path)
+        except OSError:
+            return False
+        if (stat.st_ino, stat.st_mtime_ns) == self._meta_stamp:
+            return False
+        return self._load()
+
+    # ---------- 检索 ----------
+
+    def search(self, query: str, idf: Callable[[str], float], k: Optional[int],
+               accept: Optional[DocFilter] = None) -> Tuple[List[Tuple[int, float]], int]:
+        """返回 (前k个 (doc_id, 余弦相似度), 相似度不低于min_score的文档数)
+
+        有过滤条件时始终暴力检索，保证过滤后的召回；IVF下命中数只统计被探查的簇。
+        """
+        if self.read_only:
+            self.reload_if_changed()
+        query_vector = self.vectorizer.encode_query(query, idf)
+        with self._lock:
+            if self._matrix is None or not self.rows or not query_vector.any():
+                return [], 0
+            matrix = self._matrix[:self.rows]
+            ivf = self._ensure_ivf() if accept is None and self.ivf_enabled else None
+
+        if ivf is None:
+            doc_ids = None
+            scores = matrix @ query_vector
+        else:
+            # 被探查的簇在副本中是连续区间，避免按doc_id随机读取整行
+            centroids, order, offsets, packed = ivf[:4]
+            nprobe = min(self.nprobe, len(centroids))
+            probe = np.argpartition(-(centroids @ query_vector), nprobe - 1)[:nprobe]
+            doc_ids = np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe])
+            scores = np.concatenate([packed[offsets[c]:offsets[c + 1]] @ query_vector for c in probe])
+
+        hits = np.nonzero(scores >= self.min_score)[0]
+        hit_ids = hits if doc_ids is None else doc_ids[hits]
+        hit_scores = scores[hits]
+        if accept is not None:
+            keep = np.fromiter((accept(int(doc_id)) for doc_id in hit_ids), dtype=bool, count=len(hit_ids))
+            hit_ids, hit_scores = hit_ids[keep], hit_scores[keep]
+
+        total = len(hit_ids)
+        if k is not None and k < total:
+            top = np.argpartition(-hit_scores, k - 1)[:k]
+            hit_ids, hit_scores = hit_ids[top], hit_scores[top]
+        # 分数降序，同分按doc_id升序
+        order = np.lexsort((hit_ids, -hit_scores))
+        return [(int(hit_ids[i]), float(hit_scores[i])) for i in order], total
+
+    def _ensure_ivf(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", int]:
+        """按需训练IVF：采样做球面k-means，再把所有行分配到最近的簇"""
+        if self._ivf is not None:
+            return self._ivf
+
+        started = time.perf_counter()
+        matrix = self._matrix[:self.rows]
+        lists = max(1, int(math.sqrt(self.rows)))
+        rng = np.random.default_rng(0)
+        sample_size = min(self.rows, lists * _IVF_SAMPLES_PER_LIST)
+        sample = np.asarray(matrix[np.sort(rng.choice(self.rows, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, lists, replace=False)].copy()
+
+        for _ in range(_IVF_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            filled = np.linalg.norm(sums, axis=1) > 0
+            # 空簇保留原中心
+            centroids[filled] = _normalize(sums[filled])
+
+        assignment = self._assign(centroids, np.arange(self.rows))
+        self._ivf = self._ivf_lists(centroids, assignment, self.rows, matrix)
+        logger.info(f"Trained IVF with {lists} lists over {self.rows} vectors "
+                    f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return self._ivf
+
+    def _reassign_ivf(self, changed: List[int]) -> None:
+        """同步后只把变化的行重新分配到已有簇；行数增长过多时丢弃IVF，下次查询重新训练"""
+        if self._ivf is None:
+            return
+        centroids, _, _, _, assignment, trained_rows = self._ivf
+        if self.rows > trained_rows * 2:
+            self._ivf = None
+            return
+        if self.rows > len(assignment):
+            assignment = np.concatenate([assignment, np.zeros(self.rows - len(assignment), dtype=np.int64)])
+        assignment = assignment[:self.rows].copy()
+        rows = np.asarray([doc_id for doc_id in changed if doc_id < self.rows], dtype=np.int64)
+        if len(rows):
+            assignment[rows] = self._assign(centroids, rows)
+        self._ivf = self._ivf_lists(centroids, assignment, trained_rows, self._matrix[:self.rows])
+
+    def _assign(self, centroids: "np.ndarray", rows: "np.ndarray") -> "np.ndarray":
+        """分块计算每行最近的簇中心"""
+        assignment = np.empty(len(rows), dtype=np.int64)
+        for start in range(0, len(rows), _ENCODE_BLOCK):
+            block = self._matrix[rows[start:start + _ENCODE_BLOCK]]
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assignment
+
+    @staticmethod
+    def _ivf_lists(centroids: "np.ndarray", assignment: "np.ndarray", trained_rows: int, matrix: "np.ndarray"):
+        """按簇排序doc_id并复制出按簇连续存放的向量（常驻内存，大小与向量矩阵相同）"""
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(len(centroids) + 1))
+        return centroids, order, offsets, np.ascontiguousarray(matrix[order]), assignment, trained_rows
+
+
+def _normalize(matrix: "np.ndarray") -> "np.ndarray":
+    """按行L2归一化，零向量保持为零"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)